@@ -0,0 +1,16 @@
+"""
+Shared components for the strategy projects (Lean library project)
+
+Referenced from each project's config.json "libraries" entry.
+"""
+
+from .minute_data_exporter import MinuteDataExporter
+from .equity_tracker import EquityTracker
+from .performance_stats import OnlinePerformanceStats, MINUTES_PER_YEAR
+from .phase_profiler import (PhaseProfiler, NullPhaseProfiler, create_phase_profiler,
+                             profiling_enabled, PROFILE_PARAMETER)
+from .strategy_logger import StrategyLogger, LOG_LEVELS
+
+__all__ = ['MinuteDataExporter', 'EquityTracker', 'OnlinePerformanceStats', 'MINUTES_PER_YEAR',
+           'PhaseProfiler', 'NullPhaseProfiler', 'create_phase_profiler', 'profiling_enabled',
+           'PROFILE_PARAMETER', 'StrategyLogger', 'LOG_LEVELS']
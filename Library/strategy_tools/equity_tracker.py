@@ -0,0 +1,161 @@
+"""
+Compact equity curve and drawdown tracking for the strategies
+
+Replaces per-bar lists of dicts with preallocated typed arrays that grow in
+chunks. Peak equity, maximum drawdown and the moments of the bar-to-bar
+returns are kept incrementally by OnlinePerformanceStats, so summary metrics
+never rescan the curve.
+
+Author: Claude Code
+Created: 2024
+"""
+
+from datetime import datetime
+import numpy as np
+
+from .performance_stats import OnlinePerformanceStats
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class EquityTracker:
+    """
+    Array-backed equity curve with running peak, drawdown and return moments
+
+    Each stored point costs 24 bytes (timestamp, equity, price). With
+    max_points set, the oldest half of the stored curve is discarded when the
+    arrays are full; the running statistics still cover every point.
+    """
+
+    def __init__(self, initial_equity, chunk_size=65536, max_points=None):
+        """
+        Args:
+            initial_equity (float): Starting equity, used as the initial peak
+            chunk_size (int): Points added to the arrays each time they grow
+            max_points (int, optional): Upper bound on stored points (default: unbounded)
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if max_points is not None and max_points < 2:
+            raise ValueError("max_points must be at least 2")
+
+        self.initial_equity = float(initial_equity)
+        self.chunk_size = chunk_size
+        self.max_points = max_points
+
+        capacity = chunk_size if max_points is None else min(chunk_size, max_points)
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._equity = np.empty(capacity, dtype=np.float64)
+        self._prices = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+
+        # Running statistics over every recorded point
+        self.stats = OnlinePerformanceStats(self.initial_equity)
+
+    def update(self, timestamp, equity, price=0.0):
+        """
+        Record one point and update the running statistics
+
+        Args:
+            timestamp (datetime): Point time (naive, algorithm time zone)
+            equity (float): Total portfolio value
+            price (float): Traded security price
+        """
+        equity = float(equity)
+        self.stats.update(equity)
+
+        if self._size == len(self._equity):
+            self._make_room()
+        i = self._size
+        self._timestamps[i] = int((timestamp.replace(tzinfo=None) - _EPOCH).total_seconds())
+        self._equity[i] = equity
+        self._prices[i] = price
+        self._size += 1
+
+    @property
+    def count(self):
+        """Points recorded, including any trimmed from the arrays"""
+        return self.stats.count
+
+    @property
+    def last_equity(self):
+        """Most recent equity value"""
+        return self.stats.last_value
+
+    @property
+    def peak_equity(self):
+        """Highest equity seen (starting from initial_equity)"""
+        return self.stats.peak
+
+    @property
+    def max_drawdown(self):
+        """Largest fractional drawdown from the peak"""
+        return self.stats.max_drawdown
+
+    @property
+    def current_drawdown(self):
+        """Fractional drawdown at the latest point"""
+        return self.stats.current_drawdown
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def timestamps(self):
+        """Stored timestamps as datetime64[s] (view of the live buffer)"""
+        return self._timestamps[:self._size].view('datetime64[s]')
+
+    @property
+    def equity(self):
+        """Stored equity values (view of the live buffer)"""
+        return self._equity[:self._size]
+
+    @property
+    def prices(self):
+        """Stored security prices (view of the live buffer)"""
+        return self._prices[:self._size]
+
+    def drawdowns(self):
+        """
+        Drawdown series of the stored points
+
+        Returns:
+            np.ndarray: Fractional drawdown from the running peak at each point
+        """
+        equity = self.equity
+        if len(equity) == 0:
+            return np.empty(0)
+        peak = np.maximum.accumulate(np.maximum(equity, self.initial_equity))
+        return (peak - equity) / peak
+
+    def to_frame(self):
+        """
+        Stored curve as a DataFrame (timestamp, equity, price)
+
+        Returns:
+            pd.DataFrame: One row per stored point
+        """
+        import pandas as pd
+
+        return pd.DataFrame({
+            'timestamp': self.timestamps,
+            'equity': self.equity.copy(),
+            'price': self.prices.copy()
+        })
+
+    def _make_room(self):
+        """Grow the arrays by one chunk, or drop the oldest half at max_points"""
+        capacity = len(self._equity)
+        if self.max_points is not None and capacity >= self.max_points:
+            keep = capacity // 2
+            for array in (self._timestamps, self._equity, self._prices):
+                array[:keep] = array[capacity - keep:capacity]
+            self._size = keep
+            return
+
+        new_capacity = capacity + self.chunk_size
+        if self.max_points is not None:
+            new_capacity = min(new_capacity, self.max_points)
+        self._timestamps = np.resize(self._timestamps, new_capacity)
+        self._equity = np.resize(self._equity, new_capacity)
+        self._prices = np.resize(self._prices, new_capacity)
@@ -0,0 +1,197 @@
+"""
+Buffered minute-data export shared by the strategy projects
+
+Replaces the per-bar open/append/close of the strategies' _export_minute_data
+methods. Rows are recorded into preallocated NumPy arrays and written in
+large chunks: whenever the buffer is full and once more at
+on_end_of_algorithm.
+
+Output formats:
+- csv:     the strategies' existing minute CSV layout (default)
+- npy:     a structured NumPy array file, readable with np.load(mmap_mode='r');
+           its header is rewritten after every chunk so the file stays valid
+- parquet: one row group per chunk (requires pyarrow)
+
+Author: Claude Code
+Created: 2024
+"""
+
+import os
+import struct
+from datetime import datetime
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+CSV_HEADER = "timestamp,datetime_utc,open,high,low,close,volume,portfolio_value,equity\n"
+
+# Row layout of the buffers and of the .npy output
+ROW_DTYPE = np.dtype([
+    ('timestamp', np.int64),    # bar end time as Unix seconds
+    ('wall_time', np.int64),    # bar end wall-clock time, seconds since 1970-01-01
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+    ('portfolio_value', np.float64)
+])
+
+SUPPORTED_FORMATS = ('csv', 'npy', 'parquet')
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Fixed .npy header size so it can be rewritten in place as rows are appended
+_NPY_HEADER_BYTES = 256
+
+
+class MinuteDataExporter:
+    """
+    Buffered writer of per-bar OHLCV and portfolio value rows
+
+    Usage inside an algorithm:
+        self.minute_exporter = MinuteDataExporter("minute_equity_data.csv")
+        self.minute_exporter.record_bar(bar, self.portfolio.total_portfolio_value)  # on_data
+        self.minute_exporter.close()                                               # on_end_of_algorithm
+    """
+
+    def __init__(self, file_path, flush_every=10000, formats=('csv',)):
+        """
+        Create the output files and the row buffer
+
+        Args:
+            file_path (str): CSV path; binary outputs use the same base name
+                with a .npy or .parquet extension
+            flush_every (int): Rows buffered between writes (default: 10000)
+            formats (tuple): Any of 'csv', 'npy' and 'parquet' (default: csv)
+        """
+        formats = tuple(formats)
+        unknown = [fmt for fmt in formats if fmt not in SUPPORTED_FORMATS]
+        if unknown or not formats:
+            raise ValueError(f"Unsupported export formats {unknown}, choose from {SUPPORTED_FORMATS}")
+        if 'parquet' in formats and pq is None:
+            raise ImportError("Parquet export requires pyarrow")
+        if flush_every < 1:
+            raise ValueError("flush_every must be at least 1")
+
+        self.file_path = file_path
+        self.formats = formats
+        self.flush_every = flush_every
+
+        base_path = os.path.splitext(file_path)[0]
+        self.paths = {
+            'csv': file_path,
+            'npy': base_path + '.npy',
+            'parquet': base_path + '.parquet'
+        }
+
+        self._buffer = np.zeros(flush_every, dtype=ROW_DTYPE)
+        self._count = 0
+        self.rows_written = 0
+        self.flushes = 0
+        self._parquet_writer = None
+
+        if 'csv' in formats:
+            with open(self.paths['csv'], 'w') as f:
+                f.write(CSV_HEADER)
+        if 'npy' in formats:
+            with open(self.paths['npy'], 'wb') as f:
+                f.write(self._npy_header(0))
+
+    def record(self, end_time, open_price, high, low, close, volume, portfolio_value):
+        """
+        Buffer one row, writing the buffer out when it is full
+
+        Args:
+            end_time (datetime): Bar end time (naive, algorithm time zone)
+            open_price (float): Bar open
+            high (float): Bar high
+            low (float): Bar low
+            close (float): Bar close
+            volume (float): Bar volume
+            portfolio_value (float): Total portfolio value after the bar
+        """
+        self._buffer[self._count] = (
+            int(end_time.timestamp()),
+            int((end_time.replace(tzinfo=None) - _EPOCH).total_seconds()),
+            open_price, high, low, close, volume, portfolio_value
+        )
+        self._count += 1
+
+        if self._count == self.flush_every:
+            self.flush()
+
+    def record_bar(self, bar, portfolio_value):
+        """Buffer a TradeBar with the current portfolio value"""
+        self.record(bar.end_time, bar.open, bar.high, bar.low, bar.close, bar.volume,
+                    portfolio_value)
+
+    def flush(self):
+        """Write the buffered rows to every output format"""
+        if self._count == 0:
+            return
+
+        rows = self._buffer[:self._count]
+        if 'csv' in self.formats:
+            self._write_csv(rows)
+        if 'npy' in self.formats:
+            self._write_npy(rows)
+        if 'parquet' in self.formats:
+            self._write_parquet(rows)
+
+        self.rows_written += self._count
+        self.flushes += 1
+        self._count = 0
+
+    def close(self):
+        """Flush remaining rows and finalize the outputs (call at on_end_of_algorithm)"""
+        self.flush()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def _write_csv(self, rows):
+        """Append rows in the strategies' CSV layout"""
+        wall_times = np.datetime_as_string(rows['wall_time'].astype('datetime64[s]'), unit='s')
+        lines = [
+            f"{timestamp},{wall_time},{open_price:.2f},{high:.2f},{low:.2f},{close:.2f},"
+            f"{volume},{value:.2f},{value:.2f}\n"
+            for timestamp, wall_time, open_price, high, low, close, volume, value in zip(
+                rows['timestamp'].tolist(), wall_times.tolist(), rows['open'].tolist(),
+                rows['high'].tolist(), rows['low'].tolist(), rows['close'].tolist(),
+                rows['volume'].tolist(), rows['portfolio_value'].tolist()
+            )
+        ]
+        with open(self.paths['csv'], 'a') as f:
+            f.write(''.join(lines))
+
+    def _write_npy(self, rows):
+        """Append raw records and rewrite the header with the new row count"""
+        with open(self.paths['npy'], 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            f.write(rows.tobytes())
+            f.seek(0)
+            f.write(self._npy_header(self.rows_written + len(rows)))
+
+    def _write_parquet(self, rows):
+        """Append rows as a Parquet row group"""
+        table = pa.table({name: rows[name] for name in ROW_DTYPE.names})
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.paths['parquet'], table.schema)
+        self._parquet_writer.write_table(table)
+
+    @staticmethod
+    def _npy_header(rows):
+        """Version 1.0 .npy header padded to a fixed size"""
+        header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (
+            np.lib.format.dtype_to_descr(ROW_DTYPE), rows
+        )
+        prefix = np.lib.format.magic(1, 0)
+        padding = _NPY_HEADER_BYTES - len(prefix) - 2 - len(header) - 1
+        return prefix + struct.pack('<H', _NPY_HEADER_BYTES - len(prefix) - 2) + \
+            (header + ' ' * padding + '\n').encode('latin1')
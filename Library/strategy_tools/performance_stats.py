@@ -0,0 +1,155 @@
+"""
+Online performance statistics in constant memory
+
+Feeds one equity (or price) value at a time and keeps the return count,
+Welford mean and variance, downside variance, extremes, peak and maximum
+drawdown, so Sharpe and Sortino ratios can be queried on every bar without
+keeping or rescanning a returns history.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import math
+
+# Minute bars in a trading year, as used by the strategies' annualization
+MINUTES_PER_YEAR = 252 * 24 * 60
+
+
+class OnlinePerformanceStats:
+    """
+    Running return and drawdown statistics of an equity series
+
+    Returns are simple bar-to-bar returns. Variances are population
+    variances (matching np.std), and the downside variance is the mean of
+    min(return, 0) squared over all returns.
+    """
+
+    __slots__ = ('count', 'return_count', 'mean', '_m2', '_downside_sq_sum',
+                 'min_return', 'max_return', 'first_value', 'last_value',
+                 'peak', 'current_drawdown', 'max_drawdown')
+
+    def __init__(self, initial_value=None):
+        """
+        Args:
+            initial_value (float, optional): Starting value, used as the
+                initial peak (e.g. the starting cash)
+        """
+        self.count = 0
+        self.return_count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq_sum = 0.0
+        self.min_return = None
+        self.max_return = None
+        self.first_value = None
+        self.last_value = None
+        self.peak = float(initial_value) if initial_value is not None else None
+        self.current_drawdown = 0.0
+        self.max_drawdown = 0.0
+
+    def update(self, value):
+        """
+        Add the next equity or price value
+
+        Args:
+            value (float): Series value at this bar
+        """
+        value = float(value)
+        last_value = self.last_value
+
+        if last_value is not None and last_value != 0:
+            ret = (value - last_value) / last_value
+            self.return_count += 1
+            delta = ret - self.mean
+            self.mean += delta / self.return_count
+            self._m2 += delta * (ret - self.mean)
+            if ret < 0:
+                self._downside_sq_sum += ret * ret
+            if self.min_return is None or ret < self.min_return:
+                self.min_return = ret
+            if self.max_return is None or ret > self.max_return:
+                self.max_return = ret
+
+        if self.peak is None or value > self.peak:
+            self.peak = value
+        self.current_drawdown = (self.peak - value) / self.peak if self.peak else 0.0
+        if self.current_drawdown > self.max_drawdown:
+            self.max_drawdown = self.current_drawdown
+
+        if self.first_value is None:
+            self.first_value = value
+        self.last_value = value
+        self.count += 1
+
+    def variance(self):
+        """Population variance of the returns"""
+        return self._m2 / self.return_count if self.return_count else 0.0
+
+    def std(self):
+        """Population standard deviation of the returns"""
+        return math.sqrt(self.variance()) if self.return_count > 1 else 0.0
+
+    def downside_std(self):
+        """Downside deviation of the returns (target 0)"""
+        return math.sqrt(self._downside_sq_sum / self.return_count) if self.return_count else 0.0
+
+    def sharpe_ratio(self, risk_free_rate=0.0, periods_per_year=MINUTES_PER_YEAR):
+        """
+        Annualized Sharpe ratio
+
+        Args:
+            risk_free_rate (float): Annual risk-free rate
+            periods_per_year (int): Bars per year (default: minute bars)
+
+        Returns:
+            float: Sharpe ratio, 0 when the returns have no dispersion
+        """
+        std = self.std()
+        if std <= 0:
+            return 0.0
+        excess = self.mean - risk_free_rate / periods_per_year
+        return excess / std * math.sqrt(periods_per_year)
+
+    def sortino_ratio(self, risk_free_rate=0.0, periods_per_year=MINUTES_PER_YEAR):
+        """
+        Annualized Sortino ratio
+
+        Args:
+            risk_free_rate (float): Annual risk-free rate
+            periods_per_year (int): Bars per year (default: minute bars)
+
+        Returns:
+            float: Sortino ratio, 0 when there are no losing returns
+        """
+        downside = self.downside_std()
+        if downside <= 0:
+            return 0.0
+        excess = self.mean - risk_free_rate / periods_per_year
+        return excess / downside * math.sqrt(periods_per_year)
+
+    def summary(self, risk_free_rate=0.0, periods_per_year=MINUTES_PER_YEAR):
+        """
+        Current statistics as a dictionary
+
+        Args:
+            risk_free_rate (float): Annual risk-free rate
+            periods_per_year (int): Bars per year (default: minute bars)
+
+        Returns:
+            dict: Return moments, extremes, ratios and drawdowns
+        """
+        return {
+            'count': self.count,
+            'return_count': self.return_count,
+            'mean': self.mean,
+            'std': self.std(),
+            'downside_std': self.downside_std(),
+            'min': self.min_return if self.min_return is not None else 0,
+            'max': self.max_return if self.max_return is not None else 0,
+            'sharpe_ratio': self.sharpe_ratio(risk_free_rate, periods_per_year),
+            'sortino_ratio': self.sortino_ratio(risk_free_rate, periods_per_year),
+            'peak': self.peak,
+            'current_drawdown': self.current_drawdown,
+            'max_drawdown': self.max_drawdown
+        }
@@ -0,0 +1,220 @@
+"""
+Opt-in per-phase timing of the strategies' on_data hot path
+
+on_data calls begin() once per bar and lap(phase) after each phase; every
+lap records the time since the previous mark, so each phase costs one
+clock read. Durations are aggregated into log2 nanosecond histograms
+instead of being stored, so memory stays constant however long the
+backtest runs. When profiling is disabled the strategies hold a
+NullPhaseProfiler whose methods do nothing.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import json
+from time import perf_counter_ns
+
+# Histogram bucket b holds durations d with d.bit_length() == b, i.e.
+# 2**(b-1) <= d < 2**b nanoseconds; 40 buckets reach about 18 minutes
+HISTOGRAM_BUCKETS = 40
+
+PROFILE_PARAMETER = "profile_phases"
+
+
+def profiling_enabled(value):
+    """
+    Interpret a Lean parameter value as an on/off flag
+
+    Args:
+        value (str): Parameter value, e.g. "true", "1" or "off"
+
+    Returns:
+        bool: True when profiling was requested
+    """
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class PhaseStats:
+    """Count, total, extremes and log2 histogram of one phase's durations"""
+
+    __slots__ = ('count', 'total_ns', 'min_ns', 'max_ns', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, elapsed_ns):
+        """Record one duration in nanoseconds"""
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        """
+        Histogram estimate of a duration percentile
+
+        Args:
+            q (float): Percentile in [0, 100]
+
+        Returns:
+            int: Upper edge (ns) of the bucket holding the percentile, capped at max_ns
+        """
+        if self.count == 0:
+            return 0
+        target = max(1, -(-self.count * q // 100))  # ceil without floats
+        seen = 0
+        for bucket, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        """Summary statistics in microseconds, plus the raw histogram"""
+        return {
+            'count': self.count,
+            'total_ms': self.total_ns / 1e6,
+            'mean_us': self.total_ns / self.count / 1e3 if self.count else 0.0,
+            'min_us': (self.min_ns or 0) / 1e3,
+            'p50_us': self.percentile(50) / 1e3,
+            'p90_us': self.percentile(90) / 1e3,
+            'p99_us': self.percentile(99) / 1e3,
+            'max_us': self.max_ns / 1e3,
+            'histogram': {f"<{1 << bucket}ns": bucket_count
+                          for bucket, bucket_count in enumerate(self.buckets) if bucket_count}
+        }
+
+
+class PhaseProfiler:
+    """
+    Lap timer aggregating on_data phase durations
+
+    Usage:
+        profiler.begin()
+        ...export...
+        profiler.lap('export')
+        ...validation...
+        profiler.lap('validation')
+
+    Phases skipped by an early return are simply not recorded for that bar.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.phases = {}
+        self.bars = 0
+        self._mark = 0
+
+    def begin(self):
+        """Start timing a bar"""
+        self.bars += 1
+        self._mark = perf_counter_ns()
+
+    def lap(self, phase):
+        """
+        Record the time since the previous mark under phase
+
+        Args:
+            phase (str): Phase name
+        """
+        now = perf_counter_ns()
+        elapsed = now - self._mark
+        self._mark = now
+
+        # PhaseStats.add inlined: this runs several times per bar
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.count += 1
+        stats.total_ns += elapsed
+        if elapsed > stats.max_ns:
+            stats.max_ns = elapsed
+        if stats.min_ns is None or elapsed < stats.min_ns:
+            stats.min_ns = elapsed
+        bucket = elapsed.bit_length()
+        stats.buckets[bucket if bucket < HISTOGRAM_BUCKETS else HISTOGRAM_BUCKETS - 1] += 1
+
+    def summary(self):
+        """
+        Per-phase statistics
+
+        Returns:
+            dict: {'bars': int, 'phases': {phase: stats}} where each phase's
+                stats include its share of all measured time
+        """
+        measured_ns = sum(stats.total_ns for stats in self.phases.values())
+        phases = {}
+        for phase, stats in self.phases.items():
+            phases[phase] = stats.summary()
+            phases[phase]['share'] = stats.total_ns / measured_ns if measured_ns else 0.0
+        return {'bars': self.bars, 'phases': phases}
+
+    def report_lines(self):
+        """
+        Human-readable per-phase table, slowest phase first
+
+        Returns:
+            list: Lines for the algorithm log
+        """
+        summary = self.summary()
+        lines = [
+            f"ON_DATA PHASE PROFILE ({summary['bars']} bars)",
+            f"{'phase':<14}{'count':>9}{'total ms':>11}{'share':>8}{'mean us':>10}"
+            f"{'p50 us':>9}{'p90 us':>9}{'p99 us':>9}{'max us':>10}"
+        ]
+        ranked = sorted(summary['phases'].items(), key=lambda item: -item[1]['total_ms'])
+        for phase, stats in ranked:
+            lines.append(
+                f"{phase:<14}{stats['count']:>9}{stats['total_ms']:>11.1f}{stats['share']:>8.1%}"
+                f"{stats['mean_us']:>10.2f}{stats['p50_us']:>9.1f}{stats['p90_us']:>9.1f}"
+                f"{stats['p99_us']:>9.1f}{stats['max_us']:>10.1f}"
+            )
+        return lines
+
+    def save(self, file_path):
+        """Write summary() as JSON"""
+        with open(file_path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+class NullPhaseProfiler:
+    """Stand-in used when profiling is off: every call is a no-op"""
+
+    enabled = False
+
+    def begin(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def summary(self):
+        return {'bars': 0, 'phases': {}}
+
+    def report_lines(self):
+        return []
+
+    def save(self, file_path):
+        pass
+
+
+def create_phase_profiler(enabled):
+    """
+    Profiler for a strategy
+
+    Args:
+        enabled (bool): Whether profiling was requested
+
+    Returns:
+        PhaseProfiler or NullPhaseProfiler
+    """
+    return PhaseProfiler() if enabled else NullPhaseProfiler()
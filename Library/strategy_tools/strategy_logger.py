@@ -0,0 +1,180 @@
+"""
+Rate-limited, lazily formatted logging for the strategies' minute loops
+
+Every message carries a key naming its call site. A message is only
+formatted and sent to Lean when its level is enabled and its key's limits
+allow it, so a suppressed message costs a dict lookup and a few integer
+comparisons instead of an f-string. Per key, messages can be sampled (every
+nth occurrence) and rate limited (at most n per interval of algorithm
+time). Suppressed counts are kept per key and reported at the end.
+
+Usage:
+    self.logger = StrategyLogger(self, level='info', max_per_interval=60)
+    self.logger.configure('portfolio_monitoring', sample_every=60)
+    self.logger.debug('portfolio_monitoring', "Equity=${:.2f}", equity)
+
+Author: Claude Code
+Created: 2024
+"""
+
+from datetime import timedelta
+
+LOG_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+# QCAlgorithm method each level is written with
+LEVEL_SINKS = {'debug': 'debug', 'info': 'log', 'warning': 'warning', 'error': 'error'}
+
+
+class KeyLimits:
+    """Sampling and rate-limit rule, plus counters, for one message key"""
+
+    __slots__ = ('sample_every', 'max_per_interval', 'interval',
+                 'seen', 'emitted', 'suppressed', 'window_start', 'window_count')
+
+    def __init__(self, sample_every=None, max_per_interval=None, interval=None):
+        self.sample_every = sample_every
+        self.max_per_interval = max_per_interval
+        self.interval = interval
+        self.seen = 0
+        self.emitted = 0
+        self.suppressed = 0
+        self.window_start = None
+        self.window_count = 0
+
+
+class StrategyLogger:
+    """
+    Leveled logger for a QCAlgorithm with per-key sampling and rate limits
+
+    Errors are exempt from the default rate limit (they can still be limited
+    per key with configure()).
+    """
+
+    def __init__(self, algorithm, level='debug', max_per_interval=None,
+                 interval=timedelta(hours=1)):
+        """
+        Args:
+            algorithm (QCAlgorithm): Algorithm whose debug/log/warning/error
+                methods receive the messages and whose time drives rate limits
+            level (str): Lowest level written: 'debug', 'info', 'warning' or 'error'
+            max_per_interval (int, optional): Default per-key limit on messages
+                per interval of algorithm time (None or 0: unlimited)
+            interval (timedelta): Rate-limit window
+        """
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level {level!r}; expected one of {list(LOG_LEVELS)}")
+
+        self.algorithm = algorithm
+        self.level = level
+        self.min_level = LOG_LEVELS[level]
+        self.max_per_interval = max_per_interval or None
+        self.interval = interval
+        self._keys = {}
+        self._sinks = {name: getattr(algorithm, method) for name, method in LEVEL_SINKS.items()}
+
+    def configure(self, key, sample_every=None, max_per_interval=None, interval=None):
+        """
+        Set the rule for one message key
+
+        Args:
+            key (str): Message key
+            sample_every (int, optional): Only write every nth occurrence
+            max_per_interval (int, optional): Messages allowed per interval
+                (default: the logger's default limit)
+            interval (timedelta, optional): Rate-limit window (default: the logger's)
+        """
+        limits = self._limits(key)
+        limits.sample_every = sample_every
+        if max_per_interval is not None:
+            limits.max_per_interval = max_per_interval or None
+        if interval is not None:
+            limits.interval = interval
+
+    def debug(self, key, message, *args):
+        """Write a debug message (formatted with str.format(*args) only if written)"""
+        self._write('debug', 10, key, message, args)
+
+    def info(self, key, message, *args):
+        """Write an info message through the algorithm's log()"""
+        self._write('info', 20, key, message, args)
+
+    def warning(self, key, message, *args):
+        """Write a warning message"""
+        self._write('warning', 30, key, message, args)
+
+    def error(self, key, message, *args):
+        """Write an error message"""
+        self._write('error', 40, key, message, args)
+
+    def _write(self, level, level_number, key, message, args):
+        limits = self._keys.get(key)
+        if limits is None:
+            limits = self._limits(key, level)
+        limits.seen += 1
+
+        if level_number < self.min_level or not self._allowed(limits):
+            limits.suppressed += 1
+            return
+
+        limits.emitted += 1
+        self._sinks[level](message.format(*args) if args else message)
+
+    def _allowed(self, limits):
+        """Apply the key's sampling and rate limit to the current occurrence"""
+        if limits.sample_every and (limits.seen - 1) % limits.sample_every:
+            return False
+
+        if limits.max_per_interval is None:
+            return True
+
+        now = self.algorithm.time
+        if limits.window_start is None or now - limits.window_start >= limits.interval:
+            limits.window_start = now
+            limits.window_count = 0
+        if limits.window_count >= limits.max_per_interval:
+            return False
+        limits.window_count += 1
+        return True
+
+    def _limits(self, key, level=None):
+        """Counters and rule for a key, created with the logger defaults"""
+        limits = self._keys.get(key)
+        if limits is None:
+            default_limit = None if level == 'error' else self.max_per_interval
+            limits = self._keys[key] = KeyLimits(None, default_limit, self.interval)
+        return limits
+
+    def summary(self):
+        """
+        Per-key message counts
+
+        Returns:
+            dict: {key: {'seen', 'emitted', 'suppressed'}}
+        """
+        return {key: {'seen': limits.seen, 'emitted': limits.emitted,
+                      'suppressed': limits.suppressed}
+                for key, limits in self._keys.items()}
+
+    def report_lines(self):
+        """
+        Suppressed-message summary, most suppressed key first
+
+        Returns:
+            list: Lines for the algorithm log (empty when nothing was suppressed)
+        """
+        suppressed = [(key, counts) for key, counts in self.summary().items()
+                      if counts['suppressed']]
+        if not suppressed:
+            return []
+
+        total = sum(counts['suppressed'] for _, counts in suppressed)
+        lines = [f"LOG SUPPRESSION SUMMARY ({total} messages suppressed, level={self.level})"]
+        for key, counts in sorted(suppressed, key=lambda item: -item[1]['suppressed']):
+            lines.append(f"{key:<28} suppressed {counts['suppressed']:>9}  "
+                         f"written {counts['emitted']:>7}  of {counts['seen']:>9}")
+        return lines
+
+    def log_summary(self):
+        """Write report_lines() through the algorithm's log(), bypassing the limits"""
+        for line in self.report_lines():
+            self.algorithm.log(line)
@@ -0,0 +1,22 @@
+"""
+Benchmark suite for the indicators, the optimizer and the dashboard loaders
+
+Usage:
+    python -m benchmarks run                   # run everything, write results/latest.json
+    python -m benchmarks run -k 'indicator.*'  # run a subset
+    python -m benchmarks run --save-baseline   # also store the run as the baseline
+    python -m benchmarks compare               # flag regressions against the baseline
+    python -m benchmarks list                  # show the registered benchmarks
+
+Author: Claude Code
+Created: 2024
+"""
+
+from .harness import (BENCHMARKS, DEFAULT_BASELINE_FILE, DEFAULT_RESULTS_FILE,
+                      DEFAULT_THRESHOLD, benchmark, compare_results, load_results,
+                      run_benchmarks, save_results, select_benchmarks)
+from . import suites
+
+__all__ = ['BENCHMARKS', 'DEFAULT_BASELINE_FILE', 'DEFAULT_RESULTS_FILE', 'DEFAULT_THRESHOLD',
+           'benchmark', 'compare_results', 'load_results', 'run_benchmarks', 'save_results',
+           'select_benchmarks']
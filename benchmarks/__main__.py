@@ -0,0 +1,157 @@
+"""
+Benchmark command line interface
+
+Usage:
+    python -m benchmarks run [-k PATTERN ...] [--repeat N] [--output FILE] [--save-baseline]
+    python -m benchmarks compare [--baseline FILE] [--current FILE] [--threshold 0.10]
+    python -m benchmarks list
+
+compare exits with status 1 when any benchmark regressed, so it can gate CI.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import argparse
+import sys
+
+from .harness import (DEFAULT_BASELINE_FILE, DEFAULT_RESULTS_FILE, DEFAULT_THRESHOLD,
+                      compare_results, load_results, run_benchmarks, save_results,
+                      select_benchmarks)
+from . import suites  # noqa: F401  (registers the benchmarks)
+
+STATUS_ICONS = {
+    'regression': '🔴',
+    'improvement': '🟢',
+    'ok': '⚪',
+    'new': '🆕',
+    'missing': '❔',
+    'error': '❌'
+}
+
+
+def format_seconds(seconds):
+    """Format a duration with a readable unit"""
+    if seconds is None:
+        return '-'
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+
+def print_progress(name, outcome):
+    """Print one benchmark result as it completes"""
+    if isinstance(outcome, Exception):
+        print(f"❌ {name:<58} {type(outcome).__name__}: {outcome}")
+        return
+    rate = outcome['items_per_second']
+    rate_text = f"{rate:>14,.0f} items/s" if rate is not None else ''
+    print(f"✅ {name:<58} median {format_seconds(outcome['median']):>11}  "
+          f"± {format_seconds(outcome['stdev']):>10} {rate_text}")
+
+
+def command_run(args):
+    """Run the selected benchmarks and save the results"""
+    print("⚡ Running benchmarks")
+    print("=" * 70)
+
+    results = run_benchmarks(args.k, repeat=args.repeat, warmup=args.warmup,
+                             progress=print_progress)
+    if not results['benchmarks']:
+        print("❌ No benchmarks match the given patterns")
+        return 1
+
+    path = save_results(results, args.output)
+    print(f"\n💾 Results saved to {path}")
+    if args.save_baseline:
+        path = save_results(results, args.baseline)
+        print(f"📌 Baseline saved to {path}")
+
+    failed = [name for name, summary in results['benchmarks'].items() if 'error' in summary]
+    return 1 if failed else 0
+
+
+def command_compare(args):
+    """Compare saved results with the baseline"""
+    try:
+        baseline = load_results(args.baseline)
+        current = load_results(args.current)
+    except FileNotFoundError as e:
+        print(f"❌ Results file not found: {e.filename}")
+        return 1
+
+    print(f"📊 Benchmark comparison (threshold {args.threshold:.0%})")
+    print(f"   baseline: {args.baseline} ({baseline['environment'].get('git_commit')})")
+    print(f"   current:  {args.current} ({current['environment'].get('git_commit')})")
+    print("=" * 70)
+
+    rows = compare_results(baseline, current, args.threshold)
+    for row in rows:
+        change = f"{row['change']:+.1%}" if row['change'] is not None else ''
+        print(f"{STATUS_ICONS[row['status']]} {row['name']:<58} "
+              f"{format_seconds(row['baseline']):>11} → {format_seconds(row['current']):>11} "
+              f"{change:>8}")
+
+    regressions = [row['name'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        print(f"\n🔴 {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+def command_list(args):
+    """List the registered benchmarks"""
+    for bench in select_benchmarks(args.k):
+        print(f"{bench.name:<58} {bench.description}")
+    return 0
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description="Benchmark suite with baseline comparison")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Run benchmarks and save the results")
+    run.add_argument('-k', action='append', metavar='PATTERN',
+                     help="Only run benchmarks matching this glob (repeatable)")
+    run.add_argument('--repeat', type=int, default=5,
+                     help="Timed repeats per benchmark (default: 5)")
+    run.add_argument('--warmup', type=int, default=1,
+                     help="Untimed warmup calls per benchmark (default: 1)")
+    run.add_argument('--output', default=DEFAULT_RESULTS_FILE,
+                     help="Results file (default: benchmarks/results/latest.json)")
+    run.add_argument('--save-baseline', action='store_true',
+                     help="Also store this run as the baseline")
+    run.add_argument('--baseline', default=DEFAULT_BASELINE_FILE,
+                     help="Baseline file written by --save-baseline")
+    run.set_defaults(handler=command_run)
+
+    compare = commands.add_parser('compare', help="Flag regressions against the baseline")
+    compare.add_argument('--baseline', default=DEFAULT_BASELINE_FILE,
+                         help="Baseline results (default: benchmarks/results/baseline.json)")
+    compare.add_argument('--current', default=DEFAULT_RESULTS_FILE,
+                         help="Results to check (default: benchmarks/results/latest.json)")
+    compare.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                         help="Median slowdown counted as a regression (default: 0.10)")
+    compare.set_defaults(handler=command_compare)
+
+    listing = commands.add_parser('list', help="List registered benchmarks")
+    listing.add_argument('-k', action='append', metavar='PATTERN',
+                         help="Only list benchmarks matching this glob (repeatable)")
+    listing.set_defaults(handler=command_list)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Benchmark command entry point"""
+    args = parse_arguments(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Benchmark harness: registration, repeated timing, result files and comparison
+
+Benchmarks register a setup function with @benchmark. The setup builds its
+inputs once and returns the zero-argument callable that is timed, so data
+generation never counts towards the measurement. Every benchmark is timed
+over several repeats after a warmup call, and the summary statistics are
+written as JSON together with the machine and interpreter they ran on.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, 'benchmarks', 'results')
+DEFAULT_RESULTS_FILE = os.path.join(RESULTS_DIR, 'latest.json')
+DEFAULT_BASELINE_FILE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+# Slowdown of the median time, relative to the baseline, reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+BENCHMARKS = {}
+
+
+class Benchmark:
+    """A registered benchmark: a setup function returning the timed callable"""
+
+    def __init__(self, name, setup, items=1, number=1, description=''):
+        """
+        Args:
+            name (str): Dotted benchmark name, e.g. 'indicator.stream_update'
+            setup (callable): Builds the inputs and returns the callable to time
+            items (int): Work items per call (bars, evaluations...)
+            number (int): Calls per timed repeat (for very short callables)
+            description (str): One-line description for listings
+        """
+        self.name = name
+        self.setup = setup
+        self.items = items
+        self.number = number
+        self.description = description
+
+
+def benchmark(name, items=1, number=1):
+    """
+    Register a benchmark setup function
+
+    The decorated function takes no arguments and returns the callable to
+    time (or a (callable, items) tuple when the item count depends on data).
+
+    Args:
+        name (str): Dotted benchmark name
+        items (int): Work items per call, used for the throughput figure
+        number (int): Calls per timed repeat
+    """
+    def register(setup):
+        lines = (setup.__doc__ or '').strip().splitlines()
+        description = lines[0] if lines else ''
+        BENCHMARKS[name] = Benchmark(name, setup, items, number, description)
+        return setup
+    return register
+
+
+def select_benchmarks(patterns=None):
+    """
+    Registered benchmarks matching any of the glob patterns
+
+    Args:
+        patterns (list, optional): fnmatch patterns such as 'indicator.*'
+
+    Returns:
+        list: Matching Benchmark objects in name order
+    """
+    names = sorted(BENCHMARKS)
+    if patterns:
+        names = [name for name in names
+                 if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)]
+    return [BENCHMARKS[name] for name in names]
+
+
+def measure(run, repeat=5, number=1, warmup=1):
+    """
+    Time a callable repeatedly
+
+    Args:
+        run (callable): Zero-argument callable to time
+        repeat (int): Timed repeats
+        number (int): Calls per repeat
+        warmup (int): Untimed calls made first
+
+    Returns:
+        list: Seconds per call for each repeat
+    """
+    for _ in range(warmup):
+        run()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def summarize(timings, items=1):
+    """
+    Summary statistics of per-call timings
+
+    Args:
+        timings (list): Seconds per call for each repeat
+        items (int): Work items per call
+
+    Returns:
+        dict: min/median/mean/max/stdev seconds and items per second
+    """
+    median = statistics.median(timings)
+    return {
+        'repeat': len(timings),
+        'items': items,
+        'min': min(timings),
+        'median': median,
+        'mean': statistics.fmean(timings),
+        'max': max(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'items_per_second': items / median if median > 0 else None,
+        'timings': timings
+    }
+
+
+def run_benchmarks(patterns=None, repeat=5, warmup=1, progress=None):
+    """
+    Run the selected benchmarks
+
+    Args:
+        patterns (list, optional): fnmatch patterns selecting benchmarks
+        repeat (int): Timed repeats per benchmark
+        warmup (int): Untimed warmup calls per benchmark
+        progress (callable, optional): Called with (name, summary or exception)
+
+    Returns:
+        dict: {'environment': ..., 'benchmarks': {name: summary}}
+    """
+    results = {}
+    for bench in select_benchmarks(patterns):
+        try:
+            prepared = bench.setup()
+            run, items = prepared if isinstance(prepared, tuple) else (prepared, bench.items)
+            timings = measure(run, repeat, bench.number, warmup)
+            results[bench.name] = summarize(timings, items)
+            outcome = results[bench.name]
+        except Exception as e:
+            results[bench.name] = {'error': f"{type(e).__name__}: {e}"}
+            outcome = e
+        if progress:
+            progress(bench.name, outcome)
+
+    return {
+        'environment': environment_info(),
+        'settings': {'repeat': repeat, 'warmup': warmup},
+        'benchmarks': results
+    }
+
+
+def environment_info():
+    """Interpreter, library and machine details stored with the results"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor() or None,
+        'cpu_count': os.cpu_count()
+    }
+
+
+def save_results(results, path=DEFAULT_RESULTS_FILE):
+    """Write benchmark results as JSON, creating the directory if needed"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_results(path):
+    """Read benchmark results written by save_results"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare median timings against a baseline
+
+    Args:
+        baseline (dict): Results loaded from the baseline file
+        current (dict): Results of the run being checked
+        threshold (float): Relative median slowdown flagged as a regression
+
+    Returns:
+        list: One dict per benchmark with 'name', 'baseline', 'current',
+            'change' (relative median change) and 'status', which is
+            'regression', 'improvement', 'ok', 'new', 'missing' or 'error'
+    """
+    base = baseline.get('benchmarks', {})
+    cur = current.get('benchmarks', {})
+    rows = []
+
+    for name in sorted(set(base) | set(cur)):
+        before = base.get(name)
+        after = cur.get(name)
+        row = {'name': name, 'baseline': None, 'current': None, 'change': None}
+
+        if after is None:
+            row['status'] = 'missing'
+        elif 'error' in after:
+            row['status'] = 'error'
+        elif before is None or 'error' in before:
+            row['current'] = after['median']
+            row['status'] = 'new'
+        else:
+            row['baseline'] = before['median']
+            row['current'] = after['median']
+            row['change'] = after['median'] / before['median'] - 1 if before['median'] > 0 else 0.0
+            if row['change'] > threshold:
+                row['status'] = 'regression'
+            elif row['change'] < -threshold:
+                row['status'] = 'improvement'
+            else:
+                row['status'] = 'ok'
+        rows.append(row)
+
+    return rows
@@ -0,0 +1,308 @@
+"""
+Registered benchmarks for the indicators, the optimizer and the dashboard
+
+Indicator and optimizer benchmarks run on a seeded synthetic minute series,
+so their inputs are identical from run to run. Dashboard benchmarks read the
+Lean outputs stored under backtest-results/.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import atexit
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from itertools import product
+
+import numpy as np
+
+from .harness import REPO_DIR, benchmark
+
+SUPERTREND_DIR = os.path.join(REPO_DIR, 'supertrend-btc')
+DASHBOARD_DIR = os.path.join(REPO_DIR, 'dashboard')
+BACKTEST_RESULTS_DIR = os.path.join(REPO_DIR, 'backtest-results')
+
+for _path in (SUPERTREND_DIR, DASHBOARD_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+STREAM_BARS = 10000
+BATCH_BARS = 200000
+OPTIMIZER_BARS = 50000
+BANK_SYMBOLS = 100
+BANK_BARS = 1000
+TRADES_FILE = os.path.join(BACKTEST_RESULTS_DIR, 'sma-crossover', '1186467672-order-events.json')
+
+
+def synthetic_bars(n, seed=123, start=1704067200):
+    """
+    Seeded random-walk minute bars
+
+    Args:
+        n (int): Number of bars
+        seed (int): Random seed
+        start (int): First bar time as Unix seconds
+
+    Returns:
+        dict: timestamps, open, high, low and close arrays
+    """
+    rng = np.random.default_rng(seed)
+    close = 45000 * np.exp(np.cumsum(rng.normal(0, 0.0008, n)))
+    open_prices = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 15, n)) + 5
+    return {
+        'timestamps': start + 60 * np.arange(n, dtype=np.int64),
+        'open': open_prices,
+        'high': np.maximum(open_prices, close) + spread,
+        'low': np.minimum(open_prices, close) - spread,
+        'close': close
+    }
+
+
+# Indicators
+
+@benchmark('indicator.stream_update', items=STREAM_BARS)
+def stream_update():
+    """SuperTrendIndicator.update, one bar at a time"""
+    from Library.technical_indicators.supertrend import SuperTrendIndicator
+
+    bars = synthetic_bars(STREAM_BARS)
+    rows = list(zip(bars['high'].tolist(), bars['low'].tolist(), bars['close'].tolist()))
+
+    def run():
+        indicator = SuperTrendIndicator(10, 3)
+        update = indicator.update
+        for high, low, close in rows:
+            update(high, low, close)
+
+    return run
+
+
+@benchmark('indicator.batch_compute', items=BATCH_BARS)
+def batch_compute():
+    """SuperTrendIndicator.compute over a whole array"""
+    from Library.technical_indicators.supertrend import SuperTrendIndicator
+
+    bars = synthetic_bars(BATCH_BARS)
+
+    def run():
+        SuperTrendIndicator(10, 3).compute(bars['high'], bars['low'], bars['close'])
+
+    return run
+
+
+@benchmark('indicator.sweep_grid', items=OPTIMIZER_BARS * 16)
+def sweep_grid():
+    """SuperTrendSweep over a 4 x 4 (period, multiplier) grid"""
+    from Library.technical_indicators.supertrend import SuperTrendSweep
+
+    bars = synthetic_bars(OPTIMIZER_BARS)
+    sweep = SuperTrendSweep([7, 10, 14, 21], [2, 3, 5, 7])
+
+    def run():
+        sweep.compute(bars['high'], bars['low'], bars['close'])
+
+    return run
+
+
+@benchmark('indicator.bank_update', items=BANK_SYMBOLS * BANK_BARS)
+def bank_update():
+    """SuperTrendBank.update for 100 symbols per bar"""
+    from Library.technical_indicators.supertrend import SuperTrendBank
+
+    closes = np.stack([synthetic_bars(BANK_BARS, seed=seed)['close']
+                       for seed in range(BANK_SYMBOLS)], axis=1)
+    highs = closes + 20
+    lows = closes - 20
+    symbols = [f"SYM{i}" for i in range(BANK_SYMBOLS)]
+
+    def run():
+        bank = SuperTrendBank(symbols, 10, 3)
+        for i in range(BANK_BARS):
+            bank.update(highs[i], lows[i], closes[i])
+
+    return run
+
+
+# Optimizer
+
+def _evaluator():
+    from local_backtest import LocalBacktestEvaluator
+
+    bars = synthetic_bars(OPTIMIZER_BARS)
+    return LocalBacktestEvaluator(bars['timestamps'], bars['open'], bars['high'],
+                                  bars['low'], bars['close'])
+
+
+@benchmark('optimizer.evaluate_run', items=1)
+def evaluate_run():
+    """LocalBacktestEvaluator.run for one parameter set"""
+    evaluator = _evaluator()
+
+    def run():
+        evaluator.run(atr_period=10, multiplier=0.5)
+
+    return run
+
+
+@benchmark('optimizer.grid_evaluations')
+def grid_evaluations():
+    """SupertrendOptimizer evaluating the default 144-set grid serially"""
+    from optimize import SupertrendOptimizer
+
+    optimizer = SupertrendOptimizer(evaluator=_evaluator())
+    ranges = optimizer.parameter_ranges
+    parameter_sets = [
+        {'atr_period': period, 'multiplier': multiplier,
+         'risk_percent': risk, 'max_position_size': size}
+        for period, multiplier, risk, size in product(
+            ranges['atr_period'], ranges['multiplier'],
+            ranges['risk_percent'], ranges['max_position_size'])
+    ]
+
+    def run():
+        optimizer._evaluate_many(parameter_sets, shared_indicator=True)
+
+    return run, len(parameter_sets)
+
+
+# Dashboard
+
+def _import_dashboard():
+    """Import dashboard/app.py with its info logging silenced"""
+    import app
+
+    app.logger.setLevel(logging.WARNING)
+    return app
+
+
+def _register_dashboard_loaders():
+    """Cold, sidecar and cached load_backtest_results benchmarks per project in backtest-results/"""
+    if not os.path.isdir(BACKTEST_RESULTS_DIR):
+        return
+
+    descriptions = {
+        'cold': ("dashboard.load_backtest_results.{}",
+                 "load_backtest_results for {}, parsing every file"),
+        'sidecar': ("dashboard.load_backtest_results_sidecar.{}",
+                    "load_backtest_results for {}, chart series read from sidecars"),
+        'cached': ("dashboard.load_backtest_results_cached.{}",
+                   "load_backtest_results for {}, served from the cache")
+    }
+
+    for project in sorted(os.listdir(BACKTEST_RESULTS_DIR)):
+        source = os.path.join(BACKTEST_RESULTS_DIR, project)
+        if not os.path.isdir(source):
+            continue
+
+        for mode, (name, description) in descriptions.items():
+            def setup(project=project, source=source, mode=mode):
+                app = _import_dashboard()
+                from result_loader import SIDECAR_DIR
+
+                # Lay the stored results out the way the dashboard expects them
+                staging = tempfile.mkdtemp(prefix='dashboard-bench-')
+                atexit.register(shutil.rmtree, staging, True)
+                backtest_dir = os.path.join(staging, '2025-bench')
+                os.makedirs(backtest_dir)
+                for name in os.listdir(source):
+                    if name.endswith('.json'):
+                        shutil.copy(os.path.join(source, name), backtest_dir)
+
+                manager = app.BacktestDataManager()
+                manager.project_dirs = {project: staging}
+                sidecars = os.path.join(backtest_dir, SIDECAR_DIR)
+
+                def run():
+                    if mode == 'cold':
+                        shutil.rmtree(sidecars, ignore_errors=True)
+                    if mode != 'cached':
+                        manager.cache.clear()
+                    if manager.load_backtest_results(project) is None:
+                        raise RuntimeError(f"no results loaded for {project}")
+
+                return run
+
+            setup.__doc__ = description.format(project)
+            benchmark(name.format(project))(setup)
+
+
+_register_dashboard_loaders()
+
+
+@benchmark('dashboard.analyze_trades')
+def analyze_trades():
+    """TradeAnalytics round trips and summary of the sma-crossover order events"""
+    from trade_analytics import TradeAnalytics
+    with open(TRADES_FILE, 'r') as f:
+        trades = json.load(f)
+
+    def run():
+        TradeAnalytics(trades).summary()
+
+    return run, len(trades)
+
+
+@benchmark('dashboard.lttb_pyramid', items=BATCH_BARS)
+def lttb_pyramid():
+    """DownsamplePyramid build plus a 2000-point full-range selection"""
+    from downsampling import DownsamplePyramid
+
+    bars = synthetic_bars(BATCH_BARS)
+    close = bars['close']
+    rows = np.column_stack([bars['timestamps'], close, close, close, close]).tolist()
+
+    def run():
+        DownsamplePyramid(rows).select(2000)
+
+    return run
+
+
+@benchmark('dashboard.baseline_curves', items=BATCH_BARS)
+def baseline_curves():
+    """Risk-free and benchmark buy-and-hold curves over a minute equity curve"""
+    from baselines import BaselineCurves
+
+    bars = synthetic_bars(BATCH_BARS)
+    close = bars['close']
+    timestamps = bars['timestamps']
+    equity = np.column_stack([timestamps, close, close, close, close]).tolist()
+    benchmark = np.column_stack([timestamps[::1440], close[::1440]]).tolist()
+
+    def run():
+        BaselineCurves(equity, benchmark)
+
+    return run
+
+
+@benchmark('dashboard.compare_projects')
+def compare_projects():
+    """/api/projects/compare over every project in backtest-results/, cache cleared each run"""
+    app = _import_dashboard()
+    manager = app.BacktestDataManager()
+    manager.project_dirs = {}
+
+    staging = tempfile.mkdtemp(prefix='dashboard-bench-')
+    atexit.register(shutil.rmtree, staging, True)
+    for project in sorted(os.listdir(BACKTEST_RESULTS_DIR)):
+        source = os.path.join(BACKTEST_RESULTS_DIR, project)
+        if not os.path.isdir(source):
+            continue
+        backtest_dir = os.path.join(staging, project, '2025-bench')
+        os.makedirs(backtest_dir)
+        for name in os.listdir(source):
+            if name.endswith('.json'):
+                shutil.copy(os.path.join(source, name), backtest_dir)
+        manager.project_dirs[project] = os.path.join(staging, project)
+    projects = list(manager.project_dirs)
+
+    def run():
+        manager.cache.clear()
+        if len(manager.compare_metrics(projects)) != len(projects):
+            raise RuntimeError("missing compare results")
+
+    return run, len(projects)
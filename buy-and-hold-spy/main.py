@@ -1,5 +1,11 @@
 # region imports
 from AlgorithmImports import *
+import os
+import sys
+
+# Shared strategy tools (Lean library project Library/strategy_tools)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Library'))
+from strategy_tools import MinuteDataExporter
 # endregion
 
 class MyProject(QCAlgorithm):
@@ -16,30 +22,24 @@ class MyProject(QCAlgorithm):
 
         # 1-minute data export tracking
         self.minute_data_file = "buyhold_minute_equity_data.csv"
-        self.minute_data_written = False
-        self._write_minute_data_header()
+        self._create_minute_data_exporter()
         self.debug(f"📊 Exporting 1-minute data to: {self.minute_data_file}")
 
-    def _write_minute_data_header(self):
-        """Write CSV header for 1-minute data export."""
-        with open(self.minute_data_file, 'w') as f:
-            f.write("timestamp,datetime_utc,open,high,low,close,volume,portfolio_value,equity\n")
+    def _create_minute_data_exporter(self):
+        """Create the buffered 1-minute data exporter (writes the CSV header)."""
+        formats = [fmt.strip() for fmt in self.get_parameter("minute_export_formats", "csv").split(",")]
+        flush_every = int(self.get_parameter("minute_export_flush_bars", "10000"))
+        self.minute_exporter = MinuteDataExporter(self.minute_data_file, flush_every, formats)
 
     def _export_minute_data(self, data: Slice):
-        """Export 1-minute data to CSV file."""
+        """Buffer 1-minute data for export."""
         symbol = "SPY"
         if symbol not in data:
             return
 
         bar = data[symbol]
-        timestamp = int(bar.end_time.timestamp())
-        portfolio_value = self.Portfolio.total_portfolio_value
-
-        # Write to CSV
-        with open(self.minute_data_file, 'a') as f:
-            f.write(f"{timestamp},{bar.end_time.isoformat()},{bar.open:.2f},"
-                   f"{bar.high:.2f},{bar.low:.2f},{bar.close:.2f},"
-                   f"{bar.volume},{portfolio_value:.2f},{portfolio_value:.2f}\n")
+        # Buffered; rows are written in chunks and at on_end_of_algorithm
+        self.minute_exporter.record_bar(bar, self.Portfolio.total_portfolio_value)
 
     def on_data(self, data: Slice):
         """on_data event is the primary entry point for your algorithm. Each new data point will be pumped in here.
@@ -52,3 +52,7 @@ class MyProject(QCAlgorithm):
         if not self.portfolio.invested:
             self.set_holdings("SPY", 1)
             self.debug("Purchased Stock")
+
+    def on_end_of_algorithm(self):
+        """Write out the remaining buffered minute data."""
+        self.minute_exporter.close()
@@ -17,13 +17,25 @@ Usage:
 
 from flask import Flask, render_template, request, jsonify, send_from_directory
 import os
-import json
+import sys
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Shared market data tools live at the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from marketdata import MarketDataStore, DEFAULT_STORE_DIR
+from marketdata.store import to_timestamp
+from backtest_cache import BacktestCache, POINT_BYTES
+from downsampling import DownsamplePyramid, take_rows
+from baselines import BaselineCurves
+from trade_analytics import TradeAnalytics
+from result_loader import load_result_pieces, loads
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,14 +48,60 @@ DASHBOARD_CONFIG = {
     'title': 'QuantConnect Backtest Dashboard',
     'data_directory': 'sample_data',
     'supported_projects': ['rsi-minutely', 'sma-crossover', 'custom'],
-    'default_project': 'rsi-minutely'
+    'default_project': 'rsi-minutely',
+    'market_data_store': DEFAULT_STORE_DIR,
+    'max_bar_points': 5000,
+    'max_chart_points': 5000,  # Default equity curve points per API response (0: all)
+    'risk_free_rate': 0.05,  # Annual rate of the risk-free baseline curve
+    'result_sidecars': True,  # Keep extracted chart series in <backtest>/.dashboard/
+    'compare_workers': 4,  # Threads loading projects for /api/projects/compare
+    'cache_max_bytes': 512 * 1024 * 1024  # Parsed backtest data kept in memory
+}
+
+
+# Chart series read from Lean result files, as key paths from the document root
+CHART_SERIES_PATHS = {
+    'equity': ('charts', 'Strategy Equity', 'series', 'Equity', 'values'),
+    'benchmark': ('charts', 'Benchmark', 'series', 'Benchmark', 'values')
 }
 
+
+def _read_json(path):
+    """Parse a JSON file (with orjson when installed)"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def _read_chart_series(path):
+    """
+    Strategy Equity and Benchmark chart values of a Lean result file
+
+    Only those values are parsed; see result_loader.
+
+    Returns:
+        dict: {'equity': values or None, 'benchmark': values or None}
+    """
+    series = load_result_pieces(path, CHART_SERIES_PATHS, DASHBOARD_CONFIG['result_sidecars'])
+    return {name: values if isinstance(values, list) else None
+            for name, values in series.items()}
+
+
+def _points_cost(values):
+    """Estimated cache bytes of a parsed chart series"""
+    return POINT_BYTES * len(values) if values else 0
+
+
+def _chart_series_cost(series):
+    """Estimated cache bytes of a _read_chart_series() result"""
+    return sum(_points_cost(values) for values in series.values())
+
+
 class BacktestDataManager:
     """Manage loading and processing of backtest data from multiple projects"""
 
     def __init__(self):
-        self.data_cache = {}
+        # Parsed files and listings, invalidated by file mtime and size
+        self.cache = BacktestCache(DASHBOARD_CONFIG['cache_max_bytes'])
         self.project_dirs = {
             'rsi-minutely': '../rsi-minutely/backtests',
             'sma-crossover': '../sma-crossover/backtests',
@@ -51,55 +109,57 @@ class BacktestDataManager:
             'buy-and-hold-spy': '../buy-and-hold-spy/backtests',
             'custom': '../custom/backtests'
         }
-
-    def load_backtest_results(self, project_name, backtest_id=None):
-        """Load backtest results for a specific project"""
+        self.market_data = MarketDataStore(DASHBOARD_CONFIG['market_data_store'])
+        # Bounded pool shared by compare requests
+        self._compare_pool = ThreadPoolExecutor(max_workers=DASHBOARD_CONFIG['compare_workers'],
+                                                thread_name_prefix='compare')
+
+    def load_backtest_results(self, project_name, backtest_id=None, max_points=None,
+                              start=None, end=None):
+        """
+        Load backtest results for a specific project (served from the cache when unchanged)
+
+        With max_points, the equity and baseline curves are limited to the
+        [start, end] time range (Unix seconds) and LTTB-downsampled to at most
+        max_points points; equity_points_total gives the full curve length.
+        """
         try:
-            project_dir = self.project_dirs.get(project_name)
-            if not project_dir or not os.path.exists(project_dir):
-                return None
-
-            # Get all backtest directories
-            backtest_dirs = [d for d in os.listdir(project_dir)
-                           if d.startswith('2025') and os.path.isdir(os.path.join(project_dir, d))]
-
-            if not backtest_dirs:
-                return None
-
-            # Sort by timestamp (newest first)
-            backtest_dirs.sort(reverse=True)
-
-            # Use specified backtest_id or the latest
-            target_dir = backtest_id if backtest_id else backtest_dirs[0]
-            backtest_path = os.path.join(project_dir, target_dir)
-
-            if not os.path.exists(backtest_path):
+            located = self._backtest_path(project_name, backtest_id)
+            if not located:
                 return None
+            target_dir, backtest_path = located
 
             # Load summary data
-            summary_file = None
-            for file in os.listdir(backtest_path):
-                if file.endswith('-summary.json'):
-                    summary_file = os.path.join(backtest_path, file)
-                    break
-
-            if not summary_file or not os.path.exists(summary_file):
+            summary_file = self._summary_file(backtest_path)
+            if not summary_file:
                 return None
 
-            with open(summary_file, 'r') as f:
-                summary_data = json.load(f)
+            summary_data = self.cache.load(summary_file, _read_json)
 
             # Load additional files
             result_data = self._load_additional_files(backtest_path)
 
+            equity_curve = result_data.get('equity_curve', [])
+            baselines = result_data.get('baselines')
+            indices = None
+            if max_points and equity_curve:
+                indices = self._downsample_indices(result_data['equity_source'], equity_curve,
+                                                   max_points, start, end)
+                equity_curve = take_rows(equity_curve, indices)
+
             return {
                 'summary': summary_data,
                 'project': project_name,
                 'backtest_id': target_dir,
                 'timestamp': target_dir,
                 'trades': result_data.get('trades', []),
-                'equity_curve': result_data.get('equity_curve', []),
-                'buy_hold_curve': result_data.get('buy_hold_curve', []),
+                'equity_curve': equity_curve,
+                'buy_hold_curve': self._baseline_rows(result_data, baselines.primary, indices)
+                                  if baselines else [],
+                'risk_free_curve': self._baseline_rows(result_data, 'risk_free', indices)
+                                   if baselines else [],
+                'baseline': baselines.summary() if baselines else None,
+                'equity_points_total': len(result_data.get('equity_curve', [])),
                 'logs': result_data.get('logs', [])
             }
 
@@ -107,6 +167,53 @@ class BacktestDataManager:
             logger.error(f"Error loading backtest results: {e}")
             return None
 
+    def _backtest_path(self, project_name, backtest_id=None):
+        """
+        Directory of a project's backtest
+
+        Args:
+            project_name (str): Project name
+            backtest_id (str, optional): Backtest directory name (default: the latest)
+
+        Returns:
+            tuple: (backtest_id, path), or None if the project or backtest does not exist
+        """
+        project_dir = self.project_dirs.get(project_name)
+        if not project_dir or not os.path.exists(project_dir):
+            return None
+
+        # Get all backtest directories (sorted by timestamp, oldest first)
+        backtest_dirs = self.cache.subdirectories(project_dir, '2025')
+
+        if not backtest_dirs:
+            return None
+
+        # Use specified backtest_id or the latest; only the project's own
+        # backtest folders are accepted, never a path from the request
+        if backtest_id and backtest_id not in backtest_dirs:
+            return None
+        target_dir = backtest_id if backtest_id else backtest_dirs[-1]
+        backtest_path = os.path.join(project_dir, target_dir)
+
+        if not os.path.exists(backtest_path):
+            return None
+        return target_dir, backtest_path
+
+    def _summary_file(self, backtest_path):
+        """Path of a backtest's summary file, or None"""
+        for file in self.cache.listdir(backtest_path):
+            if file.endswith('-summary.json'):
+                summary_file = os.path.join(backtest_path, file)
+                return summary_file if os.path.exists(summary_file) else None
+        return None
+
+    def _order_events_file(self, backtest_path):
+        """Path of a backtest's order events file, or None"""
+        for file in self.cache.listdir(backtest_path):
+            if file.endswith('-order-events.json'):
+                return os.path.join(backtest_path, file)
+        return None
+
     def _load_additional_files(self, backtest_path):
         """Load additional data files from backtest directory"""
         result = {
@@ -116,52 +223,45 @@ class BacktestDataManager:
         }
 
         try:
+            files = self.cache.listdir(backtest_path)
+
             # Load order events (trade history)
-            for file in os.listdir(backtest_path):
-                if file.endswith('-order-events.json'):
-                    order_file = os.path.join(backtest_path, file)
-                    with open(order_file, 'r') as f:
-                        result['trades'] = json.load(f)
-                    break
+            order_file = self._order_events_file(backtest_path)
+            if order_file:
+                result['trades'] = self.cache.load(order_file, _read_json)
 
             # Load chart data (equity curve) - look for full data file with charts
-            for file in os.listdir(backtest_path):
+            for file in files:
                 # Skip summary files, look for main data files
-                if file.endswith('.json') and not file.endswith('-summary.json') and 'chart' not in file:
+                if (file.endswith('.json') and not file.endswith('-summary.json') and
+                        not file.endswith('-order-events.json') and 'chart' not in file):
                     chart_file = os.path.join(backtest_path, file)
                     try:
-                        with open(chart_file, 'r') as f:
-                            data = json.load(f)
-                            # Check if this file has the full chart data
-                            if 'charts' in data and 'Strategy Equity' in data['charts']:
-                                equity_series = data['charts']['Strategy Equity'].get('series', {})
-                                if 'Equity' in equity_series and 'values' in equity_series['Equity']:
-                                    equity_data = equity_series['Equity']['values']
-                                    # Only use if we have substantial data (not just summary)
-                                    if len(equity_data) > 10:
-                                        result['equity_curve'] = equity_data
-                                        # Calculate buy-and-hold equity curve
-                                        result['buy_hold_curve'] = self._calculate_buy_hold_curve(equity_data)
-                                        logger.info(f"Loaded equity curve with {len(equity_data)} data points from {file}")
-                                        logger.info(f"Calculated buy-and-hold curve with {len(result['buy_hold_curve'])} points")
-                                        break
+                        series = self.cache.load(chart_file, _read_chart_series,
+                                                 'charts', _chart_series_cost)
+                        equity_data = series['equity']
+                        # Only use if we have substantial data (not just summary)
+                        if equity_data and len(equity_data) > 10:
+                            result['equity_curve'] = equity_data
+                            result['equity_source'] = chart_file
+                            result['baselines'] = self._calculate_baselines(chart_file, series)
+                            break
                     except Exception as e:
                         logger.warning(f"Error loading {file}: {e}")
                         continue
 
             # If no equity curve found yet, try summary file as fallback
             if not result['equity_curve']:
-                for file in os.listdir(backtest_path):
+                for file in files:
                     if file.endswith('-summary.json'):
                         summary_file = os.path.join(backtest_path, file)
                         try:
-                            with open(summary_file, 'r') as f:
-                                data = json.load(f)
-                                if 'charts' in data and 'Strategy Equity' in data['charts']:
-                                    equity_series = data['charts']['Strategy Equity'].get('series', {})
-                                    if 'Equity' in equity_series and 'values' in equity_series['Equity']:
-                                        result['equity_curve'] = equity_series['Equity']['values']
-                                        logger.info(f"Loaded equity curve from summary: {len(result['equity_curve'])} points")
+                            series = self.cache.load(summary_file, _read_chart_series,
+                                                     'charts', _chart_series_cost)
+                            if series['equity'] is not None:
+                                result['equity_curve'] = series['equity']
+                                result['equity_source'] = summary_file
+                                result['baselines'] = self._calculate_baselines(summary_file, series)
                         except Exception as e:
                             logger.warning(f"Error loading summary file: {e}")
                         break
@@ -171,62 +271,185 @@ class BacktestDataManager:
 
         return result
 
-    def _calculate_buy_hold_curve(self, equity_data):
-        """Calculate baseline equity curve (cash/bond equivalent with minimal return)"""
-        try:
-            if not equity_data or len(equity_data) < 2:
-                return []
+    def _downsample_indices(self, source, equity_curve, max_points, start=None, end=None):
+        """
+        Indices of at most max_points equity points within [start, end]
+
+        Points are chosen by LTTB on the equity close from a zoom pyramid
+        cached per source file; baseline curves are taken at the same indices.
+        """
+        pyramid = self.cache.derive(
+            source, 'equity_pyramid', lambda: DownsamplePyramid(equity_curve),
+            lambda p: 16 * len(p) + 8 * sum(p.level_sizes()))
+        return pyramid.select(max_points, start, end)
+
+    def _calculate_baselines(self, source, series):
+        """
+        Risk-free and buy-and-hold baselines for a file's equity curve, cached per file
+
+        Args:
+            source (str): Result file the series were read from
+            series (dict): _read_chart_series() result
+
+        Returns:
+            BaselineCurves: Curves aligned with series['equity']
+        """
+        return self.cache.derive(
+            source, 'baselines',
+            lambda: BaselineCurves(series['equity'], series['benchmark'],
+                                   DASHBOARD_CONFIG['risk_free_rate']),
+            lambda baselines: baselines.nbytes())
+
+    def _baseline_rows(self, result_data, kind, indices):
+        """
+        Rows of one baseline curve at the given indices
+
+        Full curves (indices None) are cached as rows, since every request
+        without a point budget returns them whole.
+        """
+        baselines = result_data['baselines']
+        if indices is not None:
+            return baselines.rows(kind, indices)
+        return self.cache.derive(result_data['equity_source'], f'baseline_rows_{kind}',
+                                 lambda: baselines.rows(kind), _points_cost)
+
+    def backtest_metrics(self, project_name, backtest_id=None):
+        """
+        Headline metrics of a backtest, computed from its summary file alone
+
+        Equity curves and order events are not loaded. The metrics are
+        cached per summary file and recomputed when it changes.
+
+        Returns:
+            dict: calculate_additional_metrics() result, or None if the
+                backtest or its summary does not exist
+        """
+        located = self._backtest_path(project_name, backtest_id)
+        if not located:
+            return None
+        target_dir, backtest_path = located
+        summary_file = self._summary_file(backtest_path)
+        if not summary_file:
+            return None
 
-            # Since we don't have access to the underlying asset price data,
-            # we'll create a conservative baseline comparison
-            # Using a 0% return (cash equivalent) as the most conservative buy-and-hold
+        def compute():
+            return calculate_additional_metrics({
+                'summary': self.cache.load(summary_file, _read_json),
+                'project': project_name,
+                'backtest_id': target_dir
+            })
+
+        return self.cache.derive(summary_file, 'metrics', compute, 2048)
+
+    def compare_metrics(self, project_names):
+        """
+        Metrics of several projects' latest backtests, loaded concurrently
+
+        Args:
+            project_names (list): Project names (duplicates and blanks are ignored)
+
+        Returns:
+            list: Metrics in request order, skipping projects without results
+        """
+        names = list(dict.fromkeys(name for name in project_names if name))
+        if len(names) <= 1:
+            results = [self.backtest_metrics(name) for name in names]
+        else:
+            results = list(self._compare_pool.map(self.backtest_metrics, names))
+        return [metrics for metrics in results if metrics]
+
+    def analyze_trades(self, project_name, backtest_id=None):
+        """
+        Order events and round-trip analytics of a backtest
+
+        The analysis is cached per order events file; MAE/MFE use minute bars
+        from the market data store when it holds the traded symbols.
+
+        Returns:
+            dict: {'trades': order events, 'summary': statistics, 'round_trips': list},
+                or None if the backtest does not exist
+        """
+        located = self._backtest_path(project_name, backtest_id)
+        if not located:
+            return None
+        order_file = self._order_events_file(located[1])
+        if not order_file:
+            return {'trades': [], 'summary': {}, 'round_trips': []}
 
-            initial_capital = 100000  # Standard backtest starting capital
-            annual_risk_free_rate = 0.05  # Assume 5% risk-free rate (conservative)
+        trades = self.cache.load(order_file, _read_json)
 
-            buy_hold_curve = []
+        def compute():
+            analytics = TradeAnalytics(trades, self._trade_price_path)
+            return {'summary': analytics.summary(), 'round_trips': analytics.round_trips()}
 
-            for i, point in enumerate(equity_data):
-                timestamp = point[0]
+        analysis = self.cache.derive(order_file, 'trade_analytics', compute,
+                                     lambda value: 4096 + 400 * len(value['round_trips']))
+        return {'trades': trades, **analysis}
 
-                # Calculate days since start
-                if i == 0:
-                    days_elapsed = 0
-                else:
-                    days_elapsed = (timestamp - equity_data[0][0]) / (24 * 3600)
+    def _trade_price_path(self, symbol, start, end):
+        """
+        Minute highs and lows of a symbol between two order event times
 
-                # Simple compounding: P * (1 + r)^t
-                # Where r is daily rate and t is days
-                daily_rate = annual_risk_free_rate / 365
-                years = days_elapsed / 365
-                buy_hold_equity = initial_capital * ((1 + annual_risk_free_rate) ** years)
+        Store timestamps are wall-clock times encoded as UTC (see
+        marketdata.store); they are converted to the order events' UTC clock.
 
-                buy_hold_curve.append([timestamp, buy_hold_equity])
+        Returns:
+            tuple: (times, highs, lows) arrays, or None if the symbol is not stored
+        """
+        if not self.market_data.has_symbol(symbol):
+            return None
+        time_zone = self.market_data.metadata(symbol).get('time_zone') or 'UTC'
+
+        bounds = pd.to_datetime([start, end], unit='s', utc=True)
+        if time_zone != 'UTC':
+            bounds = bounds.tz_convert(time_zone).tz_localize(None).tz_localize('UTC')
+        bars = self.market_data.read(symbol, int(bounds[0].timestamp()), int(bounds[1].timestamp()) + 1,
+                                     columns=('timestamp', 'high', 'low'))
+        times = np.asarray(bars['timestamp'])
+        highs = np.asarray(bars['high'])
+        lows = np.asarray(bars['low'])
+        if time_zone != 'UTC':
+            # Wall-clock times skipped or repeated by DST changes are dropped
+            local = pd.to_datetime(times, unit='s').tz_localize(time_zone, ambiguous='NaT',
+                                                                 nonexistent='NaT')
+            keep = ~local.isna()
+            times = np.asarray((local[keep] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1))
+            highs = highs[keep]
+            lows = lows[keep]
+        return times.astype(np.float64), highs, lows
+
+    def load_price_bars(self, symbol, start=None, end=None, max_points=None):
+        """Load OHLCV bars for a time range from the columnar market data store"""
+        if not self.market_data.has_symbol(symbol):
+            return None
 
-            final_return = ((buy_hold_curve[-1][1] / initial_capital) - 1) * 100
-            logger.info(f"Calculated baseline (5% risk-free): Start=${initial_capital:,.2f}, End=${buy_hold_curve[-1][1]:,.2f}")
-            logger.info(f"Baseline return: {final_return:.2f}%")
-            logger.info("Note: Using risk-free rate as conservative buy-and-hold comparison")
+        max_points = max_points or DASHBOARD_CONFIG['max_bar_points']
+        bars = self.market_data.read(symbol, start, end)
 
-            return buy_hold_curve
+        # Thin long ranges to at most max_points bars with a fixed stride
+        rows = len(bars['timestamp'])
+        step = max(1, -(-rows // max_points))
+        columns = {name: values[::step] for name, values in bars.items()}
 
-        except Exception as e:
-            logger.error(f"Error calculating baseline curve: {e}")
-            return []
+        return {
+            'symbol': symbol.lower(),
+            'rows': rows,
+            'step': step,
+            'bars': np.column_stack([columns[name] for name in
+                                     ('timestamp', 'open', 'high', 'low', 'close', 'volume')]).tolist()
+        }
 
     def list_available_projects(self):
         """List all projects with available backtest data"""
         projects = []
         for project_name, project_dir in self.project_dirs.items():
-            if os.path.exists(project_dir):
-                backtest_dirs = [d for d in os.listdir(project_dir)
-                              if d.startswith('2025') and os.path.isdir(os.path.join(project_dir, d))]
-                if backtest_dirs:
-                    projects.append({
-                        'name': project_name,
-                        'backtests_count': len(backtest_dirs),
-                        'latest_backtest': max(backtest_dirs) if backtest_dirs else None
-                    })
+            backtest_dirs = self.cache.subdirectories(project_dir, '2025')
+            if backtest_dirs:
+                projects.append({
+                    'name': project_name,
+                    'backtests_count': len(backtest_dirs),
+                    'latest_backtest': backtest_dirs[-1]
+                })
         return projects
 
 # Initialize data manager
@@ -256,10 +479,27 @@ def compare_projects():
                          projects=projects,
                          config=DASHBOARD_CONFIG)
 
+def _query_timestamp(name):
+    """Unix seconds from a query argument given as seconds or a date string"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    if value.lstrip('-').isdigit():
+        return int(value)
+    return to_timestamp(value)
+
+
+def _chart_query_args():
+    """(max_points, start, end) from the points/start/end query arguments"""
+    max_points = request.args.get('points', DASHBOARD_CONFIG['max_chart_points'], type=int)
+    return max(max_points or 0, 0), _query_timestamp('start'), _query_timestamp('end')
+
+
 @app.route('/project/<project_name>')
 def project_dashboard(project_name):
     """Project-specific dashboard"""
-    backtest_data = data_manager.load_backtest_results(project_name)
+    backtest_data = data_manager.load_backtest_results(
+        project_name, max_points=DASHBOARD_CONFIG['max_chart_points'])
     if not backtest_data:
         return f"No backtest data found for project: {project_name}", 404
 
@@ -278,22 +518,56 @@ def api_projects():
 
 @app.route('/api/project/<project_name>/data')
 def api_project_data(project_name):
-    """API endpoint to get backtest data for a project"""
-    backtest_data = data_manager.load_backtest_results(project_name)
+    """
+    API endpoint to get backtest data for a project
+
+    Query arguments: points (equity curve points, default max_chart_points,
+    0 for all), start and end (Unix seconds or dates) limiting the curves.
+    """
+    try:
+        max_points, start, end = _chart_query_args()
+    except ValueError as e:
+        return jsonify({'error': f'Invalid time range: {e}'}), 400
+
+    backtest_data = data_manager.load_backtest_results(project_name, max_points=max_points,
+                                                       start=start, end=end)
     if not backtest_data:
         return jsonify({'error': 'No data found'}), 404
 
     return jsonify(backtest_data)
 
+@app.route('/api/project/<project_name>/equity')
+def api_project_equity(project_name):
+    """API endpoint for the downsampled equity and baseline curves of a time range (chart zoom)"""
+    try:
+        max_points, start, end = _chart_query_args()
+    except ValueError as e:
+        return jsonify({'error': f'Invalid time range: {e}'}), 400
+
+    backtest_data = data_manager.load_backtest_results(project_name, max_points=max_points,
+                                                       start=start, end=end)
+    if not backtest_data:
+        return jsonify({'error': 'No data found'}), 404
+
+    return jsonify({
+        'project': project_name,
+        'backtest_id': backtest_data['backtest_id'],
+        'equity_curve': backtest_data['equity_curve'],
+        'buy_hold_curve': backtest_data['buy_hold_curve'],
+        'risk_free_curve': backtest_data['risk_free_curve'],
+        'baseline': backtest_data['baseline'],
+        'equity_points_total': backtest_data['equity_points_total'],
+        'start': start,
+        'end': end
+    })
+
 @app.route('/api/project/<project_name>/metrics')
 def api_project_metrics(project_name):
     """API endpoint to get calculated metrics for a project"""
-    backtest_data = data_manager.load_backtest_results(project_name)
-    if not backtest_data:
+    metrics = data_manager.backtest_metrics(project_name)
+    if metrics is None:
         return jsonify({'error': 'No data found'}), 404
 
-    # Calculate additional metrics
-    metrics = calculate_additional_metrics(backtest_data)
     return jsonify(metrics)
 
 @app.route('/api/projects/compare')
@@ -304,13 +578,7 @@ def api_compare_projects():
         return jsonify({'error': 'No projects specified'}), 400
 
     project_names = [p.strip() for p in projects_param.split(',')]
-    comparison_data = []
-
-    for project_name in project_names:
-        backtest_data = data_manager.load_backtest_results(project_name)
-        if backtest_data:
-            metrics = calculate_additional_metrics(backtest_data)
-            comparison_data.append(metrics)
+    comparison_data = data_manager.compare_metrics(project_names)
 
     return jsonify({
         'projects': comparison_data,
@@ -319,21 +587,35 @@ def api_compare_projects():
 
 @app.route('/api/project/<project_name>/trades')
 def api_project_trades(project_name):
-    """API endpoint to get trade analysis for a project"""
-    backtest_data = data_manager.load_backtest_results(project_name)
-    if not backtest_data:
+    """API endpoint to get trade analysis for a project (FIFO round trips and their statistics)"""
+    analysis = data_manager.analyze_trades(project_name, request.args.get('backtest_id'))
+    if analysis is None:
         return jsonify({'error': 'No data found'}), 404
 
-    trades = backtest_data.get('trades', [])
-    if not trades:
-        return jsonify({'trades': [], 'summary': {}})
+    if not analysis['trades']:
+        return jsonify({'trades': [], 'summary': {}, 'round_trips': []})
 
-    # Analyze trades
-    trade_summary = analyze_trades(trades)
-    return jsonify({
-        'trades': trades,
-        'summary': trade_summary
-    })
+    return jsonify(analysis)
+
+@app.route('/api/market-data/symbols')
+def api_market_data_symbols():
+    """API endpoint to list symbols in the market data store"""
+    return jsonify({'symbols': data_manager.market_data.symbols()})
+
+@app.route('/api/market-data/<symbol>')
+def api_market_data(symbol):
+    """API endpoint to get OHLCV bars for a symbol and time range"""
+    try:
+        start, end = _query_timestamp('start'), _query_timestamp('end')
+    except ValueError as e:
+        return jsonify({'error': f'Invalid time range: {e}'}), 400
+    max_points = request.args.get('max_points', type=int)
+
+    bars = data_manager.load_price_bars(symbol, start, end, max_points)
+    if bars is None:
+        return jsonify({'error': f'No market data stored for {symbol}'}), 404
+
+    return jsonify(bars)
 
 @app.route('/api/health')
 def api_health():
@@ -341,7 +623,8 @@ def api_health():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'cache': data_manager.cache.stats()
     })
 
 @app.route('/test-chart')
@@ -365,6 +648,7 @@ def calculate_additional_metrics(backtest_data):
 
         # Basic metrics from summary
         portfolio_stats = summary.get('totalPerformance', {}).get('portfolioStatistics', {})
+        trade_stats = summary.get('totalPerformance', {}).get('tradeStatistics', {})
 
         metrics = {
             'project_name': backtest_data['project'],
@@ -378,9 +662,9 @@ def calculate_additional_metrics(backtest_data):
             'max_drawdown': portfolio_stats.get('drawdown', 0),
 
             # Trade metrics
-            'total_trades': len(backtest_data.get('trades', [])),
+            'total_trades': trade_stats.get('totalNumberOfTrades', 0),
             'win_rate': portfolio_stats.get('winRate', 0),
-            'profit_factor': summary.get('totalPerformance', {}).get('tradeStatistics', {}).get('profitFactor', 0),
+            'profit_factor': trade_stats.get('profitFactor', 0),
 
             # Risk metrics
             'volatility': portfolio_stats.get('annualStandardDeviation', 0),
@@ -392,8 +676,8 @@ def calculate_additional_metrics(backtest_data):
             'total_fees': portfolio_stats.get('totalFees', 0),
 
             # Time period
-            'start_date': summary.get('totalPerformance', {}).get('tradeStatistics', {}).get('startDateTime', ''),
-            'end_date': summary.get('totalPerformance', {}).get('tradeStatistics', {}).get('endDateTime', ''),
+            'start_date': trade_stats.get('startDateTime', ''),
+            'end_date': trade_stats.get('endDateTime', ''),
         }
 
         return metrics
@@ -402,82 +686,6 @@ def calculate_additional_metrics(backtest_data):
         logger.error(f"Error calculating metrics: {e}")
         return {}
 
-def analyze_trades(trades):
-    """Analyze trade data and return summary statistics"""
-    try:
-        # Process filled trades
-        filled_trades = [t for t in trades if t.get('status') == 'filled']
-
-        if not filled_trades:
-            return {
-                'total_trades': 0,
-                'winning_trades': 0,
-                'losing_trades': 0,
-                'win_rate': 0,
-                'avg_win': 0,
-                'avg_loss': 0,
-                'profit_factor': 0
-            }
-
-        # Group trades by orderId
-        trade_pairs = {}
-        for trade in filled_trades:
-            order_id = trade.get('orderId')
-            if order_id not in trade_pairs:
-                trade_pairs[order_id] = []
-            trade_pairs[order_id].append(trade)
-
-        # Calculate P&L for completed trades
-        completed_trades = []
-        for order_id, trade_list in trade_pairs.items():
-            if len(trade_list) == 2:  # Entry and exit
-                entry_trade = trade_list[0] if trade_list[0]['direction'] == 'buy' else trade_list[1]
-                exit_trade = trade_list[1] if trade_list[1]['direction'] == 'sell' else trade_list[0]
-
-                quantity = entry_trade.get('fillQuantity', 0)
-                entry_price = entry_trade.get('fillPrice', 0)
-                exit_price = exit_trade.get('fillPrice', 0)
-
-                pnl = (exit_price - entry_price) * quantity if entry_trade['direction'] == 'buy' else (entry_price - exit_price) * quantity
-
-                completed_trades.append({
-                    'entry_time': entry_trade.get('time'),
-                    'exit_time': exit_trade.get('time'),
-                    'symbol': entry_trade.get('symbolValue'),
-                    'quantity': quantity,
-                    'entry_price': entry_price,
-                    'exit_price': exit_price,
-                    'pnl': pnl,
-                    'direction': entry_trade['direction']
-                })
-
-        # Calculate statistics
-        winning_trades = [t for t in completed_trades if t['pnl'] > 0]
-        losing_trades = [t for t in completed_trades if t['pnl'] < 0]
-
-        total_pnl = sum(t['pnl'] for t in completed_trades)
-        total_wins = sum(t['pnl'] for t in winning_trades)
-        total_losses = abs(sum(t['pnl'] for t in losing_trades))
-
-        return {
-            'total_trades': len(completed_trades),
-            'winning_trades': len(winning_trades),
-            'losing_trades': len(losing_trades),
-            'win_rate': len(winning_trades) / len(completed_trades) if completed_trades else 0,
-            'avg_win': total_wins / len(winning_trades) if winning_trades else 0,
-            'avg_loss': total_losses / len(losing_trades) if losing_trades else 0,
-            'profit_factor': total_wins / total_losses if total_losses > 0 else float('inf'),
-            'total_pnl': total_pnl,
-            'total_wins': total_wins,
-            'total_losses': total_losses,
-            'largest_win': max(t['pnl'] for t in completed_trades) if completed_trades else 0,
-            'largest_loss': min(t['pnl'] for t in completed_trades) if completed_trades else 0
-        }
-
-    except Exception as e:
-        logger.error(f"Error analyzing trades: {e}")
-        return {}
-
 @app.template_filter('format_percentage')
 def format_percentage(value):
     """Format number as percentage"""
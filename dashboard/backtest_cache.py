@@ -0,0 +1,224 @@
+"""
+In-memory cache of parsed backtest result files for the dashboard
+
+Parsed pieces (summaries, equity curves, trades, derived curves) are keyed
+by file path and validated against the file's (mtime_ns, size) on every
+lookup, so an updated or replaced file is re-read on the next request.
+Entries are evicted least recently used once their estimated size exceeds
+the memory budget. Directory listings are cached by directory mtime,
+which changes whenever a backtest folder or result file is added or removed.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+# Rough ratio of the memory held by parsed Python objects to the JSON bytes
+# they were parsed from; used to charge cache entries against the budget
+PARSED_JSON_OVERHEAD = 8
+
+# Approximate bytes held by one parsed [timestamp, value] chart point
+POINT_BYTES = 160
+
+_MISSING = object()
+
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class LRUCache:
+    """
+    Least-recently-used mapping bounded by the estimated bytes of its values
+
+    Each entry stores the signature it was computed for; a lookup with a
+    different signature counts as a miss and the stale entry is dropped.
+    """
+
+    def __init__(self, max_bytes):
+        """
+        Args:
+            max_bytes (int): Memory budget for the estimated entry sizes
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, signature):
+        """Cached value for key computed at signature, or _MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, signature, value, cost):
+        """
+        Store a value, evicting least recently used entries over the budget
+
+        Values larger than the whole budget are not stored.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if cost > self.max_bytes:
+                return
+            self._entries[key] = (signature, value, cost)
+            self.total_bytes += cost
+            while self.total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        self.total_bytes -= self._entries.pop(key)[2]
+
+    def clear(self):
+        """Drop every entry (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Hit/miss/eviction counts and current memory use"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'estimated_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class BacktestCache:
+    """
+    File-level cache used by BacktestDataManager
+
+    load() parses a file once per (mtime, size) and derive() caches values
+    computed from a file (e.g. a baseline curve from an equity file).
+    Cached objects are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        """
+        Args:
+            max_bytes (int): Memory budget for parsed and derived values
+        """
+        self.entries = LRUCache(max_bytes)
+        self._listings = {}
+        self._listings_lock = threading.Lock()
+
+    def listdir(self, path):
+        """
+        Sorted directory entries, re-read only when the directory's mtime changes
+
+        Returns:
+            list: Entry names (empty if the directory does not exist)
+        """
+        signature = file_signature(path)
+        if signature is None:
+            return []
+        with self._listings_lock:
+            cached = self._listings.get(path)
+            if cached is not None and cached[0] == signature[0]:
+                return cached[1]
+        names = sorted(os.listdir(path))
+        with self._listings_lock:
+            self._listings[path] = (signature[0], names)
+        return names
+
+    def subdirectories(self, path, prefix=''):
+        """Sorted subdirectory names starting with prefix, cached like listdir()"""
+        key = ('subdirectories', path, prefix)
+        signature = file_signature(path)
+        if signature is None:
+            return []
+        value = self.entries.get(key, signature[0])
+        if value is _MISSING:
+            value = [name for name in self.listdir(path)
+                     if name.startswith(prefix) and os.path.isdir(os.path.join(path, name))]
+            self.entries.put(key, signature[0], value, 64 * len(value))
+        return value
+
+    def load(self, path, parse, kind='json', cost=None):
+        """
+        Parsed content of a file, cached by path, kind and file signature
+
+        Args:
+            path (str): File path
+            parse (callable): Reads the file at path and returns the value to cache
+            kind (str): Distinguishes different extracts of the same file
+            cost (callable, optional): Estimated bytes of a parsed value
+                (default: file size times PARSED_JSON_OVERHEAD)
+
+        Returns:
+            Parsed value (None values are cached too)
+        """
+        signature = file_signature(path)
+        key = (kind, path)
+        value = self.entries.get(key, signature)
+        if value is _MISSING:
+            value = parse(path)
+            if cost is not None:
+                size = cost(value)
+            else:
+                size = (signature[1] if signature else 0) * PARSED_JSON_OVERHEAD
+            self.entries.put(key, signature, value, size)
+        return value
+
+    def derive(self, path, kind, compute, cost):
+        """
+        Value computed from a file, recomputed when the file changes
+
+        Args:
+            path (str): Source file path
+            kind (str): Name of the derived value
+            compute (callable): Zero-argument function producing the value
+            cost (int or callable): Estimated bytes held by the value, or a
+                function of the value returning them
+
+        Returns:
+            Computed value
+        """
+        signature = file_signature(path)
+        key = (kind, path)
+        value = self.entries.get(key, signature)
+        if value is _MISSING:
+            value = compute()
+            self.entries.put(key, signature, value, cost(value) if callable(cost) else cost)
+        return value
+
+    def clear(self):
+        """Drop every cached value and listing"""
+        self.entries.clear()
+        with self._listings_lock:
+            self._listings.clear()
+
+    def stats(self):
+        """Cache statistics for monitoring"""
+        stats = self.entries.stats()
+        stats['listings'] = len(self._listings)
+        return stats
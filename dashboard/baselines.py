@@ -0,0 +1,153 @@
+"""
+Baseline curves the dashboard plots against a strategy's equity curve
+
+Both baselines are evaluated at the equity curve's timestamps in single
+array operations:
+
+- risk-free: the starting capital compounded at an annual rate
+- buy-and-hold: the starting capital invested in the benchmark at the
+  first equity timestamp, valued with the latest benchmark price at or
+  before each timestamp (Lean's Benchmark chart series)
+
+Curves are kept as arrays; [timestamp, value] rows are only built for the
+points a response actually contains.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import numpy as np
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+DEFAULT_RISK_FREE_RATE = 0.05
+
+BASELINE_LABELS = {
+    'buy_hold': 'Buy & Hold (Benchmark)',
+    'risk_free': 'Baseline ({:g}% Risk-Free)'
+}
+
+
+def risk_free_curve(times, initial_capital, annual_rate=DEFAULT_RISK_FREE_RATE):
+    """
+    Capital compounded at a risk-free rate
+
+    Args:
+        times (np.ndarray): Increasing Unix timestamps
+        initial_capital (float): Value at times[0]
+        annual_rate (float): Annual rate, compounded continuously in time
+
+    Returns:
+        np.ndarray: Value at each timestamp
+    """
+    years = (times - times[0]) / SECONDS_PER_YEAR
+    return initial_capital * np.power(1.0 + annual_rate, years)
+
+
+def buy_hold_curve(times, benchmark_values, initial_capital):
+    """
+    Capital invested in the benchmark at times[0] and held
+
+    Args:
+        times (np.ndarray): Increasing Unix timestamps
+        benchmark_values (list): Benchmark chart points as [timestamp, price, ...]
+        initial_capital (float): Value at times[0]
+
+    Returns:
+        np.ndarray or None: Value at each timestamp, or None when the
+            benchmark has no positive prices (e.g. no benchmark data was loaded)
+    """
+    if not benchmark_values:
+        return None
+    points = np.array([point[:2] for point in benchmark_values], dtype=np.float64)
+    points = points[points[:, 1] > 0]
+    if len(points) == 0:
+        return None
+    points = points[np.argsort(points[:, 0], kind='stable')]
+
+    # Latest benchmark price at or before each timestamp; timestamps before
+    # the first price use the first price
+    positions = np.searchsorted(points[:, 0], times, side='right') - 1
+    prices = points[np.maximum(positions, 0), 1]
+    return initial_capital * prices / prices[0]
+
+
+class BaselineCurves:
+    """
+    Risk-free and buy-and-hold curves aligned with an equity curve
+
+    The buy-and-hold curve is the primary baseline when the benchmark has
+    prices; otherwise the risk-free curve is.
+    """
+
+    def __init__(self, equity_curve, benchmark_values=None,
+                 annual_rate=DEFAULT_RISK_FREE_RATE):
+        """
+        Args:
+            equity_curve (list): Equity points as [timestamp, ..., close]
+            benchmark_values (list, optional): Benchmark chart points
+            annual_rate (float): Risk-free rate
+        """
+        self.annual_rate = annual_rate
+        # Timestamps are returned as given (ints in Lean charts)
+        self.timestamps = [point[0] for point in equity_curve] if equity_curve else []
+        self.curves = {}
+        self.initial_capital = None
+
+        if len(self.timestamps) < 2:
+            self.primary = None
+            return
+
+        times = np.array(self.timestamps, dtype=np.float64)
+        self.initial_capital = float(equity_curve[0][-1])
+        self.curves['risk_free'] = risk_free_curve(times, self.initial_capital, annual_rate)
+        buy_hold = buy_hold_curve(times, benchmark_values, self.initial_capital)
+        if buy_hold is not None:
+            self.curves['buy_hold'] = buy_hold
+        self.primary = 'buy_hold' if buy_hold is not None else 'risk_free'
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def rows(self, kind=None, indices=None):
+        """
+        [timestamp, value] rows of one curve
+
+        Args:
+            kind (str, optional): 'risk_free' or 'buy_hold' (default: the primary baseline)
+            indices (np.ndarray, optional): Points to return (default: all)
+
+        Returns:
+            list: Rows, empty when the curve is not available
+        """
+        values = self.curves.get(kind or self.primary)
+        if values is None:
+            return []
+        if indices is None:
+            return [[t, v] for t, v in zip(self.timestamps, values.tolist())]
+        timestamps = self.timestamps
+        return [[timestamps[i], v] for i, v in zip(indices.tolist(), values[indices].tolist())]
+
+    def label(self, kind=None):
+        """Legend label of a curve"""
+        return BASELINE_LABELS.get(kind or self.primary, '').format(self.annual_rate * 100)
+
+    def summary(self):
+        """
+        Primary baseline type and the total return of each curve
+
+        Returns:
+            dict: {'type', 'label', 'annual_rate', 'initial_capital', 'returns'}
+        """
+        return {
+            'type': self.primary,
+            'label': self.label() if self.primary else '',
+            'annual_rate': self.annual_rate,
+            'initial_capital': self.initial_capital,
+            'returns': {kind: float(values[-1] / values[0] - 1)
+                        for kind, values in self.curves.items()}
+        }
+
+    def nbytes(self):
+        """Estimated memory held, for the cache budget"""
+        return 8 * len(self.timestamps) + sum(values.nbytes for values in self.curves.values())
@@ -0,0 +1,179 @@
+"""
+Shape-preserving downsampling of chart series for the dashboard API
+
+Largest-Triangle-Three-Buckets (LTTB) keeps the first and last points and,
+for each bucket in between, the point forming the largest triangle with
+the previously kept point and the average of the next bucket. Peaks and
+troughs survive, which a fixed stride would drop.
+
+A DownsamplePyramid holds a series at several zoom levels, each a quarter
+of the size of the one below. A request for a time range and a point
+budget is served from the coarsest level that still has enough points in
+that range. Only that slice is reduced further, so the work per request
+does not grow with the length of the backtest.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import numpy as np
+
+# Each pyramid level holds about 1/LEVEL_FACTOR of the points of the level below
+LEVEL_FACTOR = 4
+
+# Levels are built down to about this many points
+MIN_LEVEL_POINTS = 500
+
+# Buckets narrower than this are scanned with Python floats instead of
+# NumPy slices, whose per-call overhead dominates for a few points
+SCALAR_BUCKET_WIDTH = 16
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps
+
+    Args:
+        x (np.ndarray): Increasing x values (timestamps)
+        y (np.ndarray): Values
+        threshold (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Sorted int64 indices into x and y
+    """
+    n = len(x)
+    if threshold >= n or threshold <= 0:
+        return np.arange(n, dtype=np.int64)
+    if threshold < 3:
+        return np.array([0, n - 1][:threshold], dtype=np.int64)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bucket edges over the interior points 1 .. n-2
+    every = (n - 2) / (threshold - 2)
+    edges = 1 + np.floor(np.arange(threshold - 1) * every).astype(np.int64)
+    edges[-1] = n - 1
+
+    # Next-bucket averages for every bucket, from cumulative sums
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    next_start = np.append(edges[1:-1], n - 1)
+    next_end = np.append(edges[2:], n)
+    counts = next_end - next_start
+    avg_x = (cum_x[next_end] - cum_x[next_start]) / counts
+    avg_y = (cum_y[next_end] - cum_y[next_start]) / counts
+
+    if every < SCALAR_BUCKET_WIDTH:
+        kept = _select_scalar(x.tolist(), y.tolist(), edges.tolist(),
+                              avg_x.tolist(), avg_y.tolist())
+        return np.array(kept, dtype=np.int64)
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+    for bucket in range(threshold - 2):
+        start = edges[bucket]
+        end = edges[bucket + 1]
+        ax = x[a]
+        ay = y[a]
+        # Twice the triangle area for every candidate in the bucket
+        area = np.abs((ax - avg_x[bucket]) * (y[start:end] - ay) -
+                      (ax - x[start:end]) * (avg_y[bucket] - ay))
+        a = start + int(np.argmax(area))
+        kept[bucket + 1] = a
+    return kept
+
+
+def _select_scalar(x, y, edges, avg_x, avg_y):
+    """LTTB bucket loop over Python floats, for narrow buckets"""
+    kept = [0]
+    a = 0
+    for bucket in range(len(edges) - 1):
+        ax = x[a]
+        ay = y[a]
+        dx = ax - avg_x[bucket]
+        dy = avg_y[bucket] - ay
+        best = -1.0
+        for j in range(edges[bucket], edges[bucket + 1]):
+            area = abs(dx * (y[j] - ay) - (ax - x[j]) * dy)
+            if area > best:
+                best = area
+                a = j
+        kept.append(a)
+    kept.append(len(x) - 1)
+    return kept
+
+
+class DownsamplePyramid:
+    """
+    A chart series precomputed at several LTTB zoom levels
+
+    Rows are kept whole (e.g. [time, open, high, low, close] equity points),
+    selected by LTTB on the value column.
+    """
+
+    def __init__(self, rows, value_column=-1, min_level_points=MIN_LEVEL_POINTS,
+                 level_factor=LEVEL_FACTOR):
+        """
+        Args:
+            rows (list): Points as [timestamp, ...values] lists
+            value_column (int): Column LTTB preserves the shape of
+            min_level_points (int): Size of the coarsest level
+            level_factor (int): Size ratio between consecutive levels
+        """
+        self.rows = rows
+        self.value_column = value_column
+        self.x = np.array([row[0] for row in rows], dtype=np.float64)
+        self.y = np.array([row[value_column] for row in rows], dtype=np.float64)
+
+        # Each level is an index array into rows, finest (all points) first
+        self.levels = [np.arange(len(rows), dtype=np.int64)]
+        while len(self.levels[-1]) > min_level_points * level_factor:
+            finer = self.levels[-1]
+            coarser = lttb_indices(self.x[finer], self.y[finer], len(finer) // level_factor)
+            self.levels.append(finer[coarser])
+        self._level_times = [self.x[level] for level in self.levels]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def select(self, max_points, start=None, end=None):
+        """
+        Indices of at most max_points rows within [start, end]
+
+        Args:
+            max_points (int): Point budget for the response
+            start (float, optional): First timestamp to include
+            end (float, optional): Last timestamp to include
+
+        Returns:
+            np.ndarray: Sorted indices into rows
+        """
+        for depth in range(len(self.levels) - 1, -1, -1):
+            level = self.levels[depth]
+            first, last = self._range(self._level_times[depth], start, end)
+            if last - first >= max_points:
+                break
+
+        indices = level[first:last]
+        if len(indices) > max_points:
+            indices = indices[lttb_indices(self.x[indices], self.y[indices], max_points)]
+        return indices
+
+    @staticmethod
+    def _range(times, start, end):
+        """Slice bounds of a level's timestamps covering [start, end]"""
+        first = 0 if start is None else int(np.searchsorted(times, start, side='left'))
+        last = len(times) if end is None else int(np.searchsorted(times, end, side='right'))
+        return first, last
+
+    def level_sizes(self):
+        """Number of points at each zoom level, finest first"""
+        return [len(level) for level in self.levels]
+
+
+def take_rows(rows, indices):
+    """Rows at the given indices, as a list"""
+    return [rows[i] for i in indices.tolist()]
@@ -0,0 +1,300 @@
+"""
+Selective loading of large Lean result files for the dashboard
+
+A Lean result file holds the orders, rolling windows and every chart of a
+backtest, while the dashboard only needs a few chart series. Instead of
+parsing the whole document, the file is scanned in chunks to index its
+structure: the position and nesting level of every bracket, colon and
+comma outside strings, down to a small depth. The scan is vectorized with
+NumPy and carries its string/escape/depth state from one chunk to the
+next, so memory stays bounded by the chunk size. Only the byte ranges of
+the requested values are then parsed, with orjson when it is installed and
+the standard library otherwise.
+
+The extracted values are written to a compact sidecar file next to the
+result, stamped with the result's mtime and size; later loads read the
+sidecar and skip the scan entirely.
+
+Usage:
+    pieces = load_result_pieces(path, {
+        'equity': ('charts', 'Strategy Equity', 'series', 'Equity', 'values')
+    })
+
+Author: Claude Code
+Created: 2024
+"""
+
+import json
+import mmap
+import os
+import threading
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bytes scanned per step of the structural index
+CHUNK_BYTES = 4 * 1024 * 1024
+
+# Sidecars live in this subdirectory of the result file's folder, so the
+# dashboard's *.json scans of the backtest folder do not pick them up
+SIDECAR_DIR = '.dashboard'
+
+SIDECAR_VERSION = 1
+
+_QUOTE = ord('"')
+_BACKSLASH = ord('\\')
+_OPEN_BRACE = ord('{')
+_CLOSE_BRACE = ord('}')
+_OPEN_BRACKET = ord('[')
+_CLOSE_BRACKET = ord(']')
+_COLON = ord(':')
+_COMMA = ord(',')
+
+
+def loads(data):
+    """Parse JSON bytes with the fastest available backend"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value):
+    """Compact JSON bytes with the fastest available backend"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+class StructuralIndex:
+    """
+    Brackets, colons and commas of a JSON document down to a maximum depth
+
+    Tokens are kept as parallel arrays of byte position, character and
+    level, where the root container's brackets and members are level 1.
+    """
+
+    def __init__(self, buffer, max_level, chunk_bytes=CHUNK_BYTES):
+        """
+        Args:
+            buffer (bytes or mmap.mmap): JSON document
+            max_level (int): Deepest level to index
+            chunk_bytes (int): Bytes processed per vectorized step
+        """
+        self.buffer = buffer
+        self.max_level = max_level
+
+        positions, chars, levels = [], [], []
+        in_string = False
+        backslashes = 0
+        depth = 0
+        for offset in range(0, len(buffer), chunk_bytes):
+            chunk = np.frombuffer(buffer[offset:offset + chunk_bytes], dtype=np.uint8)
+            (chunk_positions, chunk_chars, chunk_levels,
+             in_string, backslashes, depth) = self._scan(chunk, in_string, backslashes, depth)
+            positions.append(chunk_positions + offset)
+            chars.append(chunk_chars)
+            levels.append(chunk_levels)
+
+        self.positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+        self.chars = np.concatenate(chars) if chars else np.zeros(0, dtype=np.uint8)
+        self.levels = np.concatenate(levels) if levels else np.zeros(0, dtype=np.int64)
+
+    def _scan(self, chunk, in_string, backslashes, depth):
+        """Index one chunk, given the state at its start; returns tokens and the end state"""
+        quotes = np.flatnonzero(chunk == _QUOTE)
+        if len(quotes) and (backslashes or np.any(chunk == _BACKSLASH)):
+            quotes = quotes[~self._escaped(chunk, quotes, backslashes)]
+
+        # Candidate tokens are outside strings when an even number of
+        # unescaped quotes precedes them
+        candidates = np.flatnonzero((chunk == _OPEN_BRACE) | (chunk == _CLOSE_BRACE) |
+                                    (chunk == _OPEN_BRACKET) | (chunk == _CLOSE_BRACKET) |
+                                    (chunk == _COLON) | (chunk == _COMMA))
+        outside = (np.searchsorted(quotes, candidates) + int(in_string)) % 2 == 0
+        candidates = candidates[outside]
+
+        chars = chunk[candidates]
+        opens = (chars == _OPEN_BRACE) | (chars == _OPEN_BRACKET)
+        closes = (chars == _CLOSE_BRACE) | (chars == _CLOSE_BRACKET)
+        depth_after = depth + np.cumsum(opens.astype(np.int64) - closes)
+
+        # Level of each token: the container an opener starts, the one a
+        # closer ends, or the one a separator belongs to
+        levels = depth_after + closes
+        selected = levels <= self.max_level
+
+        trailing = 0
+        while trailing < len(chunk) and chunk[len(chunk) - 1 - trailing] == _BACKSLASH:
+            trailing += 1
+        end_backslashes = trailing + backslashes if trailing == len(chunk) else trailing
+        return (candidates[selected], chars[selected], levels[selected],
+                bool((len(quotes) + int(in_string)) % 2), end_backslashes,
+                int(depth_after[-1]) if len(depth_after) else depth)
+
+    @staticmethod
+    def _escaped(chunk, quotes, backslashes):
+        """Which quotes are escaped: preceded by an odd run of backslashes"""
+        escaped = np.zeros(len(quotes), dtype=bool)
+        for n, position in enumerate(quotes.tolist()):
+            run = 0
+            while position - run > 0 and chunk[position - run - 1] == _BACKSLASH:
+                run += 1
+            if run == position:
+                run += backslashes
+            escaped[n] = run % 2 == 1
+        return escaped
+
+    def root(self):
+        """Token index of the root container's opening bracket, or None"""
+        return 0 if len(self.positions) and self.levels[0] == 1 else None
+
+    def _close(self, token):
+        """Token index of the bracket closing the container opened at token"""
+        level = self.levels[token]
+        chars = self.chars[token + 1:]
+        after = np.flatnonzero((self.levels[token + 1:] == level) &
+                               ((chars == _CLOSE_BRACE) | (chars == _CLOSE_BRACKET)))
+        return token + 1 + int(after[0])
+
+    def member(self, token, key):
+        """
+        Value span of an object member
+
+        Args:
+            token (int): Token index of the object's opening brace
+            key (str): Member name
+
+        Returns:
+            tuple: (token index of the value's opening bracket or None for a
+                scalar, start byte, end byte), or None if the key is missing
+        """
+        level = self.levels[token]
+        close = self._close(token)
+        members = token + 1 + np.flatnonzero(
+            (self.levels[token + 1:close] == level) & (self.chars[token + 1:close] == _COLON))
+        for colon in members.tolist():
+            key_start = self.positions[colon - 1] + 1
+            if loads(self.buffer[key_start:self.positions[colon]]) != key:
+                continue
+            value_start = int(self.positions[colon]) + 1
+            # The value ends at the next token of this object (a comma or the close)
+            following = colon + 1 + np.flatnonzero(self.levels[colon + 1:close + 1] == level)
+            value_end = int(self.positions[following[0]])
+            nested = colon + 1 if (colon + 1 < following[0] and
+                                   self.levels[colon + 1] == level + 1) else None
+            return nested, value_start, value_end
+        return None
+
+    def extract(self, path):
+        """
+        Parsed value at a path of object keys
+
+        Args:
+            path (tuple): Keys from the root, e.g. ('charts', 'Benchmark')
+
+        Returns:
+            Parsed value, or None if the path does not exist
+        """
+        token = self.root()
+        span = None
+        for key in path:
+            if token is None or self.chars[token] != _OPEN_BRACE:
+                return None
+            span = self.member(token, key)
+            if span is None:
+                return None
+            token = span[0]
+        if span is None:
+            return None
+        return loads(self.buffer[span[1]:span[2]])
+
+
+def sidecar_path(path):
+    """Path of a result file's sidecar"""
+    folder, name = os.path.split(path)
+    return os.path.join(folder, SIDECAR_DIR, name)
+
+
+def _read_sidecar(path, signature, paths):
+    """Pieces stored for this version of the result file, or None"""
+    try:
+        with open(sidecar_path(path), 'rb') as f:
+            stored = loads(f.read())
+    except (OSError, ValueError):
+        return None
+    if (stored.get('version') != SIDECAR_VERSION or
+            stored.get('source') != list(signature) or
+            stored.get('paths') != {name: list(keys) for name, keys in paths.items()}):
+        return None
+    return stored['pieces']
+
+
+def _write_sidecar(path, signature, paths, pieces):
+    """Store extracted pieces next to the result file (best effort)"""
+    target = sidecar_path(path)
+    temporary = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(temporary, 'wb') as f:
+            f.write(dumps({
+                'version': SIDECAR_VERSION,
+                'source': list(signature),
+                'paths': {name: list(keys) for name, keys in paths.items()},
+                'pieces': pieces
+            }))
+        os.replace(temporary, target)
+    except OSError:
+        # Read-only result folders still work, just without the sidecar
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+
+def extract_pieces(path, paths):
+    """
+    Values at several key paths of a JSON file, parsing only those values
+
+    Args:
+        path (str): JSON file
+        paths (dict): {name: tuple of keys from the root}
+
+    Returns:
+        dict: {name: parsed value or None}
+    """
+    max_level = max((len(keys) for keys in paths.values()), default=0)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {name: None for name in paths}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            index = StructuralIndex(buffer, max_level)
+            return {name: index.extract(keys) for name, keys in paths.items()}
+
+
+def load_result_pieces(path, paths, use_sidecar=True):
+    """
+    Values at several key paths of a result file, from its sidecar when current
+
+    Args:
+        path (str): Lean result JSON file
+        paths (dict): {name: tuple of keys from the root}
+        use_sidecar (bool): Read and write the sidecar file
+
+    Returns:
+        dict: {name: parsed value or None}
+    """
+    st = os.stat(path)
+    signature = (st.st_mtime_ns, st.st_size)
+    if use_sidecar:
+        pieces = _read_sidecar(path, signature, paths)
+        if pieces is not None:
+            return pieces
+
+    pieces = extract_pieces(path, paths)
+    if use_sidecar:
+        _write_sidecar(path, signature, paths, pieces)
+    return pieces
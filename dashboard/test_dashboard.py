@@ -0,0 +1,805 @@
+"""
+Backtest Dashboard - Test Suite
+
+Unit tests for the dashboard's data layer: the result file cache, the
+equity curve downsampling, baseline curves, trade analytics, the selective
+result loader and the comparison endpoints.
+
+Run tests with: python test_dashboard.py
+
+Author: Claude Code
+Created: 2024
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add the dashboard directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from backtest_cache import BacktestCache, LRUCache, _MISSING
+import downsampling
+from downsampling import DownsamplePyramid, lttb_indices
+from baselines import BaselineCurves, buy_hold_curve, risk_free_curve, SECONDS_PER_YEAR
+from trade_analytics import TradeAnalytics
+import result_loader
+from result_loader import StructuralIndex, extract_pieces, load_result_pieces, sidecar_path
+
+
+def make_temp_dir(test):
+    """Temporary directory removed when the test finishes"""
+    path = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, path, True)
+    return path
+
+
+def write_file(path, content):
+    """Write text to a file, creating its folder"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+def bump_mtime(path, seconds=10):
+    """Move a file's mtime forward, independent of the filesystem's timestamp resolution"""
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 10**9))
+
+
+class TestBacktestCache(unittest.TestCase):
+    """Test suite for the LRU result file cache"""
+
+    def setUp(self):
+        self.folder = make_temp_dir(self)
+        self.parsed = []
+
+    def parse(self, path):
+        self.parsed.append(path)
+        with open(path) as f:
+            return f.read()
+
+    def test_lru_evicts_by_byte_budget(self):
+        """Least recently used entries go first once the budget is exceeded"""
+        cache = LRUCache(max_bytes=100)
+        cache.put('a', 1, 'A', 40)
+        cache.put('b', 1, 'B', 40)
+        self.assertEqual(cache.get('a', 1), 'A')     # 'b' is now least recently used
+        cache.put('c', 1, 'C', 40)
+
+        self.assertIs(cache.get('b', 1), _MISSING)
+        self.assertEqual(cache.get('a', 1), 'A')
+        self.assertEqual(cache.get('c', 1), 'C')
+        self.assertEqual(cache.total_bytes, 80)
+        self.assertEqual(cache.evictions, 1)
+
+        # Replacing an entry releases its old cost
+        cache.put('a', 2, 'A2', 10)
+        self.assertEqual(cache.total_bytes, 50)
+        self.assertIs(cache.get('a', 1), _MISSING)   # stale signature drops the entry
+        self.assertEqual(len(cache), 1)
+
+    def test_lru_skips_oversized_values(self):
+        """A value larger than the whole budget is not stored and evicts nothing"""
+        cache = LRUCache(max_bytes=100)
+        cache.put('small', 1, 'S', 60)
+        cache.put('huge', 1, 'H', 101)
+
+        self.assertIs(cache.get('huge', 1), _MISSING)
+        self.assertEqual(cache.get('small', 1), 'S')
+        self.assertEqual((cache.total_bytes, cache.evictions), (60, 0))
+
+    def test_load_revalidates_on_mtime_and_size(self):
+        """Files are parsed once per (mtime_ns, size) and re-read after a change"""
+        path = write_file(os.path.join(self.folder, 'result.json'), 'first')
+        cache = BacktestCache()
+
+        self.assertEqual(cache.load(path, self.parse), 'first')
+        self.assertEqual(cache.load(path, self.parse), 'first')
+        self.assertEqual(len(self.parsed), 1)
+
+        # Same size, newer mtime
+        write_file(path, 'again')
+        bump_mtime(path)
+        self.assertEqual(cache.load(path, self.parse), 'again')
+
+        # Same mtime, different size
+        st = os.stat(path)
+        write_file(path, 'longer content')
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(cache.load(path, self.parse), 'longer content')
+        self.assertEqual(len(self.parsed), 3)
+
+        # Different kinds of the same file are separate entries
+        self.assertEqual(cache.load(path, lambda p: 'summary', kind='summary'), 'summary')
+        self.assertEqual(cache.load(path, self.parse), 'longer content')
+        self.assertEqual(len(self.parsed), 3)
+
+    def test_derive_follows_source_file(self):
+        """Derived values are recomputed when their source file changes"""
+        path = write_file(os.path.join(self.folder, 'result.json'), 'x')
+        cache = BacktestCache()
+        computed = []
+
+        def compute():
+            computed.append(1)
+            return len(computed)
+
+        self.assertEqual(cache.derive(path, 'baseline', compute, 8), 1)
+        self.assertEqual(cache.derive(path, 'baseline', compute, lambda value: 8), 1)
+        bump_mtime(path)
+        self.assertEqual(cache.derive(path, 'baseline', compute, 8), 2)
+
+    def test_load_respects_budget(self):
+        """Parsed files are charged by cost and evicted over the budget"""
+        paths = [write_file(os.path.join(self.folder, f'{n}.json'), 'x' * 10) for n in range(3)]
+        cache = BacktestCache(max_bytes=25)
+        for path in paths:
+            cache.load(path, self.parse, cost=lambda value: 10)
+        self.assertEqual(cache.stats()['entries'], 2)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        cache.load(paths[0], self.parse, cost=lambda value: 10)
+        self.assertEqual(self.parsed.count(paths[0]), 2)
+
+    def test_listdir_invalidated_by_directory_changes(self):
+        """Listings are cached until the directory's mtime changes"""
+        project = os.path.join(self.folder, 'project')
+        os.makedirs(os.path.join(project, 'backtests', '2024-01-01_00-00-00'))
+        cache = BacktestCache()
+
+        self.assertEqual(cache.listdir(project), ['backtests'])
+        self.assertEqual(cache.listdir(os.path.join(self.folder, 'missing')), [])
+
+        os.makedirs(os.path.join(project, 'optimizations'))
+        write_file(os.path.join(project, 'backtests', 'notes.txt'), '')
+        bump_mtime(project)
+        bump_mtime(os.path.join(project, 'backtests'))
+        self.assertEqual(cache.listdir(project), ['backtests', 'optimizations'])
+        self.assertEqual(cache.subdirectories(os.path.join(project, 'backtests'), '2024'),
+                         ['2024-01-01_00-00-00'])
+
+        os.rmdir(os.path.join(project, 'optimizations'))
+        bump_mtime(project, 20)
+        self.assertEqual(cache.listdir(project), ['backtests'])
+
+        # A change that leaves the directory mtime as it was is served from the cache
+        st = os.stat(project)
+        os.makedirs(os.path.join(project, 'live'))
+        os.utime(project, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(cache.listdir(project), ['backtests'])
+
+        cache.clear()
+        self.assertEqual(cache.listdir(project), ['backtests', 'live'])
+
+
+def reference_lttb(x, y, threshold):
+    """Textbook Largest-Triangle-Three-Buckets, one point at a time"""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int(np.floor((i + 1) * every)) + 1
+        avg_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        best, best_area = None, -1.0
+        for j in range(int(np.floor(i * every)) + 1, int(np.floor((i + 1) * every)) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def random_walk(n, seed=0):
+    """Minute timestamps and a random-walk equity curve"""
+    rng = np.random.default_rng(seed)
+    x = 1704067200.0 + 60 * np.arange(n)
+    y = 100000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return x, y
+
+
+class TestDownsampling(unittest.TestCase):
+    """Test suite for LTTB downsampling and the zoom level pyramid"""
+
+    def lttb_with_bucket_width(self, width, x, y, threshold):
+        """lttb_indices with the scalar/NumPy switch-over forced"""
+        from unittest import mock
+        with mock.patch.object(downsampling, 'SCALAR_BUCKET_WIDTH', width):
+            return lttb_indices(x, y, threshold)
+
+    def test_scalar_and_array_paths_match_reference(self):
+        """Both bucket loops pick the textbook LTTB points and keep the end points"""
+        for n, threshold in ((1000, 100), (1000, 37), (5003, 250), (50, 49)):
+            x, y = random_walk(n, seed=threshold)
+            expected = reference_lttb(x.tolist(), y.tolist(), threshold)
+
+            scalar = self.lttb_with_bucket_width(float('inf'), x, y, threshold)
+            vectorized = self.lttb_with_bucket_width(0, x, y, threshold)
+            np.testing.assert_array_equal(scalar, expected)
+            np.testing.assert_array_equal(vectorized, expected)
+
+            self.assertEqual(len(vectorized), threshold)
+            self.assertEqual((vectorized[0], vectorized[-1]), (0, n - 1))
+            self.assertTrue(np.all(np.diff(vectorized) > 0))
+
+    def test_threshold_edge_cases(self):
+        """Non-positive or too large thresholds keep everything; 1 and 2 keep the ends"""
+        x, y = random_walk(10)
+        for threshold in (0, -5, 10, 11):
+            np.testing.assert_array_equal(lttb_indices(x, y, threshold), np.arange(10))
+        np.testing.assert_array_equal(lttb_indices(x, y, 1), [0])
+        np.testing.assert_array_equal(lttb_indices(x, y, 2), [0, 9])
+        np.testing.assert_array_equal(lttb_indices(x, y, 3)[[0, -1]], [0, 9])
+        self.assertEqual(len(lttb_indices(x[:0], y[:0], 5)), 0)
+
+    def test_pyramid_levels_and_full_range(self):
+        """Levels shrink by the level factor; a full-range request uses the coarsest level"""
+        x, y = random_walk(20000)
+        rows = [[t, v] for t, v in zip(x.tolist(), y.tolist())]
+        pyramid = DownsamplePyramid(rows, min_level_points=500)
+        self.assertEqual(pyramid.level_sizes(), [20000, 5000, 1250])
+
+        coarsest = pyramid.levels[-1]
+        indices = pyramid.select(1000)
+        self.assertEqual(len(indices), 1000)
+        self.assertTrue(np.all(np.isin(indices, coarsest)))
+        self.assertEqual((indices[0], indices[-1]), (0, 19999))
+
+        # A budget above the coarsest level's size is served from a finer level
+        indices = pyramid.select(2000)
+        self.assertEqual(len(indices), 2000)
+        self.assertTrue(np.all(np.isin(indices, pyramid.levels[1])))
+
+    def test_pyramid_range_selection(self):
+        """[start, end] is inclusive and zooming in reaches the raw points"""
+        x, y = random_walk(20000)
+        rows = [[t, v] for t, v in zip(x.tolist(), y.tolist())]
+        pyramid = DownsamplePyramid(rows, min_level_points=500)
+
+        # 3001 raw points in range: too few at the coarser levels, reduced from the raw level
+        start, end = x[8000], x[11000]
+        indices = pyramid.select(1000, start, end)
+        self.assertEqual(len(indices), 1000)
+        self.assertEqual((indices[0], indices[-1]), (8000, 11000))
+
+        # Fewer raw points in range than the budget: all of them
+        np.testing.assert_array_equal(pyramid.select(1000, x[500], x[899]), np.arange(500, 900))
+
+        # Bounds between timestamps, open-ended ranges and empty ranges
+        np.testing.assert_array_equal(pyramid.select(100, x[10] - 1, x[20] + 1), np.arange(10, 21))
+        self.assertEqual(pyramid.select(100, start=x[-50])[0], 19950)
+        self.assertEqual(pyramid.select(100, end=x[49])[-1], 49)
+        self.assertEqual(len(pyramid.select(100, x[-1] + 60, x[-1] + 120)), 0)
+
+    def test_small_series_has_a_single_level(self):
+        """Series below the coarsest level size are not reduced"""
+        rows = [[t, 1, 2, 0, v] for t, v in zip(*random_walk(300))]
+        pyramid = DownsamplePyramid(rows)
+        self.assertEqual(pyramid.level_sizes(), [300])
+        np.testing.assert_array_equal(pyramid.select(5000), np.arange(300))
+        self.assertEqual(len(pyramid.select(50)), 50)
+
+
+class TestBaselineCurves(unittest.TestCase):
+    """Test suite for the risk-free and buy-and-hold baselines"""
+
+    def setUp(self):
+        day = 86400
+        self.start = 1704067200
+        self.equity = [[self.start + i * day, 0, 0, 0, 100000 + 10 * i] for i in range(6)]
+        self.times = np.array([point[0] for point in self.equity], dtype=np.float64)
+        self.day = day
+
+    def test_risk_free_compounds_annually(self):
+        """The risk-free curve compounds the annual rate over fractional years"""
+        times = np.array([0.0, SECONDS_PER_YEAR / 2, SECONDS_PER_YEAR])
+        np.testing.assert_allclose(risk_free_curve(times, 1000.0, 0.05),
+                                   [1000.0, 1000.0 * 1.05 ** 0.5, 1050.0])
+
+    def test_buy_hold_uses_latest_price_at_or_before(self):
+        """Prices step at benchmark points; earlier timestamps use the first price"""
+        day = self.day
+        benchmark = [
+            [self.start + 5 * day, 150.0],
+            [self.start + 1 * day + 3600, 100.0],   # unsorted, between equity points
+            [self.start + 3 * day, 0.0],             # missing data, ignored
+            [self.start + 3 * day, 125.0]
+        ]
+        curve = buy_hold_curve(self.times, benchmark, 1000.0)
+        # t0, t1 are before the first price; t2 uses 100, t3/t4 use 125, t5 uses 150
+        np.testing.assert_allclose(curve, [1000.0, 1000.0, 1000.0, 1250.0, 1250.0, 1500.0])
+
+    def test_buy_hold_without_prices(self):
+        """No benchmark, or one without positive prices, gives no buy-and-hold curve"""
+        self.assertIsNone(buy_hold_curve(self.times, [], 1000.0))
+        self.assertIsNone(buy_hold_curve(self.times, None, 1000.0))
+        self.assertIsNone(buy_hold_curve(self.times, [[self.start, 0.0], [self.start + 60, 0]], 1000.0))
+
+    def test_primary_baseline_falls_back_to_risk_free(self):
+        """Without benchmark prices the risk-free curve is the primary baseline"""
+        curves = BaselineCurves(self.equity, [[self.start, 0.0]], annual_rate=0.04)
+        self.assertEqual(curves.primary, 'risk_free')
+        self.assertNotIn('buy_hold', curves.curves)
+        self.assertEqual(curves.label(), 'Baseline (4% Risk-Free)')
+        self.assertEqual(curves.rows('buy_hold'), [])
+        self.assertEqual(curves.summary()['initial_capital'], 100000.0)
+
+        self.assertIsNone(BaselineCurves(self.equity[:1]).primary)
+        self.assertEqual(BaselineCurves([]).rows(), [])
+
+    def test_rows_align_with_equity_timestamps(self):
+        """Rows carry the equity timestamps as given, for all points or an index subset"""
+        benchmark = [[self.start + i * self.day, 50.0 + i] for i in range(6)]
+        curves = BaselineCurves(self.equity, benchmark)
+        self.assertEqual(curves.primary, 'buy_hold')
+        self.assertEqual(curves.label(), 'Buy & Hold (Benchmark)')
+
+        rows = curves.rows()
+        self.assertEqual([row[0] for row in rows], [point[0] for point in self.equity])
+        self.assertIsInstance(rows[0][0], int)
+        np.testing.assert_allclose([row[1] for row in rows],
+                                   [100000 * (50.0 + i) / 50.0 for i in range(6)])
+
+        indices = np.array([0, 2, 5])
+        risk_free = curves.rows('risk_free')
+        self.assertEqual(curves.rows('risk_free', indices), [risk_free[0], risk_free[2], risk_free[5]])
+        self.assertEqual(curves.rows(indices=indices), [rows[0], rows[2], rows[5]])
+        self.assertAlmostEqual(curves.summary()['returns']['buy_hold'], 0.1)
+
+
+def fill(time, symbol, quantity, price, fee=0.0, status='filled'):
+    """Lean order event of a fill; negative quantities are sells"""
+    return {'time': float(time), 'symbolValue': symbol, 'status': status,
+            'direction': 'buy' if quantity > 0 else 'sell', 'fillQuantity': quantity,
+            'fillPrice': price, 'orderFeeAmount': fee}
+
+
+def brute_force_round_trips(events):
+    """FIFO matching one fill at a time: (symbol, direction, entry, exit, quantity, pnl) per piece"""
+    from collections import defaultdict, deque
+    lots = defaultdict(deque)
+    trips = []
+    for event in sorted(events, key=lambda e: e['time']):
+        if event['status'] != 'filled':
+            continue
+        sign = 1 if event['direction'] == 'buy' else -1
+        remaining = abs(event['fillQuantity'])
+        queue = lots[event['symbolValue']]
+        while remaining > 1e-9 and queue and queue[0][0] != sign:
+            side, size, price, time = queue[0]
+            matched = min(size, remaining)
+            trips.append((event['symbolValue'], side, time, event['time'], matched,
+                          side * matched * (event['fillPrice'] - price)))
+            remaining -= matched
+            if size - matched > 1e-9:
+                queue[0][1] = size - matched
+            else:
+                queue.popleft()
+        if remaining > 1e-9:
+            queue.append([sign, remaining, event['fillPrice'], event['time']])
+    return sorted(trips, key=lambda trip: (trip[3], trip[2]))
+
+
+class TestTradeAnalytics(unittest.TestCase):
+    """Test suite for FIFO round trips and trade statistics"""
+
+    def setUp(self):
+        # Two entries, closed by two partial exits
+        self.partial_closes = [
+            fill(1000, 'SPY', 10, 100.0, fee=1.0),
+            fill(1500, 'SPY', 10, 100.0, status='submitted'),
+            fill(2000, 'SPY', 5, 110.0, fee=1.0),
+            fill(3000, 'SPY', -8, 120.0, fee=0.8),
+            fill(4000, 'SPY', -7, 90.0, fee=1.4)
+        ]
+
+    def trips(self, events, price_path=None):
+        return TradeAnalytics(events, price_path).round_trips()
+
+    def test_partial_closes(self):
+        """A partial exit closes the oldest lot first; the next exit spans two lots"""
+        trips = self.trips(self.partial_closes)
+        self.assertEqual([(t['entry_time'], t['exit_time'], t['quantity']) for t in trips],
+                         [(1000, 3000, 8), (1000, 4000, 2), (2000, 4000, 5)])
+        self.assertEqual([t['pnl'] for t in trips], [160.0, -20.0, -100.0])
+        np.testing.assert_allclose([t['fees'] for t in trips], [1.6, 0.6, 2.0])
+        self.assertEqual({t['direction'] for t in trips}, {'long'})
+
+        summary = TradeAnalytics(self.partial_closes).summary()
+        self.assertEqual((summary['total_trades'], summary['winning_trades'],
+                          summary['losing_trades']), (3, 1, 2))
+        self.assertAlmostEqual(summary['profit_factor'], 160 / 120)
+        self.assertAlmostEqual(summary['net_pnl'], 40.0 - 4.2)
+
+    def test_reversal_through_zero(self):
+        """A fill larger than the open position closes it and opens the other side"""
+        trips = self.trips([fill(1000, 'SPY', 3, 100.0),
+                            fill(2000, 'SPY', -5, 110.0),
+                            fill(3000, 'SPY', 2, 105.0)])
+        self.assertEqual([(t['direction'], t['quantity'], t['entry_price'], t['exit_price'], t['pnl'])
+                          for t in trips],
+                         [('long', 3, 100.0, 110.0, 30.0), ('short', 2, 110.0, 105.0, 10.0)])
+
+    def test_interleaved_symbols(self):
+        """Fills only match within their own symbol"""
+        events = [fill(1000, 'BTCUSD', 1, 40000.0),
+                  fill(1100, 'ETHUSD', -2, 2000.0),
+                  fill(1200, 'BTCUSD', 1, 41000.0),
+                  fill(1300, 'ETHUSD', 2, 1900.0),
+                  fill(1400, 'BTCUSD', -2, 42000.0)]
+        trips = self.trips(events)
+        self.assertEqual([(t['symbol'], t['direction'], t['entry_time'], t['pnl']) for t in trips],
+                         [('ETHUSD', 'short', 1100, 200.0),
+                          ('BTCUSD', 'long', 1000, 2000.0),
+                          ('BTCUSD', 'long', 1200, 1000.0)])
+
+    def test_fractional_quantities_leave_no_dust(self):
+        """Float rounding of crypto sizes (0.1 + 0.2 != 0.3) does not create extra trips"""
+        events = [fill(1000, 'BTCUSD', 0.1, 40000.0),
+                  fill(2000, 'BTCUSD', 0.2, 41000.0),
+                  fill(3000, 'BTCUSD', -0.3, 42000.0),
+                  fill(4000, 'BTCUSD', -0.7, 43000.0),
+                  fill(5000, 'BTCUSD', 0.3, 42000.0),
+                  fill(6000, 'BTCUSD', 0.4, 44000.0)]
+        trips = self.trips(events)
+        self.assertEqual(len(trips), 4)
+        np.testing.assert_allclose([t['quantity'] for t in trips], [0.1, 0.2, 0.3, 0.4])
+        np.testing.assert_allclose([t['pnl'] for t in trips], [200.0, 200.0, 300.0, -400.0])
+
+    def test_matches_brute_force_fifo(self):
+        """Random fill sequences match a one-fill-at-a-time FIFO matcher"""
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            events = [fill(1000 + 60 * i, rng.choice(['BTCUSD', 'ETHUSD']),
+                           round(float(rng.uniform(0.001, 2.0)), 3) * rng.choice([-1, 1]),
+                           round(float(rng.uniform(90, 110)), 2))
+                      for i in range(int(rng.integers(1, 40)))]
+            trips = self.trips(events)
+            expected = brute_force_round_trips(events)
+
+            self.assertEqual(len(trips), len(expected))
+            self.assertEqual([(t['symbol'], 1 if t['direction'] == 'long' else -1,
+                               t['entry_time'], t['exit_time']) for t in trips],
+                             [trip[:4] for trip in expected])
+            np.testing.assert_allclose([t['quantity'] for t in trips],
+                                       [trip[4] for trip in expected], atol=1e-9)
+            np.testing.assert_allclose([t['pnl'] for t in trips],
+                                       [trip[5] for trip in expected], atol=1e-6)
+
+    def test_excursions_from_fill_prices(self):
+        """Without a price path, excursions use the symbol's fill prices during each trip"""
+        analytics = TradeAnalytics(self.partial_closes)
+        trips = analytics.round_trips()
+        self.assertEqual([t['mfe'] for t in trips], [160.0, 40.0, 50.0])
+        self.assertEqual([t['mae'] for t in trips], [0.0, -20.0, -100.0])
+        self.assertEqual(analytics.summary()['excursions']['source'], 'fills')
+
+        short = self.trips([fill(1000, 'SPY', -2, 110.0), fill(2000, 'SPY', 2, 105.0)])
+        self.assertEqual((short[0]['mfe'], short[0]['mae']), (10.0, 0.0))
+
+    def test_excursions_from_price_path(self):
+        """Bars strictly after entry up to exit widen the excursions; empty windows fall back"""
+        bars = {
+            'SPY': (np.array([1030.0, 3030.0, 4030.0]),
+                    np.array([130.0, 125.0, 200.0]),
+                    np.array([95.0, 80.0, 10.0])),
+            # All bars precede the trade: an empty window at the end of the path
+            'QQQ': (np.array([100.0, 200.0]), np.array([500.0, 500.0]), np.array([1.0, 1.0]))
+        }
+        requested = []
+
+        def price_path(symbol, start, end):
+            requested.append((symbol, start, end))
+            return bars[symbol]
+
+        events = self.partial_closes + [fill(5000, 'QQQ', 1, 300.0), fill(6000, 'QQQ', -1, 310.0)]
+        analytics = TradeAnalytics(events, price_path)
+        trips = analytics.round_trips()
+
+        self.assertEqual(sorted(requested), [('QQQ', 5000.0, 6000.0), ('SPY', 1000.0, 4000.0)])
+        self.assertEqual([t['mfe'] for t in trips], [240.0, 60.0, 75.0, 10.0])
+        self.assertEqual([t['mae'] for t in trips], [-40.0, -40.0, -150.0, 0.0])
+        self.assertEqual(analytics.summary()['excursions']['source'], 'market_data')
+
+    def test_summary_is_valid_json_without_losses(self):
+        """Profit factor is None rather than infinity when every trip wins"""
+        summary = TradeAnalytics([fill(1000, 'SPY', 1, 100.0), fill(2000, 'SPY', -1, 101.0)]).summary()
+        self.assertIsNone(summary['profit_factor'])
+        json.dumps(summary, allow_nan=False)
+
+        self.assertEqual(TradeAnalytics([]).summary()['total_trades'], 0)
+        self.assertEqual(TradeAnalytics([fill(1000, 'SPY', 1, 100.0)]).round_trips(), [])
+
+
+# Keys and values full of the characters the structural scan has to see through
+TRICKY_DOCUMENT = json.dumps({
+    'charts': {
+        'Strategy Equity': {'series': {'Equity': {'values': [[1, 2.5], [2, 3.5]]}}},
+        'a "quoted" {key}: [x]': {'series': {'x': 'value with \\ and \\\\" and ", {}'}},
+        'Benchmark': {'series': {'Benchmark': {'values': [[1, 100], [2, 101]]}}},
+        'ends in backslashes \\\\': ['\\\\', '\\"', '"\\\\', {'k': '\\\\\\"'}]
+    },
+    'orders': {'1': {'tag': '}]}]:,,'}, '2': {'tag': '\\u007b'}},
+    'list': [{'charts': 1}, [[], {}], 'x'],
+    'unicode': 'café →',
+    'number': -1.5e3,
+    'empty': {}
+}, ensure_ascii=False).encode('utf-8')
+
+
+def reference_tokens(document, max_level):
+    """Structural tokens (position, char, level) found one byte at a time"""
+    tokens = []
+    in_string = escaped = False
+    depth = 0
+    for position, byte in enumerate(document):
+        char = chr(byte)
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+            if depth <= max_level:
+                tokens.append((position, byte, depth))
+        elif char in '}]':
+            if depth <= max_level:
+                tokens.append((position, byte, depth))
+            depth -= 1
+        elif char in ':,' and depth <= max_level:
+            tokens.append((position, byte, depth))
+    return tokens
+
+
+def lookup(document, path):
+    """Value at a key path of a parsed document, or None"""
+    value = json.loads(document)
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+class TestResultLoader(unittest.TestCase):
+    """Test suite for the chunked structural JSON index and result sidecars"""
+
+    PATHS = [
+        ('charts', 'Strategy Equity', 'series', 'Equity', 'values'),
+        ('charts', 'Benchmark', 'series', 'Benchmark'),
+        ('charts', 'a "quoted" {key}: [x]', 'series', 'x'),
+        ('charts', 'ends in backslashes \\\\'),
+        ('orders', '1', 'tag'),
+        ('orders', '2', 'tag'),
+        ('unicode',), ('number',), ('empty',), ('list',),
+        # Missing keys and paths through non-objects
+        ('charts', 'Missing'), ('missing',), ('list', 'charts'), ('number', 'x'),
+        ('charts', 'Benchmark', 'series', 'Benchmark', 'values', 'x')
+    ]
+
+    def test_tokens_match_reference_for_every_chunk_size(self):
+        """Chunk boundaries inside strings, escapes and backslash runs do not change the index"""
+        for max_level in (1, 3, 6):
+            expected = reference_tokens(TRICKY_DOCUMENT, max_level)
+            for chunk_bytes in list(range(1, 12)) + [64, 1 << 20]:
+                index = StructuralIndex(TRICKY_DOCUMENT, max_level, chunk_bytes=chunk_bytes)
+                self.assertEqual(list(zip(index.positions.tolist(), index.chars.tolist(),
+                                          index.levels.tolist())), expected,
+                                 f"max_level={max_level} chunk_bytes={chunk_bytes}")
+
+    def test_extract_matches_json_loads(self):
+        """Extracted values equal the same paths of the fully parsed document"""
+        for chunk_bytes in (1, 2, 3, 5, 7, 4096):
+            index = StructuralIndex(TRICKY_DOCUMENT, 6, chunk_bytes=chunk_bytes)
+            for path in self.PATHS:
+                self.assertEqual(index.extract(path), lookup(TRICKY_DOCUMENT, path),
+                                 f"{path} chunk_bytes={chunk_bytes}")
+
+    def test_backslash_runs_split_across_chunks(self):
+        """Escaped and unescaped quotes after backslash runs of every length and split point"""
+        for run in range(1, 7):
+            key = '\\' * (run // 2) + ('"' if run % 2 else '')
+            document = json.dumps({key: {'a': [1]}, 'b': {'c': '}'}}).encode()
+            for chunk_bytes in range(1, len(document) + 1):
+                index = StructuralIndex(document, 2, chunk_bytes=chunk_bytes)
+                self.assertEqual(index.extract((key, 'a')), [1])
+                self.assertEqual(index.extract(('b', 'c')), '}')
+
+    def test_extract_pieces_from_files(self):
+        """Files are mapped and indexed once for several paths; empty files give None"""
+        folder = make_temp_dir(self)
+        path = os.path.join(folder, 'result.json')
+        with open(path, 'wb') as f:
+            f.write(TRICKY_DOCUMENT)
+        paths = {str(n): keys for n, keys in enumerate(self.PATHS)}
+        pieces = extract_pieces(path, paths)
+        self.assertEqual(pieces, {name: lookup(TRICKY_DOCUMENT, keys) for name, keys in paths.items()})
+
+        empty = write_file(os.path.join(folder, 'empty.json'), '')
+        self.assertEqual(extract_pieces(empty, {'equity': ('charts',)}), {'equity': None})
+        self.assertIsNone(StructuralIndex(b'', 2).extract(('charts',)))
+        self.assertIsNone(StructuralIndex(b'[1, 2]', 2).extract(('charts',)))
+
+    def test_sidecar_follows_source_signature(self):
+        """The sidecar serves repeated loads and is ignored once the result file changes"""
+        from unittest import mock
+        folder = make_temp_dir(self)
+        path = write_file(os.path.join(folder, 'result.json'),
+                          json.dumps({'charts': {'Benchmark': [1, 2]}}))
+        paths = {'benchmark': ('charts', 'Benchmark')}
+
+        def load(expect_scan, paths=paths):
+            with mock.patch.object(result_loader, 'extract_pieces',
+                                   wraps=result_loader.extract_pieces) as extract:
+                pieces = load_result_pieces(path, paths)
+            self.assertEqual(extract.called, expect_scan)
+            return pieces
+
+        self.assertEqual(load(True), {'benchmark': [1, 2]})
+        self.assertTrue(os.path.exists(sidecar_path(path)))
+        self.assertEqual(os.path.dirname(sidecar_path(path)), os.path.join(folder, '.dashboard'))
+        self.assertEqual(load(False), {'benchmark': [1, 2]})
+
+        # New mtime, same size
+        write_file(path, json.dumps({'charts': {'Benchmark': [3, 4]}}))
+        bump_mtime(path)
+        self.assertEqual(load(True), {'benchmark': [3, 4]})
+        self.assertEqual(load(False), {'benchmark': [3, 4]})
+
+        # New size, same mtime
+        st = os.stat(path)
+        write_file(path, json.dumps({'charts': {'Benchmark': [5, 6, 7]}}))
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(load(True), {'benchmark': [5, 6, 7]})
+
+        # Different requested paths, or a corrupt sidecar, mean a fresh scan
+        self.assertEqual(load(True, {'charts': ('charts',)}), {'charts': {'Benchmark': [5, 6, 7]}})
+        write_file(sidecar_path(path), '{"version": 1, "sour')
+        self.assertEqual(load(True), {'benchmark': [5, 6, 7]})
+        self.assertEqual(load(False), {'benchmark': [5, 6, 7]})
+
+        # Without sidecars nothing is read or written
+        os.remove(sidecar_path(path))
+        self.assertEqual(load_result_pieces(path, paths, use_sidecar=False), {'benchmark': [5, 6, 7]})
+        self.assertFalse(os.path.exists(sidecar_path(path)))
+
+
+def write_backtest(project_dir, backtest_id, total_trades, sharpe_ratio, order_events=0):
+    """Stage a Lean backtest folder with a summary and order events file"""
+    folder = os.path.join(project_dir, backtest_id)
+    summary = {'totalPerformance': {
+        'tradeStatistics': {'totalNumberOfTrades': total_trades, 'profitFactor': '1.5',
+                            'startDateTime': '2023-01-01T00:00:00Z'},
+        'portfolioStatistics': {'sharpeRatio': sharpe_ratio, 'winRate': 0.5}
+    }}
+    write_file(os.path.join(folder, '1-summary.json'), json.dumps(summary))
+    write_file(os.path.join(folder, '1-order-events.json'), json.dumps(
+        [fill(1000 + n, 'SPY', 1 if n % 2 == 0 else -1, 100.0) for n in range(order_events)]))
+    return os.path.join(folder, '1-summary.json')
+
+
+class TestCompareEndpoints(unittest.TestCase):
+    """Test suite for /api/projects/compare and the per-project API endpoints"""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            import app as dashboard
+        except ImportError as e:
+            raise unittest.SkipTest(f"dashboard app not available: {e}")
+        cls.dashboard = dashboard
+
+    def setUp(self):
+        from unittest import mock
+        staging = make_temp_dir(self)
+        self.project_dirs = {name: os.path.join(staging, name)
+                             for name in ('alpha', 'beta', 'gamma', 'empty')}
+        write_backtest(self.project_dirs['alpha'], '2025-01-01_00-00-00', 3, 0.1)
+        self.alpha_summary = write_backtest(self.project_dirs['alpha'], '2025-02-01_00-00-00',
+                                            12, 1.2, order_events=30)
+        write_backtest(self.project_dirs['beta'], '2025-01-01_00-00-00', 7, 0.7)
+        write_backtest(self.project_dirs['gamma'], '2025-01-01_00-00-00', 0, -0.3)
+        os.makedirs(self.project_dirs['empty'])
+
+        self.manager = self.dashboard.data_manager
+        patcher = mock.patch.object(self.manager, 'project_dirs', self.project_dirs)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager.cache.clear()
+        self.addCleanup(self.manager.cache.clear)
+        self.client = self.dashboard.app.test_client()
+
+    def test_compare_keeps_request_order(self):
+        """Results follow the request, without duplicates, blanks or projects lacking results"""
+        metrics = self.manager.compare_metrics(['gamma', 'alpha', '', 'gamma', 'missing',
+                                                'empty', 'beta'])
+        self.assertEqual([m['project_name'] for m in metrics], ['gamma', 'alpha', 'beta'])
+        self.assertEqual([m['sharpe_ratio'] for m in metrics], [-0.3, 1.2, 0.7])
+        self.assertEqual(metrics[1]['backtest_id'], '2025-02-01_00-00-00')
+
+        self.assertEqual([m['project_name'] for m in self.manager.compare_metrics(['beta'])], ['beta'])
+        self.assertEqual(self.manager.compare_metrics(['', 'missing']), [])
+
+    def test_compare_endpoint(self):
+        """The endpoint splits and trims the projects argument"""
+        response = self.client.get('/api/projects/compare?projects=beta, alpha,,beta,missing')
+        self.assertEqual(response.status_code, 200)
+        projects = response.get_json()['projects']
+        self.assertEqual([p['project_name'] for p in projects], ['beta', 'alpha'])
+        self.assertEqual([p['total_trades'] for p in projects], [7, 12])
+
+        self.assertEqual(self.client.get('/api/projects/compare').status_code, 400)
+
+    def test_total_trades_is_lean_round_trip_count(self):
+        """total_trades is tradeStatistics.totalNumberOfTrades, not the number of order events"""
+        response = self.client.get('/api/project/alpha/metrics')
+        self.assertEqual(response.status_code, 200)
+        metrics = response.get_json()
+        self.assertEqual(metrics['total_trades'], 12)
+        self.assertEqual(metrics['profit_factor'], '1.5')
+        self.assertEqual(self.client.get('/api/project/empty/metrics').status_code, 404)
+        self.assertEqual(self.client.get('/api/project/missing/metrics').status_code, 404)
+
+    def test_trades_backtest_id_limited_to_project(self):
+        """backtest_id selects one of the project's backtests and never an arbitrary path"""
+        response = self.client.get('/api/project/alpha/trades?backtest_id=2025-02-01_00-00-00')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()['trades']), 30)
+
+        outside = os.path.dirname(write_backtest(os.path.dirname(self.project_dirs['alpha']),
+                                                 '2025-outside', 1, 0.0, order_events=4))
+        for backtest_id in (outside, '../2025-outside', '..', '2025-03-01_00-00-00'):
+            response = self.client.get('/api/project/alpha/trades',
+                                       query_string={'backtest_id': backtest_id})
+            self.assertEqual(response.status_code, 404, backtest_id)
+
+    def test_market_data_time_range(self):
+        """Bar ranges accept Unix seconds or dates; unparseable values are a 400"""
+        from unittest import mock
+        from marketdata import MarketDataStore
+        store = MarketDataStore(make_temp_dir(self))
+        timestamps = 1704067200 + 60 * np.arange(1, 11)
+        close = 100.0 + np.arange(10)
+        store.write('spy', {'timestamp': timestamps, 'open': close, 'high': close,
+                            'low': close, 'close': close})
+        patcher = mock.patch.object(self.manager, 'market_data', store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        response = self.client.get(f'/api/market-data/spy?start={timestamps[2]}&end=2024-01-01 00:08')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([bar[0] for bar in response.get_json()['bars']], timestamps[2:7].tolist())
+
+        for query in ('start=notadate', 'end=2024-13-45'):
+            response = self.client.get(f'/api/market-data/spy?{query}')
+            self.assertEqual(response.status_code, 400, query)
+        self.assertEqual(self.client.get('/api/market-data/qqq').status_code, 404)
+
+    def test_metrics_follow_summary_changes(self):
+        """Cached metrics are recomputed when the summary file changes"""
+        self.assertEqual(self.manager.backtest_metrics('alpha')['total_trades'], 12)
+        write_backtest(self.project_dirs['alpha'], '2025-02-01_00-00-00', 14, 1.2)
+        bump_mtime(self.alpha_summary)
+        self.assertEqual(self.manager.backtest_metrics('alpha')['total_trades'], 14)
+
+
+if __name__ == '__main__':
+    unittest.main()
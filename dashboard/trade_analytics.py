@@ -0,0 +1,368 @@
+"""
+Columnar trade analytics for Lean order events
+
+Filled order events are loaded once into typed arrays (time, symbol code,
+signed quantity, price, fee). Fills are matched into round trips first in,
+first out, per symbol through a per-symbol row index; a fill that closes
+more than the open position reverses it. The matching and the statistics
+over the round trips (win rate, profit factor, expectancy, holding times,
+maximum adverse and favourable excursion) are array operations.
+
+Excursions are measured on a price path per symbol: minute bars when the
+caller provides them, otherwise the symbol's own fill prices.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import numpy as np
+
+# Order event statuses that carry a fill
+FILL_STATUSES = ('filled', 'partiallyFilled')
+
+# Quantities below this are treated as zero (crypto fills are fractional)
+QUANTITY_EPSILON = 1e-9
+
+# Holding-time histogram: upper bucket edges in seconds and their labels
+HOLDING_TIME_EDGES = np.array([60, 3600, 86400, 7 * 86400])
+HOLDING_TIME_LABELS = ('<1m', '1m-1h', '1h-1d', '1d-1w', '>=1w')
+
+
+class OrderFills:
+    """Filled order events as typed columns, sorted by time"""
+
+    def __init__(self, events):
+        """
+        Args:
+            events (list): Lean order events (dicts from *-order-events.json)
+        """
+        rows = []
+        for event in events:
+            if event.get('status') not in FILL_STATUSES:
+                continue
+            quantity = abs(event.get('fillQuantity') or 0.0)
+            if quantity < QUANTITY_EPSILON:
+                continue
+            if event.get('direction') == 'sell':
+                quantity = -quantity
+            rows.append((event.get('time') or 0.0,
+                         event.get('symbolValue') or event.get('symbol'),
+                         quantity,
+                         event.get('fillPrice') or 0.0,
+                         event.get('orderFeeAmount') or 0.0))
+
+        self.symbols = sorted({row[1] for row in rows})
+        codes = {symbol: code for code, symbol in enumerate(self.symbols)}
+
+        times, symbols, quantities, prices, fees = zip(*rows) if rows else ((),) * 5
+        order = np.argsort(np.array(times, dtype=np.float64), kind='stable')
+        self.time = np.array(times, dtype=np.float64)[order]
+        self.symbol = np.array([codes[symbol] for symbol in symbols], dtype=np.int32)[order]
+        self.quantity = np.array(quantities, dtype=np.float64)[order]
+        self.price = np.array(prices, dtype=np.float64)[order]
+        self.fee = np.array(fees, dtype=np.float64)[order]
+
+    def __len__(self):
+        return len(self.time)
+
+    def symbol_indexes(self):
+        """
+        Row indexes of each symbol's fills, in time order
+
+        Returns:
+            dict: {symbol: np.ndarray of row indexes}
+        """
+        order = np.argsort(self.symbol, kind='stable')
+        bounds = np.searchsorted(self.symbol[order], np.arange(len(self.symbols) + 1))
+        return {symbol: order[bounds[code]:bounds[code + 1]]
+                for code, symbol in enumerate(self.symbols)}
+
+
+class RoundTrips:
+    """
+    Round trips matched first in, first out, as columns
+
+    Each fill is split into the part that closes the open position and the
+    part that opens (or adds to) one; a fill through zero has both. Per
+    symbol and side, FIFO pairs the n-th unit closed with the n-th unit
+    opened, so the matched pieces are the intervals between the merged
+    cumulative opened and closed quantities.
+    """
+
+    COLUMNS = ('symbol', 'direction', 'quantity', 'entry_time', 'exit_time',
+               'entry_price', 'exit_price', 'fees')
+
+    def __init__(self, fills):
+        """
+        Args:
+            fills (OrderFills): Fills to match
+        """
+        self.symbols = fills.symbols
+        fee_per_unit = fills.fee / np.abs(fills.quantity) if len(fills) else fills.fee
+
+        pieces = []
+        for code, rows in enumerate(fills.symbol_indexes().values()):
+            opening, closing = self._split_fills(fills.quantity[rows])
+            for direction in (1, -1):
+                opened = rows[direction * opening > 0]
+                closed = rows[direction * closing < 0]
+                if len(opened) and len(closed):
+                    entries, exits, quantity = self._match(
+                        np.abs(opening[direction * opening > 0]),
+                        np.abs(closing[direction * closing < 0]))
+                    pieces.append((code, direction, opened[entries], closed[exits], quantity))
+
+        if pieces:
+            codes, directions, entries, exits, quantity = (
+                np.concatenate([np.full(len(piece[4]), piece[0]) for piece in pieces]),
+                np.concatenate([np.full(len(piece[4]), piece[1]) for piece in pieces]),
+                np.concatenate([piece[2] for piece in pieces]),
+                np.concatenate([piece[3] for piece in pieces]),
+                np.concatenate([piece[4] for piece in pieces]))
+        else:
+            codes = directions = entries = exits = np.zeros(0, dtype=np.int64)
+            quantity = np.zeros(0)
+
+        # Chronological by exit, as trades are reported
+        order = np.lexsort((fills.time[entries], fills.time[exits]))
+        entries = entries[order]
+        exits = exits[order]
+        self.symbol = codes[order].astype(np.int32)
+        self.direction = directions[order].astype(np.int8)
+        self.quantity = quantity[order]
+        self.entry_time = fills.time[entries]
+        self.exit_time = fills.time[exits]
+        self.entry_price = fills.price[entries]
+        self.exit_price = fills.price[exits]
+        self.fees = self.quantity * (fee_per_unit[entries] + fee_per_unit[exits])
+
+        self.pnl = self.direction * self.quantity * (self.exit_price - self.entry_price)
+        self.holding_seconds = self.exit_time - self.entry_time
+
+    @staticmethod
+    def _split_fills(quantity):
+        """
+        Signed opening and closing parts of one symbol's fills
+
+        Returns:
+            tuple: (opening, closing) arrays summing to quantity
+        """
+        position = np.cumsum(quantity)
+        before = position - quantity
+        before[np.abs(before) <= QUANTITY_EPSILON] = 0.0
+
+        adds = before * quantity >= 0
+        reverses = ~adds & (np.abs(quantity) > np.abs(before))
+        closing = np.where(adds, 0.0, np.where(reverses, -before, quantity))
+        return quantity - closing, closing
+
+    @staticmethod
+    def _match(opened, closed):
+        """
+        FIFO pairing of opened and closed sizes of one symbol and side
+
+        Returns:
+            tuple: (index into opened, index into closed, matched quantity) per piece
+        """
+        opened_total = np.cumsum(opened)
+        closed_total = np.cumsum(closed)
+        edges = np.union1d(opened_total, closed_total)
+        edges = edges[edges <= closed_total[-1] + QUANTITY_EPSILON]
+        quantity = np.diff(edges, prepend=0.0)
+        keep = quantity > QUANTITY_EPSILON
+        edges = edges[keep]
+        quantity = quantity[keep]
+
+        # Midpoints stay clear of rounding differences at the edges
+        middle = edges - quantity / 2
+        entries = np.searchsorted(opened_total, middle)
+        exits = np.searchsorted(closed_total, middle)
+        return entries, exits, quantity
+
+    def __len__(self):
+        return len(self.pnl)
+
+    def excursions(self, price_paths):
+        """
+        Maximum adverse and favourable excursion of every round trip
+
+        The path of a trade is the prices strictly after its entry up to and
+        including its exit, together with the entry and exit prices.
+
+        Args:
+            price_paths (dict): {symbol: (times, highs, lows)} with increasing times
+
+        Returns:
+            tuple: (mae, mfe) arrays in currency, mae <= 0 <= mfe
+        """
+        highest = np.maximum(self.entry_price, self.exit_price)
+        lowest = np.minimum(self.entry_price, self.exit_price)
+
+        for code, symbol in enumerate(self.symbols):
+            path = price_paths.get(symbol)
+            trades = np.flatnonzero(self.symbol == code)
+            if path is None or len(trades) == 0 or len(path[0]) == 0:
+                continue
+            times, highs, lows = path
+            first = np.searchsorted(times, self.entry_time[trades], side='right')
+            last = np.searchsorted(times, self.exit_time[trades], side='right')
+
+            # reduceat over interleaved (first, last) bounds reduces each
+            # [first, last) slice; the sentinel keeps every bound in range
+            bounds = np.empty(2 * len(trades), dtype=np.int64)
+            bounds[0::2] = first
+            bounds[1::2] = last
+            path_high = np.maximum.reduceat(np.append(highs, -np.inf), bounds)[0::2]
+            path_low = np.minimum.reduceat(np.append(lows, np.inf), bounds)[0::2]
+            empty = last <= first
+            highest[trades] = np.maximum(highest[trades], np.where(empty, -np.inf, path_high))
+            lowest[trades] = np.minimum(lowest[trades], np.where(empty, np.inf, path_low))
+
+        long = self.direction > 0
+        mfe = self.quantity * np.where(long, highest - self.entry_price, self.entry_price - lowest)
+        mae = self.quantity * np.where(long, lowest - self.entry_price, self.entry_price - highest)
+        return mae, mfe
+
+    def rows(self):
+        """Round trips as dicts, for the API"""
+        return [
+            {
+                'symbol': self.symbols[symbol],
+                'direction': 'long' if direction > 0 else 'short',
+                'quantity': quantity,
+                'entry_time': entry_time,
+                'exit_time': exit_time,
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'pnl': pnl,
+                'fees': fees,
+                'holding_seconds': holding
+            }
+            for symbol, direction, quantity, entry_time, exit_time, entry_price, exit_price,
+            pnl, fees, holding in zip(
+                self.symbol.tolist(), self.direction.tolist(), self.quantity.tolist(),
+                self.entry_time.tolist(), self.exit_time.tolist(), self.entry_price.tolist(),
+                self.exit_price.tolist(), self.pnl.tolist(), self.fees.tolist(),
+                self.holding_seconds.tolist())
+        ]
+
+
+class TradeAnalytics:
+    """
+    Round-trip statistics of a backtest's order events
+
+    Usage:
+        analytics = TradeAnalytics(order_events, price_path=load_bars)
+        summary = analytics.summary()
+    """
+
+    def __init__(self, events, price_path=None):
+        """
+        Args:
+            events (list): Lean order events
+            price_path (callable, optional): price_path(symbol, start, end)
+                returning (times, highs, lows) arrays for [start, end] in the
+                order events' clock, or None when no prices are available
+        """
+        self.fills = OrderFills(events)
+        self.trips = RoundTrips(self.fills)
+        self.excursion_source = 'fills'
+
+        price_paths = {}
+        for symbol, rows in self.fills.symbol_indexes().items():
+            path = None
+            if price_path is not None and len(rows):
+                path = price_path(symbol, self.fills.time[rows[0]], self.fills.time[rows[-1]])
+            if path is not None and len(path[0]):
+                price_paths[symbol] = path
+                self.excursion_source = 'market_data'
+            else:
+                prices = self.fills.price[rows]
+                price_paths[symbol] = (self.fills.time[rows], prices, prices)
+        self.mae, self.mfe = self.trips.excursions(price_paths)
+
+    def summary(self):
+        """
+        Trade statistics
+
+        Returns:
+            dict: Counts, win rate, average win/loss, profit factor (None
+                without losing trades), expectancy, P&L totals, holding-time
+                distribution and MAE/MFE statistics (P&L before fees)
+        """
+        pnl = self.trips.pnl
+        total_trades = len(pnl)
+        if total_trades == 0:
+            return {
+                'total_trades': 0,
+                'winning_trades': 0,
+                'losing_trades': 0,
+                'win_rate': 0,
+                'avg_win': 0,
+                'avg_loss': 0,
+                'profit_factor': 0
+            }
+
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+        total_wins = float(wins.sum())
+        total_losses = abs(float(losses.sum()))
+        total_fees = float(self.trips.fees.sum())
+
+        return {
+            'total_trades': total_trades,
+            'winning_trades': len(wins),
+            'losing_trades': len(losses),
+            'long_trades': int(np.count_nonzero(self.trips.direction > 0)),
+            'short_trades': int(np.count_nonzero(self.trips.direction < 0)),
+            'win_rate': len(wins) / total_trades,
+            'avg_win': total_wins / len(wins) if len(wins) else 0,
+            'avg_loss': total_losses / len(losses) if len(losses) else 0,
+            # None rather than infinity without losing trades, which JSON cannot represent
+            'profit_factor': total_wins / total_losses if total_losses > 0 else None,
+            'expectancy': float(pnl.mean()),
+            'total_pnl': float(pnl.sum()),
+            'total_wins': total_wins,
+            'total_losses': total_losses,
+            'total_fees': total_fees,
+            'net_pnl': float(pnl.sum()) - total_fees,
+            'largest_win': float(pnl.max()),
+            'largest_loss': float(pnl.min()),
+            'holding_time': self._holding_time(),
+            'excursions': self._excursions()
+        }
+
+    def _holding_time(self):
+        """Holding-time percentiles (seconds) and histogram"""
+        holding = self.trips.holding_seconds
+        p50, p90 = np.percentile(holding, [50, 90])
+        counts = np.bincount(np.searchsorted(HOLDING_TIME_EDGES, holding, side='right'),
+                             minlength=len(HOLDING_TIME_LABELS))
+        return {
+            'mean_seconds': float(holding.mean()),
+            'median_seconds': float(p50),
+            'p90_seconds': float(p90),
+            'min_seconds': float(holding.min()),
+            'max_seconds': float(holding.max()),
+            'histogram': dict(zip(HOLDING_TIME_LABELS, counts.tolist()))
+        }
+
+    def _excursions(self):
+        """MAE/MFE averages and extremes, and how much of the MFE was kept"""
+        mfe_total = float(self.mfe.sum())
+        return {
+            'source': self.excursion_source,
+            'avg_mae': float(self.mae.mean()),
+            'avg_mfe': float(self.mfe.mean()),
+            'worst_mae': float(self.mae.min()),
+            'best_mfe': float(self.mfe.max()),
+            'mfe_capture': float(self.trips.pnl.sum()) / mfe_total if mfe_total > 0 else 0.0
+        }
+
+    def round_trips(self):
+        """Round trips with their excursions, for the API"""
+        rows = self.trips.rows()
+        for row, mae, mfe in zip(rows, self.mae.tolist(), self.mfe.tolist()):
+            row['mae'] = mae
+            row['mfe'] = mfe
+        return rows
@@ -18,6 +18,9 @@ source venv/bin/activate
 # Run the download with pre-configured responses
 echo "19" | lean data download
 
+# Convert the new days into the columnar store used by the research tools
+python -m marketdata.lean_import --symbols spy --resolutions minute
+
 # Note: This will prompt you through the wizard
 # Select:
 # 1. Provider: Alpaca (option 19)
@@ -0,0 +1,10 @@
+"""
+Local market data tools shared by the strategy projects and the dashboard
+
+Exposes the memory-mapped columnar bar store used by the research,
+optimization and dashboard tools instead of parsing CSV exports.
+"""
+
+from .store import MarketDataStore, DEFAULT_STORE_DIR, COLUMNS
+
+__all__ = ['MarketDataStore', 'DEFAULT_STORE_DIR', 'COLUMNS']
@@ -0,0 +1,382 @@
+"""
+Lean Data Importer
+
+Converts Lean's zipped CSV bar files into the columnar MarketDataStore.
+
+Lean keeps trade bars under <data>/<security type>/<market>/<resolution>/:
+
+    minute/<symbol>/<YYYYMMDD>_trade.zip    one file per day (also second)
+    hour/<symbol>.zip, daily/<symbol>.zip   one file per symbol
+
+Per-day rows are "milliseconds since midnight,open,high,low,close,volume";
+hour and daily rows start with "YYYYMMDD HH:MM". Equity prices are stored
+in deci-cents (x10000). Times are bar start times in the exchange time zone;
+the store keeps bar end times as its timestamps.
+
+Files are parsed in parallel across processes. A manifest in the store root
+records the size and modification time of every converted file, so re-runs
+only parse new or changed days and drop days whose files were removed.
+
+Usage:
+    python -m marketdata.lean_import --symbols spy btcusd
+    python -m marketdata.lean_import --symbols spy --resolutions minute hour --workers 8
+"""
+
+import argparse
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from .store import MarketDataStore, DEFAULT_STORE_DIR, REPO_DIR, COLUMNS, SECONDS_PER_DAY
+
+# Lean data folder (lean.json 'data-folder')
+DEFAULT_DATA_DIR = os.path.join(REPO_DIR, 'data')
+
+MANIFEST_FILE = 'manifest.json'
+
+RESOLUTION_SECONDS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'daily': 86400
+}
+
+# Resolutions stored as one zip file per day
+PER_DAY_RESOLUTIONS = ('second', 'minute')
+
+# Lean stores these security types' prices as deci-cents
+SCALED_PRICE_TYPES = ('equity', 'option', 'index')
+PRICE_SCALE = 10000.0
+
+# Exchange time zones of the markets' raw data
+MARKET_TIME_ZONES = {
+    'usa': 'America/New_York',
+    'india': 'Asia/Kolkata'
+}
+
+
+def find_sources(data_dir, symbols, resolution, security_types=None):
+    """
+    Locate Lean trade files of the requested symbols
+
+    Args:
+        data_dir (str): Lean data folder
+        symbols (list): Symbols to look for (case-insensitive)
+        resolution (str): 'second', 'minute', 'hour' or 'daily'
+        security_types (list, optional): Limit the search to these security types
+
+    Returns:
+        list: One dict per symbol found with 'symbol', 'security_type',
+            'market', 'resolution' and 'files' (sorted paths)
+    """
+    wanted = {symbol.lower() for symbol in symbols}
+    sources = {}
+
+    if not os.path.isdir(data_dir):
+        return []
+
+    for security_type in sorted(os.listdir(data_dir)):
+        if security_types and security_type not in security_types:
+            continue
+        type_dir = os.path.join(data_dir, security_type)
+        if not os.path.isdir(type_dir):
+            continue
+
+        for market in sorted(os.listdir(type_dir)):
+            resolution_dir = os.path.join(type_dir, market, resolution)
+            if not os.path.isdir(resolution_dir):
+                continue
+
+            for symbol in sorted(wanted - set(sources)):
+                if resolution in PER_DAY_RESOLUTIONS:
+                    symbol_dir = os.path.join(resolution_dir, symbol)
+                    if not os.path.isdir(symbol_dir):
+                        continue
+                    files = sorted(
+                        os.path.join(symbol_dir, name) for name in os.listdir(symbol_dir)
+                        if name.endswith('_trade.zip')
+                    )
+                else:
+                    path = os.path.join(resolution_dir, f'{symbol}.zip')
+                    files = [path] if os.path.exists(path) else []
+
+                if files:
+                    sources[symbol] = {
+                        'symbol': symbol,
+                        'security_type': security_type,
+                        'market': market,
+                        'resolution': resolution,
+                        'files': files
+                    }
+
+    return [sources[symbol] for symbol in sorted(sources)]
+
+
+def parse_lean_file(path, resolution, price_scale=1.0):
+    """
+    Parse one Lean trade zip into store columns
+
+    Args:
+        path (str): Zip file path
+        resolution (str): Bar resolution of the file
+        price_scale (float): Divisor applied to prices
+
+    Returns:
+        dict: 'timestamp' (bar end, wall clock encoded as UTC seconds) and
+            float64 'open', 'high', 'low', 'close', 'volume' arrays
+    """
+    with zipfile.ZipFile(path) as archive:
+        members = [name for name in archive.namelist() if name.endswith('.csv')]
+        if not members:
+            return _empty_columns()
+        with archive.open(members[0]) as f:
+            frame = pd.read_csv(f, header=None, usecols=range(6),
+                                names=['time', 'open', 'high', 'low', 'close', 'volume'])
+
+    if frame.empty:
+        return _empty_columns()
+
+    period = RESOLUTION_SECONDS[resolution]
+    if resolution in PER_DAY_RESOLUTIONS:
+        day = datetime.strptime(os.path.basename(path)[:8], '%Y%m%d')
+        day_start = int(pd.Timestamp(day).tz_localize('UTC').timestamp())
+        starts = day_start + frame['time'].values.astype(np.int64) // 1000
+    else:
+        times = pd.to_datetime(frame['time'].astype(str), format='%Y%m%d %H:%M')
+        starts = times.values.astype('datetime64[s]').astype(np.int64)
+
+    columns = {'timestamp': starts + period}
+    for name in COLUMNS[1:]:
+        values = frame[name].values.astype(np.float64)
+        columns[name] = values / price_scale if name != 'volume' else values
+    return columns
+
+
+def _parse_job(job):
+    """Process pool entry point: (path, resolution, price_scale) -> columns"""
+    return parse_lean_file(*job)
+
+
+def _empty_columns():
+    """Columns of a file without rows"""
+    return {name: np.empty(0, dtype=np.int64 if name == 'timestamp' else np.float64)
+            for name in COLUMNS}
+
+
+def _file_signature(path):
+    """Size and modification time identifying a file version"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _file_day(path):
+    """Day number (days since epoch) of a per-day Lean file"""
+    day = datetime.strptime(os.path.basename(path)[:8], '%Y%m%d')
+    return int(pd.Timestamp(day).tz_localize('UTC').timestamp()) // SECONDS_PER_DAY
+
+
+class LeanDataImporter:
+    """
+    Bulk, incremental conversion of Lean data folders into a MarketDataStore
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, store=None, workers=None):
+        """
+        Initialize the importer
+
+        Args:
+            data_dir (str): Lean data folder
+            store (MarketDataStore, optional): Target store (default: DEFAULT_STORE_DIR)
+            workers (int, optional): Parser processes (default: CPU count)
+        """
+        self.data_dir = data_dir
+        self.store = store or MarketDataStore(DEFAULT_STORE_DIR)
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest_path = os.path.join(self.store.root, MANIFEST_FILE)
+        self.manifest = self._load_manifest()
+
+    def run(self, symbols, resolutions=('minute',), security_types=None, force=False):
+        """
+        Import symbols at the given resolutions
+
+        Args:
+            symbols (list): Symbols to import
+            resolutions (tuple): Resolutions to import (default: minute)
+            security_types (list, optional): Limit to these security types
+            force (bool): Re-parse every file even if unchanged
+
+        Returns:
+            list: Per symbol and resolution summary dicts
+        """
+        plans = []
+        for resolution in resolutions:
+            for source in find_sources(self.data_dir, symbols, resolution, security_types):
+                plans.append(self._plan(source, force))
+
+        # Parse every changed file of every symbol in one process pool
+        jobs = [(path, plan['source']['resolution'], plan['price_scale'])
+                for plan in plans for path in plan['changed']]
+        parsed = self._parse_all(jobs)
+
+        summaries = []
+        offset = 0
+        for plan in plans:
+            count = len(plan['changed'])
+            summaries.append(self._apply(plan, parsed[offset:offset + count]))
+            offset += count
+
+        self._save_manifest()
+        return summaries
+
+    def _plan(self, source, force):
+        """Compare a symbol's files with the manifest"""
+        key = f"{source['resolution']}/{source['symbol']}"
+        # Without stored bars to merge into, every current file is converted
+        rebuild = force or not self.store.has_symbol(source['symbol'], source['resolution'])
+        previous = self.manifest.get(key, {}).get('files', {})
+        current = {path: _file_signature(path) for path in source['files']}
+
+        changed = [path for path, signature in current.items()
+                   if rebuild or previous.get(path) != signature]
+        removed = [path for path in previous if path not in current]
+
+        price_scale = PRICE_SCALE if source['security_type'] in SCALED_PRICE_TYPES else 1.0
+        return {
+            'key': key,
+            'source': source,
+            'files': current,
+            'changed': changed,
+            'removed': removed,
+            'price_scale': price_scale,
+            'rebuild': rebuild
+        }
+
+    def _parse_all(self, jobs):
+        """Parse files in parallel, preserving job order"""
+        if not jobs:
+            return []
+        if self.workers == 1 or len(jobs) == 1:
+            return [_parse_job(job) for job in jobs]
+
+        chunksize = max(1, len(jobs) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(_parse_job, jobs, chunksize=chunksize))
+
+    def _apply(self, plan, parsed):
+        """Merge parsed files into the stored symbol and update the manifest"""
+        source = plan['source']
+        symbol, resolution = source['symbol'], source['resolution']
+        summary = {
+            'symbol': symbol,
+            'resolution': resolution,
+            'converted_files': len(plan['changed']),
+            'unchanged_files': len(plan['files']) - len(plan['changed']),
+            'removed_files': len(plan['removed'])
+        }
+
+        if not plan['changed'] and not plan['removed'] and not plan['rebuild']:
+            summary['rows'] = self.store.metadata(symbol, resolution)['rows']
+            return summary
+
+        pieces = list(parsed)
+        if not plan['rebuild']:
+            pieces.insert(0, self._retained_rows(plan))
+
+        columns = {name: np.concatenate([piece[name] for piece in pieces]) for name in COLUMNS}
+        time_zone = ('UTC' if source['security_type'] == 'crypto'
+                     else MARKET_TIME_ZONES.get(source['market'], 'UTC'))
+        meta = self.store.write(
+            symbol, columns, resolution, time_zone=time_zone,
+            source=os.path.join(source['security_type'], source['market'], resolution, symbol)
+        )
+
+        self.manifest[plan['key']] = {
+            'security_type': source['security_type'],
+            'market': source['market'],
+            'rows': meta['rows'],
+            'updated': datetime.now().isoformat(),
+            'files': plan['files']
+        }
+        summary['rows'] = meta['rows']
+        return summary
+
+    def _retained_rows(self, plan):
+        """Stored rows that do not belong to changed or removed files"""
+        source = plan['source']
+        stored = self.store.read(source['symbol'], resolution=source['resolution'])
+
+        if source['resolution'] not in PER_DAY_RESOLUTIONS:
+            # Single-file resolutions are replaced as a whole
+            return _empty_columns()
+
+        # A day's file holds bars starting on that day; their end can be midnight
+        period = RESOLUTION_SECONDS[source['resolution']]
+        replaced_days = [_file_day(path) for path in plan['changed'] + plan['removed']]
+        bar_days = (np.asarray(stored['timestamp']) - period) // SECONDS_PER_DAY
+        keep = ~np.isin(bar_days, replaced_days)
+        return {name: np.asarray(values)[keep] for name, values in stored.items()}
+
+    def _load_manifest(self):
+        """Read the manifest of converted files"""
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        """Write the manifest atomically"""
+        os.makedirs(self.store.root, exist_ok=True)
+        staging = self.manifest_path + '.tmp'
+        with open(staging, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(staging, self.manifest_path)
+
+
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Convert Lean zip/CSV data into the columnar store")
+    parser.add_argument('--symbols', nargs='+', required=True,
+                        help="Symbols to import, e.g. spy btcusd")
+    parser.add_argument('--resolutions', nargs='+', default=['minute'],
+                        choices=sorted(RESOLUTION_SECONDS),
+                        help="Resolutions to import (default: minute)")
+    parser.add_argument('--security-types', nargs='+', default=None,
+                        help="Limit to security types, e.g. equity crypto")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR,
+                        help="Lean data folder (default: ./data)")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR,
+                        help="Columnar store directory (default: ./data/columnar)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Parser processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-convert every file, ignoring the manifest")
+    return parser.parse_args()
+
+
+def main():
+    """Import Lean data into the columnar store"""
+    args = parse_arguments()
+
+    print("📦 Lean Data Importer")
+    print("=" * 50)
+
+    importer = LeanDataImporter(args.data_dir, MarketDataStore(args.store), args.workers)
+    summaries = importer.run(args.symbols, args.resolutions, args.security_types, args.force)
+
+    if not summaries:
+        print(f"❌ No trade data found for {', '.join(args.symbols)} in {args.data_dir}")
+        return 1
+
+    for summary in summaries:
+        print(f"✅ {summary['symbol'].upper()} {summary['resolution']}: "
+              f"{summary['converted_files']} converted, {summary['unchanged_files']} unchanged, "
+              f"{summary['removed_files']} removed, {summary['rows']} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
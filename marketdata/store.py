@@ -0,0 +1,337 @@
+"""
+Columnar Market Data Store
+
+Local, memory-mapped storage for minute (or other resolution) bars shared by
+the research, optimization and dashboard tools.
+
+Layout, one directory per resolution and symbol:
+
+    <root>/<resolution>/<symbol>/
+        timestamp.npy   int64 bar end times (Unix seconds)
+        open.npy        float64
+        high.npy        float64
+        low.npy         float64
+        close.npy       float64
+        volume.npy      float64
+        day_index.npy   int64 (days, 3): day number, first row, end row
+        meta.json       row count, time range, time zone, source
+
+Timestamps follow the strategies' minute exports: bar end times of the data's
+wall clock (see meta.json 'time_zone') encoded as if they were UTC, so day
+boundaries are timestamp // 86400.
+
+Columns are opened with np.load(mmap_mode='r'), so a time-range read is a
+zero-copy slice of the mapped files; only the pages actually touched are read
+from disk.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Next to Lean's data folder (lean.json 'data-folder')
+DEFAULT_STORE_DIR = os.path.join(REPO_DIR, 'data', 'columnar')
+
+COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+COLUMN_DTYPES = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64
+}
+
+SECONDS_PER_DAY = 86400
+
+
+def to_timestamp(value):
+    """
+    Convert a date-like value to store timestamp seconds
+
+    Args:
+        value (datetime, str or int): Date, datetime or Unix seconds
+
+    Returns:
+        int: Seconds, naive datetimes taken as-is (wall clock encoded as UTC)
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int(timestamp.timestamp())
+
+
+class MarketDataStore:
+    """
+    Memory-mapped columnar bar store with a per-day row index
+
+    Opened columns are kept per symbol and reopened when meta.json changes,
+    so readers pick up data written by an importer.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        """
+        Open a store directory (created on first write)
+
+        Args:
+            root (str): Store root directory
+        """
+        self.root = root
+        self._open = {}
+
+    def symbol_dir(self, symbol, resolution='minute'):
+        """Directory holding a symbol's columns"""
+        return os.path.join(self.root, resolution.lower(), symbol.lower())
+
+    def symbols(self, resolution='minute'):
+        """
+        List stored symbols
+
+        Args:
+            resolution (str): Bar resolution (default: 'minute')
+
+        Returns:
+            list: Symbol names (lowercase)
+        """
+        resolution_dir = os.path.join(self.root, resolution.lower())
+        if not os.path.isdir(resolution_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(resolution_dir)
+            if os.path.exists(os.path.join(resolution_dir, name, 'meta.json'))
+        )
+
+    def has_symbol(self, symbol, resolution='minute'):
+        """Whether bars are stored for a symbol"""
+        return os.path.exists(os.path.join(self.symbol_dir(symbol, resolution), 'meta.json'))
+
+    def metadata(self, symbol, resolution='minute'):
+        """
+        Stored metadata of a symbol
+
+        Returns:
+            dict: meta.json contents
+        """
+        return dict(self._columns(symbol, resolution)['meta'])
+
+    def write(self, symbol, bars, resolution='minute', time_zone='UTC', source=None):
+        """
+        Replace a symbol's bars
+
+        The columns are written to a temporary directory and swapped in, so
+        concurrent readers never see a partially written symbol.
+
+        Args:
+            symbol (str): Symbol name
+            bars (dict or pd.DataFrame): Columns 'timestamp', 'open', 'high',
+                'low', 'close' and optionally 'volume'
+            resolution (str): Bar resolution (default: 'minute')
+            time_zone (str): Wall-clock time zone of the timestamps
+            source (str, optional): Description of where the bars came from
+
+        Returns:
+            dict: Written metadata
+        """
+        columns = {}
+        for name in COLUMNS:
+            if name in bars:
+                columns[name] = np.ascontiguousarray(np.asarray(bars[name]), dtype=COLUMN_DTYPES[name])
+            elif name == 'volume':
+                columns[name] = np.zeros(len(columns['timestamp']), dtype=np.float64)
+            else:
+                raise ValueError(f"Missing column '{name}'")
+
+        timestamps = columns['timestamp']
+        rows = len(timestamps)
+        if any(len(values) != rows for values in columns.values()):
+            raise ValueError("All columns must have the same length")
+
+        # Sort by time and drop duplicate bars, keeping the last occurrence
+        if rows and np.any(np.diff(timestamps) <= 0):
+            order = np.argsort(timestamps, kind='stable')
+            keep = np.ones(rows, dtype=bool)
+            keep[:-1] = timestamps[order][1:] != timestamps[order][:-1]
+            order = order[keep]
+            columns = {name: values[order] for name, values in columns.items()}
+            timestamps = columns['timestamp']
+            rows = len(timestamps)
+
+        day_index = self._build_day_index(timestamps)
+        meta = {
+            'symbol': symbol.lower(),
+            'resolution': resolution.lower(),
+            'rows': rows,
+            'first_timestamp': int(timestamps[0]) if rows else None,
+            'last_timestamp': int(timestamps[-1]) if rows else None,
+            'days': len(day_index),
+            'time_zone': time_zone,
+            'source': source
+        }
+
+        target = self.symbol_dir(symbol, resolution)
+        staging = target + '.tmp'
+        retired = target + '.old'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        for name, values in columns.items():
+            np.save(os.path.join(staging, f'{name}.npy'), values)
+        np.save(os.path.join(staging, 'day_index.npy'), day_index)
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        # Release our own mappings before swapping the directories
+        self._open.pop((resolution.lower(), symbol.lower()), None)
+
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.exists(target):
+            os.replace(target, retired)
+        os.replace(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+
+        return meta
+
+    def import_csv(self, symbol, file_path, resolution='minute', time_zone='UTC'):
+        """
+        Load a strategy's *_minute_equity_data.csv export into the store
+
+        Args:
+            symbol (str): Symbol the export belongs to
+            file_path (str): CSV with timestamp, open, high, low, close, volume columns
+            resolution (str): Bar resolution (default: 'minute')
+            time_zone (str): Algorithm time zone the export was written in
+
+        Returns:
+            dict: Written metadata
+        """
+        frame = pd.read_csv(file_path, usecols=list(COLUMNS))
+        return self.write(symbol, frame, resolution, time_zone=time_zone,
+                          source=os.path.abspath(file_path))
+
+    def read(self, symbol, start=None, end=None, resolution='minute', columns=COLUMNS):
+        """
+        Read bars in a time range as zero-copy views of the mapped columns
+
+        Args:
+            symbol (str): Symbol name
+            start (datetime, str or int, optional): Range start (inclusive)
+            end (datetime, str or int, optional): Range end (exclusive)
+            resolution (str): Bar resolution (default: 'minute')
+            columns (tuple): Columns to return
+
+        Returns:
+            dict: Read-only arrays by column name
+        """
+        opened = self._columns(symbol, resolution)
+        first, last = self.row_range(symbol, start, end, resolution)
+        return {name: opened['arrays'][name][first:last] for name in columns}
+
+    def read_frame(self, symbol, start=None, end=None, resolution='minute'):
+        """
+        Read bars in a time range as a DataFrame indexed by bar end time
+
+        Unlike read, this copies the selected rows.
+
+        Returns:
+            pd.DataFrame: open, high, low, close and volume columns
+        """
+        bars = self.read(symbol, start, end, resolution)
+        frame = pd.DataFrame({name: np.array(bars[name]) for name in COLUMNS[1:]},
+                             index=pd.to_datetime(np.array(bars['timestamp']), unit='s'))
+        frame.index.name = 'time'
+        return frame
+
+    def row_range(self, symbol, start=None, end=None, resolution='minute'):
+        """
+        Rows of a symbol's bars inside a time range
+
+        The day index narrows the search to the boundary days, so only those
+        days' timestamps are touched.
+
+        Returns:
+            tuple: (first row, end row)
+        """
+        opened = self._columns(symbol, resolution)
+        rows = opened['meta']['rows']
+        first = 0 if start is None else self._locate(opened, to_timestamp(start))
+        last = rows if end is None else self._locate(opened, to_timestamp(end))
+        return first, max(first, last)
+
+    def days(self, symbol, resolution='minute'):
+        """
+        Stored trading days
+
+        Returns:
+            list: datetime.date of every day with bars
+        """
+        day_index = self._columns(symbol, resolution)['day_index']
+        return [pd.Timestamp(int(day) * SECONDS_PER_DAY, unit='s').date() for day in day_index[:, 0]]
+
+    def _locate(self, opened, timestamp):
+        """First row with a timestamp >= timestamp"""
+        day_index = opened['day_index']
+        if len(day_index) == 0:
+            return 0
+
+        day = timestamp // SECONDS_PER_DAY
+        position = int(np.searchsorted(day_index[:, 0], day, side='left'))
+        if position == len(day_index):
+            return opened['meta']['rows']
+        if day_index[position, 0] != day:
+            return int(day_index[position, 1])
+
+        first, last = int(day_index[position, 1]), int(day_index[position, 2])
+        return first + int(np.searchsorted(opened['arrays']['timestamp'][first:last],
+                                           timestamp, side='left'))
+
+    def _columns(self, symbol, resolution):
+        """Mapped columns of a symbol, reopened when its metadata changed"""
+        key = (resolution.lower(), symbol.lower())
+        directory = self.symbol_dir(symbol, resolution)
+        meta_path = os.path.join(directory, 'meta.json')
+        if not os.path.exists(meta_path):
+            raise KeyError(f"No {resolution} bars stored for '{symbol}' in {self.root}")
+
+        mtime = os.stat(meta_path).st_mtime_ns
+        opened = self._open.get(key)
+        if opened is None or opened['mtime'] != mtime:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            opened = {
+                'mtime': mtime,
+                'meta': meta,
+                'day_index': np.load(os.path.join(directory, 'day_index.npy')),
+                'arrays': {
+                    name: self._load_column(os.path.join(directory, f'{name}.npy'), name, meta['rows'])
+                    for name in COLUMNS
+                }
+            }
+            self._open[key] = opened
+        return opened
+
+    @staticmethod
+    def _load_column(path, name, rows):
+        """Memory-map a column file (empty files cannot be mapped)"""
+        if rows == 0:
+            return np.empty(0, dtype=COLUMN_DTYPES[name])
+        return np.load(path, mmap_mode='r')
+
+    @staticmethod
+    def _build_day_index(timestamps):
+        """(day number, first row, end row) of every day in sorted timestamps"""
+        if len(timestamps) == 0:
+            return np.empty((0, 3), dtype=np.int64)
+
+        days = timestamps // SECONDS_PER_DAY
+        starts = np.flatnonzero(np.diff(days, prepend=days[0] - 1))
+        ends = np.append(starts[1:], len(timestamps))
+        return np.column_stack([days[starts], starts, ends]).astype(np.int64)
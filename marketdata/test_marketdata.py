@@ -0,0 +1,269 @@
+"""
+Market Data Tools - Test Suite
+
+Unit tests for the memory-mapped columnar bar store and the incremental
+Lean data importer.
+
+Run tests with: python -m unittest marketdata.test_marketdata
+
+Author: Claude Code
+Created: 2024
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+# Add the repository root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from marketdata import MarketDataStore
+from marketdata import lean_import
+
+
+def make_temp_dir(test):
+    """Temporary directory removed when the test finishes"""
+    path = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, path, True)
+    return path
+
+
+# Tuesday 2024-01-02 00:00 UTC
+DAY = 86400
+TUESDAY = 1704153600
+
+
+class TestMarketDataStore(unittest.TestCase):
+    """Test suite for the memory-mapped columnar bar store"""
+
+    def setUp(self):
+        self.root = make_temp_dir(self)
+        self.store = MarketDataStore(self.root)
+        # Two bars on Tuesday, Tuesday's last minute, Wednesday from midnight,
+        # nothing on Thursday, two bars on Friday
+        self.timestamps = np.array([
+            TUESDAY + 60, TUESDAY + 120, TUESDAY + DAY - 60,
+            TUESDAY + DAY, TUESDAY + DAY + 60,
+            TUESDAY + 3 * DAY + 3600, TUESDAY + 3 * DAY + 7200
+        ])
+        self.close = 100.0 + np.arange(len(self.timestamps))
+        self.store.write('SPY', self.bars(self.timestamps, self.close), time_zone='America/New_York')
+
+    @staticmethod
+    def bars(timestamps, close):
+        return {'timestamp': timestamps, 'open': close - 1, 'high': close + 1,
+                'low': close - 2, 'close': close, 'volume': np.full(len(close), 10.0)}
+
+    def rows(self, start=None, end=None):
+        return self.store.row_range('spy', start, end)
+
+    def test_layout_and_metadata(self):
+        """Columns are mapped read-only and the day index lists days with bars"""
+        bars = self.store.read('spy')
+        self.assertIsInstance(bars['close'], np.memmap)
+        np.testing.assert_array_equal(bars['timestamp'], self.timestamps)
+        self.assertEqual(self.store.symbols(), ['spy'])
+        self.assertTrue(self.store.has_symbol('SPY'))
+        self.assertFalse(self.store.has_symbol('spy', resolution='hour'))
+
+        meta = self.store.metadata('spy')
+        self.assertEqual((meta['rows'], meta['days'], meta['time_zone']), (7, 3, 'America/New_York'))
+        self.assertEqual([str(day) for day in self.store.days('spy')],
+                         ['2024-01-02', '2024-01-03', '2024-01-05'])
+        with self.assertRaises(KeyError):
+            self.store.read('qqq')
+
+    def test_ranges_at_day_boundaries(self):
+        """Start is inclusive and end exclusive, also at midnight and on days without bars"""
+        self.assertEqual(self.rows(), (0, 7))
+        self.assertEqual(self.rows(TUESDAY + DAY), (3, 7))              # midnight bar belongs to Wednesday
+        self.assertEqual(self.rows(end=TUESDAY + DAY), (0, 3))
+        self.assertEqual(self.rows(TUESDAY + DAY - 60, TUESDAY + DAY + 1), (2, 4))
+        self.assertEqual(self.rows(TUESDAY + DAY + 61), (5, 7))         # past Wednesday's last bar
+        self.assertEqual(self.rows(TUESDAY + 2 * DAY + 100), (5, 7))    # Thursday has no bars
+        self.assertEqual(self.rows(end=TUESDAY + 2 * DAY + 100), (0, 5))
+        self.assertEqual(self.rows('2024-01-03', '2024-01-05 01:30'), (3, 6))
+
+        # Outside the stored range, and reversed ranges, are empty
+        self.assertEqual(self.rows(TUESDAY - DAY, TUESDAY), (0, 0))
+        self.assertEqual(self.rows(TUESDAY + 10 * DAY), (7, 7))
+        self.assertEqual(self.rows(TUESDAY + 3 * DAY, TUESDAY + DAY), (5, 5))
+
+        window = self.store.read('spy', '2024-01-03', '2024-01-04', columns=('close',))
+        self.assertEqual(list(window), ['close'])
+        np.testing.assert_array_equal(window['close'], self.close[3:5])
+
+    def test_write_sorts_and_drops_duplicates(self):
+        """Unsorted input is sorted; of duplicate timestamps the last one wins"""
+        timestamps = np.array([TUESDAY + 180, TUESDAY + 60, TUESDAY + 180, TUESDAY + 120])
+        close = np.array([1.0, 2.0, 3.0, 4.0])
+        meta = self.store.write('qqq', {'timestamp': timestamps, 'open': close,
+                                        'high': close, 'low': close, 'close': close})
+        self.assertEqual(meta['rows'], 3)
+
+        bars = self.store.read('qqq')
+        np.testing.assert_array_equal(bars['timestamp'], [TUESDAY + 60, TUESDAY + 120, TUESDAY + 180])
+        np.testing.assert_array_equal(bars['close'], [2.0, 4.0, 3.0])
+        np.testing.assert_array_equal(bars['volume'], np.zeros(3))
+
+        with self.assertRaises(ValueError):
+            self.store.write('qqq', {'timestamp': timestamps, 'close': close})
+        with self.assertRaises(ValueError):
+            self.store.write('qqq', self.bars(timestamps, close[:3]))
+
+    def test_empty_symbol(self):
+        """A symbol written without rows reads as empty arrays"""
+        meta = self.store.write('empty', self.bars(np.array([], dtype=np.int64), np.array([])))
+        self.assertEqual((meta['rows'], meta['first_timestamp']), (0, None))
+        self.assertEqual(self.store.row_range('empty', TUESDAY, TUESDAY + DAY), (0, 0))
+        self.assertEqual(len(self.store.read('empty')['close']), 0)
+        self.assertEqual(self.store.days('empty'), [])
+        self.assertTrue(self.store.read_frame('empty').empty)
+
+    def test_reopens_after_rewrite(self):
+        """Another writer's rewrite is picked up through meta.json's mtime"""
+        self.assertEqual(self.store.metadata('spy')['rows'], 7)
+
+        MarketDataStore(self.root).write('spy', self.bars(self.timestamps[:2], self.close[:2] + 50))
+        # Make the new meta.json's mtime differ even on coarse-resolution filesystems
+        meta_path = os.path.join(self.store.symbol_dir('spy'), 'meta.json')
+        st = os.stat(meta_path)
+        os.utime(meta_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        np.testing.assert_array_equal(self.store.read('spy')['close'], self.close[:2] + 50)
+        self.assertEqual(self.store.metadata('spy')['rows'], 2)
+
+    def test_read_frame(self):
+        """Frames are indexed by bar end time and hold copies of the rows"""
+        frame = self.store.read_frame('spy', '2024-01-03', '2024-01-06')
+        self.assertEqual(list(frame.columns), ['open', 'high', 'low', 'close', 'volume'])
+        self.assertEqual(frame.index.name, 'time')
+        self.assertEqual(list(frame.index), list(pd.to_datetime([
+            '2024-01-03 00:00', '2024-01-03 00:01', '2024-01-05 01:00', '2024-01-05 02:00'])))
+        np.testing.assert_array_equal(frame['close'].values, self.close[3:])
+        frame['close'] = 0.0
+        np.testing.assert_array_equal(self.store.read('spy')['close'][3:], self.close[3:])
+
+
+def write_lean_minute_zip(folder, day, closes, ticker='spy'):
+    """Write one day of Lean minute trade bars (deci-cent prices) starting at 09:30"""
+    os.makedirs(folder, exist_ok=True)
+    rows = [f"{(34200 + 60 * i) * 1000},{c - 100},{c + 200},{c - 300},{c},{1000 + i}"
+            for i, c in enumerate(closes)]
+    path = os.path.join(folder, f'{day}_trade.zip')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr(f'{day}_{ticker}_minute_trade.csv', '\n'.join(rows) + '\n')
+    return path
+
+
+class TestLeanDataImporter(unittest.TestCase):
+    """Test suite for the incremental Lean zip importer"""
+
+    def setUp(self):
+        self.lean_import = lean_import
+        root = make_temp_dir(self)
+        self.data_dir = os.path.join(root, 'data')
+        self.minute_dir = os.path.join(self.data_dir, 'equity', 'usa', 'minute', 'spy')
+        self.store = MarketDataStore(os.path.join(root, 'columnar'))
+
+        self.closes = {
+            '20240102': [4700000, 4701000, 4702500],
+            '20240103': [4710000, 4709000],
+            '20240104': [4720000, 4725000, 4721000],
+            '20240105': [4730000, 4731500]
+        }
+
+    def write_day(self, day):
+        return write_lean_minute_zip(self.minute_dir, day, self.closes[day])
+
+    def expected(self, days):
+        """Bar end timestamps and deci-cent closes of the given days"""
+        timestamps, closes = [], []
+        for day in days:
+            day_start = int(pd.Timestamp(day).tz_localize('UTC').timestamp())
+            for i, close in enumerate(self.closes[day]):
+                timestamps.append(day_start + 34200 + 60 * i + 60)
+                closes.append(close)
+        return np.array(timestamps), np.array(closes)
+
+    def run_import(self, workers=1):
+        """Import and return (summary, files parsed)"""
+        with mock.patch.object(self.lean_import, 'parse_lean_file',
+                               wraps=self.lean_import.parse_lean_file) as parse:
+            importer = self.lean_import.LeanDataImporter(self.data_dir, self.store, workers=workers)
+            summaries = importer.run(['SPY'])
+        self.assertEqual(len(summaries), 1)
+        return summaries[0], sorted(os.path.basename(call.args[0]) for call in parse.call_args_list)
+
+    def assert_store_holds(self, days):
+        timestamps, closes = self.expected(days)
+        bars = self.store.read('spy')
+        np.testing.assert_array_equal(bars['timestamp'], timestamps)
+        np.testing.assert_array_equal(bars['close'], closes / 10000.0)
+        np.testing.assert_array_equal(bars['high'], (closes + 200) / 10000.0)
+        self.assertEqual(self.store.metadata('spy')['time_zone'], 'America/New_York')
+
+    def test_parallel_import_matches_sources(self):
+        """A first import through the process pool converts every day in order"""
+        for day in ('20240102', '20240103', '20240104'):
+            self.write_day(day)
+        importer = self.lean_import.LeanDataImporter(self.data_dir, self.store, workers=2)
+        summary, = importer.run(['spy'])
+
+        self.assertEqual(summary['converted_files'], 3)
+        self.assertEqual(summary['rows'], 8)
+        self.assert_store_holds(['20240102', '20240103', '20240104'])
+
+    def test_incremental_add_and_remove(self):
+        """Re-runs parse only new days, keep unchanged days and drop removed ones"""
+        first_day = self.write_day('20240102')
+        self.write_day('20240103')
+        self.write_day('20240104')
+        summary, parsed = self.run_import()
+        self.assertEqual(len(parsed), 3)
+
+        summary, parsed = self.run_import()
+        self.assertEqual(parsed, [])
+        self.assertEqual((summary['converted_files'], summary['unchanged_files']), (0, 3))
+        self.assert_store_holds(['20240102', '20240103', '20240104'])
+
+        os.remove(first_day)
+        self.write_day('20240105')
+        summary, parsed = self.run_import()
+
+        self.assertEqual(parsed, ['20240105_trade.zip'])
+        self.assertEqual((summary['converted_files'], summary['unchanged_files'],
+                          summary['removed_files']), (1, 2, 1))
+        self.assertEqual(summary['rows'], 7)
+        self.assert_store_holds(['20240103', '20240104', '20240105'])
+
+    def test_rebuild_after_store_removed(self):
+        """A symbol missing from the store is rebuilt from every file the manifest lists"""
+        for day in ('20240102', '20240103', '20240104'):
+            self.write_day(day)
+        self.run_import()
+
+        shutil.rmtree(self.store.symbol_dir('spy'))
+        summary, parsed = self.run_import()
+        self.assertEqual(len(parsed), 3)
+        self.assertEqual(summary['rows'], 8)
+        self.assert_store_holds(['20240102', '20240103', '20240104'])
+
+        # Also when some files changed since the manifest was written
+        shutil.rmtree(self.store.symbol_dir('spy'))
+        self.closes['20240103'] = [4715000, 4716000]
+        self.write_day('20240103')
+        summary, parsed = self.run_import()
+        self.assertEqual(len(parsed), 3)
+        self.assert_store_holds(['20240102', '20240103', '20240104'])
+
+
+if __name__ == '__main__':
+    unittest.main()
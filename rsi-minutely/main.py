@@ -1,5 +1,12 @@
 # region imports
 from AlgorithmImports import *
+import os
+import sys
+
+# Shared strategy tools (Lean library project Library/strategy_tools)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Library'))
+from strategy_tools import (MinuteDataExporter, create_phase_profiler, profiling_enabled, PROFILE_PARAMETER,
+                            StrategyLogger)
 # endregion
 
 class MinutelyRSIStrategy(QCAlgorithm):
@@ -66,8 +73,18 @@ class MinutelyRSIStrategy(QCAlgorithm):
 
         # 1-minute data export tracking
         self.minute_data_file = "minute_equity_data.csv"
-        self.minute_data_written = False
-        self._write_minute_data_header()
+        self._create_minute_data_exporter()
+
+        # Leveled, rate-limited logging for the per-bar code paths
+        self.logger = StrategyLogger(
+            self,
+            level=self.get_parameter("log_level", "debug"),
+            max_per_interval=int(self.get_parameter("log_max_per_hour", "60"))
+        )
+
+        # Opt-in on_data phase timing (Lean parameter profile_phases=true)
+        self.profiler = create_phase_profiler(
+            profiling_enabled(self.get_parameter(PROFILE_PARAMETER, "false")))
 
         # Debug logging
         self.debug("Minutely RSI Strategy initialized")
@@ -76,26 +93,21 @@ class MinutelyRSIStrategy(QCAlgorithm):
         self.debug(f"Stop Loss: {self.stop_loss_pct:.1%}, Take Profit: {self.take_profit_pct:.1%}")
         self.debug(f"📊 Exporting 1-minute data to: {self.minute_data_file}")
 
-    def _write_minute_data_header(self):
-        """Write CSV header for 1-minute data export."""
-        with open(self.minute_data_file, 'w') as f:
-            f.write("timestamp,datetime_utc,open,high,low,close,volume,portfolio_value,equity\n")
+    def _create_minute_data_exporter(self):
+        """Create the buffered 1-minute data exporter (writes the CSV header)."""
+        formats = [fmt.strip() for fmt in self.get_parameter("minute_export_formats", "csv").split(",")]
+        flush_every = int(self.get_parameter("minute_export_flush_bars", "10000"))
+        self.minute_exporter = MinuteDataExporter(self.minute_data_file, flush_every, formats)
         self.debug(f"📁 Created minute data export file: {self.minute_data_file}")
 
     def _export_minute_data(self, data: Slice):
-        """Export 1-minute data to CSV file."""
+        """Buffer 1-minute data for export."""
         if self.symbol not in data:
             return
 
         bar = data[self.symbol]
-        timestamp = int(bar.end_time.timestamp())
-        portfolio_value = self.Portfolio.total_portfolio_value
-
-        # Write to CSV
-        with open(self.minute_data_file, 'a') as f:
-            f.write(f"{timestamp},{bar.end_time.isoformat()},{bar.open:.2f},"
-                   f"{bar.high:.2f},{bar.low:.2f},{bar.close:.2f},"
-                   f"{bar.volume},{portfolio_value:.2f},{portfolio_value:.2f}\n")
+        # Buffered; rows are written in chunks and at on_end_of_algorithm
+        self.minute_exporter.record_bar(bar, self.Portfolio.total_portfolio_value)
 
     def on_data(self, data: Slice):
         """Execute the RSI strategy on each new data point.
@@ -103,8 +115,12 @@ class MinutelyRSIStrategy(QCAlgorithm):
         Args:
             data: Slice object containing the current market data
         """
+        profiler = self.profiler
+        profiler.begin()
+
         # Export 1-minute data (true minute intervals, not 12-minute)
         self._export_minute_data(data)
+        profiler.lap('export')
 
         # Ensure we have RSI data ready
         if not self.rsi.is_ready:
@@ -125,8 +141,10 @@ class MinutelyRSIStrategy(QCAlgorithm):
 
         # Check daily loss limit
         if self._is_daily_loss_limit_breached():
-            self.debug("Daily loss limit breached - pausing trading")
+            # Repeats on every bar for the rest of the day once breached
+            self.logger.debug('daily_loss_limit', "Daily loss limit breached - pausing trading")
             return
+        profiler.lap('risk_checks')
 
         # Check for buy signal (RSI oversold)
         if (current_rsi <= self.oversold_threshold and
@@ -141,10 +159,12 @@ class MinutelyRSIStrategy(QCAlgorithm):
               self._validate_trade_signal('sell', current_price, current_rsi)):
 
             self._execute_sell_signal(current_price, current_rsi)
+        profiler.lap('signals')
 
         # Check stop-loss and take-profit conditions
         if self.is_invested:
             self._check_exit_conditions(current_price)
+        profiler.lap('exits')
 
     def _execute_buy_signal(self, price, rsi):
         """Execute buy signal with position sizing and risk management."""
@@ -223,12 +243,12 @@ class MinutelyRSIStrategy(QCAlgorithm):
 
         # Ensure minimum price level (avoid extremely low prices)
         if price < 10:
-            self.debug(f"Ignoring signal due to low price: ${price:.2f}")
+            self.logger.debug('low_price_signal', "Ignoring signal due to low price: ${:.2f}", price)
             return False
 
         # Ensure RSI is within reasonable bounds
         if rsi < 0 or rsi > 100:
-            self.debug(f"Ignoring signal due to invalid RSI: {rsi}")
+            self.logger.debug('invalid_rsi_signal', "Ignoring signal due to invalid RSI: {}", rsi)
             return False
 
         return True
@@ -267,6 +287,9 @@ class MinutelyRSIStrategy(QCAlgorithm):
 
     def on_end_of_algorithm(self):
         """Log final algorithm statistics and performance metrics."""
+        # Write out the remaining buffered minute data
+        self.minute_exporter.close()
+
         total_portfolio_value = self.Portfolio.total_portfolio_value
         total_return = (total_portfolio_value / 100000 - 1) * 100
         total_fees = self.portfolio.total_fees
@@ -299,4 +322,11 @@ class MinutelyRSIStrategy(QCAlgorithm):
         except Exception as e:
             self.debug(f"❌ Error checking minute data file: {e}")
 
+        if self.profiler.enabled:
+            for line in self.profiler.report_lines():
+                self.debug(line)
+            self.profiler.save("rsi_phase_profile.json")
+
+        self.logger.log_summary()
+
         self.debug("Strategy execution completed.")
@@ -1,5 +1,11 @@
 # region imports
 from AlgorithmImports import *
+import os
+import sys
+
+# Shared strategy tools (Lean library project Library/strategy_tools)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Library'))
+from strategy_tools import MinuteDataExporter, create_phase_profiler, profiling_enabled, PROFILE_PARAMETER
 # endregion
 
 class Smacrossover(QCAlgorithm):
@@ -32,32 +38,30 @@ class Smacrossover(QCAlgorithm):
 
         # 1-minute data export tracking
         self.minute_data_file = "sma_minute_equity_data.csv"
-        self.minute_data_written = False
-        self._write_minute_data_header()
+        self._create_minute_data_exporter()
+
+        # Opt-in on_data phase timing (Lean parameter profile_phases=true)
+        self.profiler = create_phase_profiler(
+            profiling_enabled(self.get_parameter(PROFILE_PARAMETER, "false")))
 
         # Debug logging
         self.debug("SMA Crossover Strategy initialized with minute data")
         self.debug(f"📊 Exporting 1-minute data to: {self.minute_data_file}")
 
-    def _write_minute_data_header(self):
-        """Write CSV header for 1-minute data export."""
-        with open(self.minute_data_file, 'w') as f:
-            f.write("timestamp,datetime_utc,open,high,low,close,volume,portfolio_value,equity\n")
+    def _create_minute_data_exporter(self):
+        """Create the buffered 1-minute data exporter (writes the CSV header)."""
+        formats = [fmt.strip() for fmt in self.get_parameter("minute_export_formats", "csv").split(",")]
+        flush_every = int(self.get_parameter("minute_export_flush_bars", "10000"))
+        self.minute_exporter = MinuteDataExporter(self.minute_data_file, flush_every, formats)
 
     def _export_minute_data(self, data: Slice):
-        """Export 1-minute data to CSV file."""
+        """Buffer 1-minute data for export."""
         if self.symbol not in data:
             return
 
         bar = data[self.symbol]
-        timestamp = int(bar.end_time.timestamp())
-        portfolio_value = self.Portfolio.total_portfolio_value
-
-        # Write to CSV
-        with open(self.minute_data_file, 'a') as f:
-            f.write(f"{timestamp},{bar.end_time.isoformat()},{bar.open:.2f},"
-                   f"{bar.high:.2f},{bar.low:.2f},{bar.close:.2f},"
-                   f"{bar.volume},{portfolio_value:.2f},{portfolio_value:.2f}\n")
+        # Buffered; rows are written in chunks and at on_end_of_algorithm
+        self.minute_exporter.record_bar(bar, self.Portfolio.total_portfolio_value)
 
     def on_data(self, data: Slice):
         """Execute the SMA crossover strategy on each new data point.
@@ -65,8 +69,12 @@ class Smacrossover(QCAlgorithm):
         Args:
             data: Slice object containing the current market data
         """
+        profiler = self.profiler
+        profiler.begin()
+
         # Export 1-minute data (true minute intervals, not 12-minute)
         self._export_minute_data(data)
+        profiler.lap('export')
 
         # Ensure we have both indicators ready
         if not (self.fast_sma.is_ready and self.slow_sma.is_ready):
@@ -87,6 +95,7 @@ class Smacrossover(QCAlgorithm):
 
         fast_sma_prev = self.fast_sma.previous.value
         slow_sma_prev = self.slow_sma.previous.value
+        profiler.lap('indicators')
 
         # Check for bullish crossover (fast SMA crosses above slow SMA)
         if (fast_sma_value > slow_sma_value and
@@ -109,6 +118,7 @@ class Smacrossover(QCAlgorithm):
             self.signals_count += 1
             self.debug(f"SELL #{self.signals_count} - Time: {self.time}, Price: ${current_price:.2f}, "
                       f"Fast SMA: ${fast_sma_value:.2f}, Slow SMA: ${slow_sma_value:.2f}")
+        profiler.lap('signals')
 
     def on_end_of_day(self):
         """Log portfolio status at end of each day."""
@@ -125,6 +135,9 @@ class Smacrossover(QCAlgorithm):
 
     def on_end_of_algorithm(self):
         """Log final algorithm statistics."""
+        # Write out the remaining buffered minute data
+        self.minute_exporter.close()
+
         total_portfolio_value = self.Portfolio.total_portfolio_value
         total_return = (total_portfolio_value / 100000 - 1) * 100
         self.debug(f"=== FINAL ALGORITHM RESULTS ===")
@@ -134,3 +147,8 @@ class Smacrossover(QCAlgorithm):
         self.debug(f"Total Fees: ${self.portfolio.total_fees:.2f}")
         if self.is_invested:
             self.debug(f"Final Position: LONG {self.portfolio[self.symbol].quantity} shares")
+
+        if self.profiler.enabled:
+            for line in self.profiler.report_lines():
+                self.debug(line)
+            self.profiler.save("sma_phase_profile.json")
@@ -0,0 +1,186 @@
+"""
+Recurrence kernels for the batch Supertrend computations
+
+The Wilder ATR smoothing and the band continuity logic are sequential
+recurrences that NumPy cannot vectorize along time. This module provides
+them behind one interface with two backends, chosen at import time:
+
+- numba:  the loop kernels below compiled with numba.njit (when installed)
+- python: the pure-Python reference implementation
+
+Set SUPERTREND_KERNELS=python to force the reference backend. Both backends
+produce bit-for-bit identical results (no fast-math, so no reassociation or
+fused multiply-add).
+
+Author: Claude Code
+Created: 2024
+"""
+
+import os
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# Reference implementation (lists of Python floats)
+
+def python_wilder_recurrence(true_range, prev_atr, period):
+    """
+    Continue Wilder's smoothing from prev_atr over an array of TR values
+
+    Args:
+        true_range (np.ndarray): True Range per bar
+        prev_atr (float): ATR before the first bar
+        period (int): ATR period
+
+    Returns:
+        np.ndarray: ATR per bar
+    """
+    atr = []
+    for tr in true_range.tolist():
+        prev_atr = (prev_atr * (period - 1) + tr) / period
+        atr.append(prev_atr)
+    return np.array(atr, dtype=np.float64)
+
+
+def python_band_recurrence(basic_upper, basic_lower, close, final_upper, final_lower):
+    """
+    Apply the band continuity logic bar by bar
+
+    Args:
+        basic_upper (np.ndarray): Basic upper band per bar
+        basic_lower (np.ndarray): Basic lower band per bar
+        close (np.ndarray): Close per bar
+        final_upper (float): Final upper band before the first bar
+        final_lower (float): Final lower band before the first bar
+
+    Returns:
+        tuple: (final_upper_band, final_lower_band) arrays
+    """
+    upper = []
+    lower = []
+    for bu, bl, c in zip(basic_upper.tolist(), basic_lower.tolist(), close.tolist()):
+        if bu < final_upper or c > final_upper:
+            final_upper = bu
+        if bl > final_lower or c < final_lower:
+            final_lower = bl
+        upper.append(final_upper)
+        lower.append(final_lower)
+    return np.array(upper, dtype=np.float64), np.array(lower, dtype=np.float64)
+
+
+def python_band_recurrence_2d(basic_upper, basic_lower, close, row_step_min_width=16):
+    """
+    Band continuity logic for a (bars, multipliers) grid
+
+    Wide grids step through time one row at a time with array operations;
+    narrow grids are cheaper as one scalar pass per column. Both give the
+    same values.
+
+    Args:
+        basic_upper (np.ndarray): (bars, multipliers) basic upper bands
+        basic_lower (np.ndarray): (bars, multipliers) basic lower bands
+        close (np.ndarray): Close per bar
+        row_step_min_width (int): Narrowest grid stepped row by row
+
+    Returns:
+        tuple: (final_upper_band, final_lower_band) 2-D arrays
+    """
+    n, width = basic_upper.shape
+    final_upper = np.empty_like(basic_upper)
+    final_lower = np.empty_like(basic_lower)
+
+    if width < row_step_min_width:
+        for j in range(width):
+            final_upper[:, j], final_lower[:, j] = python_band_recurrence(
+                basic_upper[:, j], basic_lower[:, j], close,
+                basic_upper[0, j], basic_lower[0, j]
+            )
+        return final_upper, final_lower
+
+    upper = basic_upper[0].copy()
+    lower = basic_lower[0].copy()
+    for i in range(n):
+        c = close[i]
+        bu = basic_upper[i]
+        bl = basic_lower[i]
+        np.copyto(upper, bu, where=(bu < upper) | (c > upper))
+        np.copyto(lower, bl, where=(bl > lower) | (c < lower))
+        final_upper[i] = upper
+        final_lower[i] = lower
+    return final_upper, final_lower
+
+
+# Loop kernels for compilation (plain Python, valid as-is without numba)
+
+def loop_wilder_recurrence(true_range, prev_atr, period):
+    """Wilder smoothing as an explicit loop over a float64 array"""
+    n = true_range.shape[0]
+    atr = np.empty(n)
+    for i in range(n):
+        prev_atr = (prev_atr * (period - 1) + true_range[i]) / period
+        atr[i] = prev_atr
+    return atr
+
+
+def loop_band_recurrence(basic_upper, basic_lower, close, final_upper, final_lower):
+    """Band continuity logic as an explicit loop over float64 arrays"""
+    n = close.shape[0]
+    upper = np.empty(n)
+    lower = np.empty(n)
+    for i in range(n):
+        bu = basic_upper[i]
+        bl = basic_lower[i]
+        c = close[i]
+        if bu < final_upper or c > final_upper:
+            final_upper = bu
+        if bl > final_lower or c < final_lower:
+            final_lower = bl
+        upper[i] = final_upper
+        lower[i] = final_lower
+    return upper, lower
+
+
+def loop_band_recurrence_2d(basic_upper, basic_lower, close, row_step_min_width=16):
+    """Band continuity logic over every column of a (bars, multipliers) grid"""
+    n, width = basic_upper.shape
+    final_upper = np.empty((n, width))
+    final_lower = np.empty((n, width))
+    for j in range(width):
+        upper = basic_upper[0, j]
+        lower = basic_lower[0, j]
+        for i in range(n):
+            bu = basic_upper[i, j]
+            bl = basic_lower[i, j]
+            c = close[i]
+            if bu < upper or c > upper:
+                upper = bu
+            if bl > lower or c < lower:
+                lower = bl
+            final_upper[i, j] = upper
+            final_lower[i, j] = lower
+    return final_upper, final_lower
+
+
+def _select_backend():
+    """Pick the kernel backend: numba when installed unless overridden"""
+    requested = os.environ.get('SUPERTREND_KERNELS', '').strip().lower()
+    if requested == 'python' or numba is None:
+        return 'python'
+    return 'numba'
+
+
+KERNEL_BACKEND = _select_backend()
+
+if KERNEL_BACKEND == 'numba':
+    # cache=True keeps the compiled code next to this file between runs
+    wilder_recurrence = numba.njit(cache=True)(loop_wilder_recurrence)
+    band_recurrence = numba.njit(cache=True)(loop_band_recurrence)
+    band_recurrence_2d = numba.njit(cache=True)(loop_band_recurrence_2d)
+else:
+    wilder_recurrence = python_wilder_recurrence
+    band_recurrence = python_band_recurrence
+    band_recurrence_2d = python_band_recurrence_2d
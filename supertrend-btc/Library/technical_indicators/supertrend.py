@@ -7,11 +7,79 @@ Created: 2024
 Version: 1.0.0
 """
 
-from QuantConnect import *
-from QuantConnect.Algorithm import *
+try:
+    from QuantConnect import *
+    from QuantConnect.Algorithm import *
+except ImportError:
+    # Standalone use (research, optimization, tests) outside of Lean
+    pass
+
+import os
+import sys
 from collections import deque
+from datetime import datetime, timedelta, timezone
 import numpy as np
 
+# Sequential recurrences: compiled when a kernel backend is available
+from .kernels import wilder_recurrence, band_recurrence, band_recurrence_2d
+
+# Grids at least this wide run the band recurrence row by row as arrays
+# (pure-Python kernel backend only)
+BAND_ROW_STEP_MIN_WIDTH = 16
+
+
+def true_range_array(high, low, close, prev_close=None):
+    """
+    Vectorized True Range over whole OHLC arrays
+
+    Args:
+        high (np.ndarray): Bar high prices
+        low (np.ndarray): Bar low prices
+        close (np.ndarray): Bar close prices
+        prev_close (float, optional): Close preceding the first bar
+
+    Returns:
+        np.ndarray: True Range per bar, identical to calculate_true_range()
+    """
+    n = len(close)
+    shifted_close = np.empty(n)
+    if n:
+        shifted_close[0] = np.nan if prev_close is None else prev_close
+        shifted_close[1:] = close[:-1]
+
+    true_range = np.maximum.reduce([
+        high - low,
+        np.abs(high - shifted_close),
+        np.abs(low - shifted_close)
+    ])
+    if n and prev_close is None:
+        true_range[0] = high[0] - low[0]
+    return true_range
+
+
+def wilder_atr_array(true_range, period):
+    """
+    Wilder ATR over a whole True Range array from a fresh indicator state
+
+    Reproduces calculate_atr() exactly, including the simple-average warmup
+    over the first `period` bars (a running sum, as np.cumsum accumulates).
+
+    Args:
+        true_range (np.ndarray): True Range per bar
+        period (int): ATR period
+
+    Returns:
+        np.ndarray: ATR per bar
+    """
+    n = len(true_range)
+    atr = np.empty(n)
+    warmup = min(period, n)
+    if warmup:
+        atr[:warmup] = np.cumsum(true_range[:warmup]) / np.arange(1, warmup + 1)
+    if n >= period:
+        atr[period - 1:] = wilder_recurrence(true_range[period - 1:], float(atr[period - 1]), period)
+    return atr
+
 
 class SuperTrendIndicator:
     """
@@ -31,6 +99,13 @@ class SuperTrendIndicator:
     - Final bands incorporate continuity logic to prevent whipsaws
     """
 
+    # Fixed attribute layout: constant memory and faster attribute access
+    __slots__ = (
+        'period', 'multiplier', '_tr_sum', '_tr_count', '_prev_atr',
+        'final_upper_band', 'final_lower_band', 'supertrend', 'signal', 'prev_signal',
+        'is_ready', 'bar_count', 'prev_close', 'returns_history'
+    )
+
     def __init__(self, period=10, multiplier=3):
         """
         Initialize the Supertrend Indicator
@@ -42,8 +117,10 @@ class SuperTrendIndicator:
         self.period = period
         self.multiplier = multiplier
 
-        # ATR calculation tracking
-        self.atr_values = deque(maxlen=period)
+        # ATR calculation tracking: running TR sum for the warmup average,
+        # then only the previous ATR for Wilder's recurrence
+        self._tr_sum = 0.0
+        self._tr_count = 0
         self._prev_atr = None
 
         # Band calculations
@@ -102,19 +179,19 @@ class SuperTrendIndicator:
         Returns:
             float: Average True Range
         """
-        self.atr_values.append(tr)
-
-        if len(self.atr_values) < self.period:
+        prev_atr = self._prev_atr
+        if prev_atr is None:
             # Initial ATR is simple average of available values
-            return np.mean(list(self.atr_values))
-        else:
-            # Subsequent ATR uses Wilder's smoothing
-            if self._prev_atr is None:
-                self._prev_atr = np.mean(list(self.atr_values))
+            self._tr_sum += tr
+            self._tr_count += 1
+            if self._tr_count < self.period:
+                return self._tr_sum / self._tr_count
+            prev_atr = self._tr_sum / self._tr_count
 
-            current_atr = (self._prev_atr * (self.period - 1) + tr) / self.period
-            self._prev_atr = current_atr
-            return current_atr
+        # Subsequent ATR uses Wilder's smoothing
+        current_atr = (prev_atr * (self.period - 1) + tr) / self.period
+        self._prev_atr = current_atr
+        return current_atr
 
     def update(self, high, low, close):
         """
@@ -130,9 +207,30 @@ class SuperTrendIndicator:
         """
         self.bar_count += 1
 
-        # Calculate True Range and ATR
-        tr = self.calculate_true_range(high, low, self.prev_close)
-        atr = self.calculate_atr(tr)
+        # Plain floats: NumPy scalar arithmetic is several times slower
+        high = float(high)
+        low = float(low)
+        close = float(close)
+
+        # Calculate True Range (inlined calculate_true_range)
+        tr = high - low
+        prev_close = self.prev_close
+        if prev_close is not None:
+            gap = abs(high - prev_close)
+            if gap > tr:
+                tr = gap
+            gap = abs(low - prev_close)
+            if gap > tr:
+                tr = gap
+
+        # ATR: warmup average via calculate_atr, then the bare Wilder recurrence
+        prev_atr = self._prev_atr
+        if prev_atr is None:
+            atr = self.calculate_atr(tr)
+        else:
+            period = self.period
+            atr = (prev_atr * (period - 1) + tr) / period
+            self._prev_atr = atr
 
         # Calculate basic bands using HL2 midpoint
         hl_midpoint = (high + low) / 2.0
@@ -140,28 +238,32 @@ class SuperTrendIndicator:
         basic_lower = hl_midpoint - (self.multiplier * atr)
 
         # Apply final band logic with continuity constraint
-        if self.final_upper_band is None:
+        final_upper = self.final_upper_band
+        final_lower = self.final_lower_band
+        if final_upper is None:
             # First calculation - initialize bands
-            self.final_upper_band = basic_upper
-            self.final_lower_band = basic_lower
+            final_upper = basic_upper
+            final_lower = basic_lower
         else:
             # Update bands with continuity logic to prevent whipsaws
-            if basic_upper < self.final_upper_band or close > self.final_upper_band:
-                self.final_upper_band = basic_upper
+            if basic_upper < final_upper or close > final_upper:
+                final_upper = basic_upper
             # Else keep previous upper band (continuity)
 
-            if basic_lower > self.final_lower_band or close < self.final_lower_band:
-                self.final_lower_band = basic_lower
+            if basic_lower > final_lower or close < final_lower:
+                final_lower = basic_lower
             # Else keep previous lower band (continuity)
+        self.final_upper_band = final_upper
+        self.final_lower_band = final_lower
 
         # Determine supertrend value and signal
         self.prev_signal = self.signal
 
-        if close <= self.final_upper_band:
-            self.supertrend = self.final_upper_band
+        if close <= final_upper:
+            self.supertrend = final_upper
             self.signal = -1  # Downtrend (Sell signal)
         else:
-            self.supertrend = self.final_lower_band
+            self.supertrend = final_lower
             self.signal = 1   # Uptrend (Buy signal)
 
         # Mark indicator as ready after sufficient warmup data
@@ -177,6 +279,97 @@ class SuperTrendIndicator:
 
         return self.supertrend, self.signal
 
+    def compute(self, high, low, close):
+        """
+        Batch update over whole OHLC arrays
+
+        Produces exactly the values that calling update() once per bar would
+        produce, and leaves the indicator in the same state afterwards, so
+        streaming can continue where the batch stopped. True range and the
+        basic bands are computed as array operations; only the Wilder and
+        band continuity recurrences run as a scalar loop.
+
+        Args:
+            high (array-like): Bar high prices
+            low (array-like): Bar low prices
+            close (array-like): Bar close prices
+
+        Returns:
+            dict: Arrays of 'true_range', 'atr', 'final_upper_band',
+                'final_lower_band', 'supertrend', 'signal', 'is_ready',
+                'buy_signal' and 'sell_signal', one element per bar
+        """
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        n = len(close)
+
+        if not (len(high) == len(low) == n):
+            raise ValueError("high, low and close must have the same length")
+
+        # True range, vectorized against the previous close
+        true_range = true_range_array(high, low, close, self.prev_close)
+
+        # ATR: warmup bars go through calculate_atr, the rest is the recurrence
+        atr = np.empty(n)
+        i = 0
+        while i < n and self._prev_atr is None:
+            atr[i] = self.calculate_atr(float(true_range[i]))
+            i += 1
+        if i < n:
+            atr[i:] = wilder_recurrence(true_range[i:], self._prev_atr, self.period)
+            self._prev_atr = float(atr[-1])
+
+        # Basic bands, vectorized
+        hl_midpoint = (high + low) / 2.0
+        basic_upper = hl_midpoint + (self.multiplier * atr)
+        basic_lower = hl_midpoint - (self.multiplier * atr)
+
+        # Final bands with continuity logic, seeded from the first bar if fresh
+        final_upper = self.final_upper_band
+        final_lower = self.final_lower_band
+        if final_upper is None:
+            final_upper = basic_upper[0] if n else 0.0
+            final_lower = basic_lower[0] if n else 0.0
+        final_upper_band, final_lower_band = band_recurrence(
+            basic_upper, basic_lower, close, float(final_upper), float(final_lower)
+        )
+        signal = np.where(close <= final_upper_band, -1, 1).astype(np.int8)
+        supertrend = np.where(signal == -1, final_upper_band, final_lower_band)
+
+        prev_signal = np.empty(n, dtype=np.int8)
+        if n:
+            prev_signal[0] = self.signal
+            prev_signal[1:] = signal[:-1]
+        bar_number = self.bar_count + np.arange(1, n + 1)
+        is_ready = self.is_ready | (bar_number >= self.period * 2)
+
+        # Leave the indicator exactly where update() would have left it
+        if n:
+            self.bar_count += n
+            self.final_upper_band = float(final_upper_band[-1])
+            self.final_lower_band = float(final_lower_band[-1])
+            self.supertrend = float(supertrend[-1])
+            self.prev_signal = int(prev_signal[-1])
+            self.signal = int(signal[-1])
+            self.is_ready = bool(is_ready[-1])
+            self.prev_close = float(close[-1])
+            recent = close[-self.returns_history.maxlen:]
+            recent = recent[recent != 0]
+            self.returns_history.extend((recent / recent - 1).tolist())
+
+        return {
+            'true_range': true_range,
+            'atr': atr,
+            'final_upper_band': final_upper_band,
+            'final_lower_band': final_lower_band,
+            'supertrend': supertrend,
+            'signal': signal,
+            'is_ready': is_ready,
+            'buy_signal': (signal == 1) & (prev_signal == -1) & is_ready,
+            'sell_signal': (signal == -1) & (prev_signal == 1) & is_ready
+        }
+
     def get_current_supertrend(self):
         """
         Get current supertrend level
@@ -246,7 +439,8 @@ class SuperTrendIndicator:
         self.is_ready = False
         self.bar_count = 0
         self.prev_close = None
-        self.atr_values.clear()
+        self._tr_sum = 0.0
+        self._tr_count = 0
         self.returns_history.clear()
         self._prev_atr = None
 
@@ -281,18 +475,484 @@ class SuperTrendIndicator:
         return self.__str__()
 
 
+class SuperTrendSweep:
+    """
+    Supertrend evaluation for a whole (period, multiplier) grid in one pass
+
+    True Range is computed once for the price series, ATR once per distinct
+    period, and the band continuity recurrence runs over all multipliers of
+    a period together as a 2-D (bars, multipliers) array. Every column is
+    identical to SuperTrendIndicator(period, multiplier).compute() on the
+    same data.
+    """
+
+    def __init__(self, periods, multipliers):
+        """
+        Initialize the sweep grid
+
+        Args:
+            periods (iterable): ATR periods to evaluate
+            multipliers (iterable): Band multipliers to evaluate for every period
+        """
+        self.periods = sorted(set(int(p) for p in periods))
+        self.multipliers = np.asarray(sorted(set(multipliers)), dtype=np.float64)
+
+        if not self.periods or len(self.multipliers) == 0:
+            raise ValueError("periods and multipliers must not be empty")
+
+    def compute(self, high, low, close):
+        """
+        Evaluate the full grid over whole OHLC arrays
+
+        Args:
+            high (array-like): Bar high prices
+            low (array-like): Bar low prices
+            close (array-like): Bar close prices
+
+        Returns:
+            dict: Keyed by period; each value holds the 1-D 'atr' array and
+                2-D (bars, multipliers) arrays 'final_upper_band',
+                'final_lower_band', 'supertrend', 'signal', 'buy_signal' and
+                'sell_signal', plus the 1-D 'is_ready' mask
+        """
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        n = len(close)
+
+        if not (len(high) == len(low) == n):
+            raise ValueError("high, low and close must have the same length")
+
+        true_range = true_range_array(high, low, close)
+        hl_midpoint = ((high + low) / 2.0)[:, None]
+        column_close = close[:, None]
+        multipliers = self.multipliers[None, :]
+
+        results = {}
+        for period in self.periods:
+            atr = wilder_atr_array(true_range, period)
+            band_width = multipliers * atr[:, None]
+
+            if n:
+                final_upper, final_lower = band_recurrence_2d(
+                    hl_midpoint + band_width, hl_midpoint - band_width, close,
+                    BAND_ROW_STEP_MIN_WIDTH
+                )
+            else:
+                final_upper = np.empty((0, len(self.multipliers)))
+                final_lower = np.empty((0, len(self.multipliers)))
+
+            signal = np.where(column_close <= final_upper, -1, 1).astype(np.int8)
+            prev_signal = np.zeros_like(signal)
+            prev_signal[1:] = signal[:-1]
+            is_ready = np.arange(1, n + 1) >= period * 2
+
+            results[period] = {
+                'atr': atr,
+                'final_upper_band': final_upper,
+                'final_lower_band': final_lower,
+                'supertrend': np.where(signal == -1, final_upper, final_lower),
+                'signal': signal,
+                'is_ready': is_ready,
+                'buy_signal': (signal == 1) & (prev_signal == -1) & is_ready[:, None],
+                'sell_signal': (signal == -1) & (prev_signal == 1) & is_ready[:, None]
+            }
+
+        return results
+
+    def column(self, results, period, multiplier):
+        """
+        Extract the 1-D arrays for one (period, multiplier) pair
+
+        Args:
+            results (dict): Output of compute()
+            period (int): ATR period
+            multiplier (float): Band multiplier
+
+        Returns:
+            dict: Same keys as SuperTrendIndicator.compute() minus 'true_range'
+        """
+        matches = np.flatnonzero(self.multipliers == multiplier)
+        if period not in results or len(matches) == 0:
+            raise KeyError(f"({period}, {multiplier}) is not part of the sweep grid")
+
+        j = matches[0]
+        grid = results[period]
+        return {
+            key: (values[:, j] if values.ndim == 2 else values)
+            for key, values in grid.items()
+        }
+
+
+class SuperTrendBank:
+    """
+    Streaming Supertrend state for many symbols updated together
+
+    Holds the state of one SuperTrendIndicator per symbol in parallel arrays
+    and advances every symbol with one array operation per field, so the
+    per-bar Python overhead barely grows with the number of symbols. Each
+    symbol's values are identical to feeding its bars through its own
+    SuperTrendIndicator.update().
+    """
+
+    def __init__(self, symbols, period=10, multiplier=3):
+        """
+        Initialize the bank
+
+        Args:
+            symbols (iterable): Symbols tracked, in a fixed order
+            period (int or array-like): ATR period, shared or one per symbol
+            multiplier (float or array-like): Band multiplier, shared or one per symbol
+        """
+        self.symbols = list(symbols)
+        if not self.symbols:
+            raise ValueError("symbols must not be empty")
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        n = len(self.symbols)
+        self.period = np.broadcast_to(np.asarray(period, dtype=np.int64), (n,)).copy()
+        self.multiplier = np.broadcast_to(np.asarray(multiplier, dtype=np.float64), (n,)).copy()
+        if np.any(self.period < 1):
+            raise ValueError("period must be at least 1")
+        self._period_less_one = self.period - 1
+        self._ready_bars = self.period * 2
+
+        # Reusable input buffers for update_bars()
+        self._high = np.empty(n)
+        self._low = np.empty(n)
+        self._close = np.empty(n)
+        self.reset()
+
+    def reset(self):
+        """Reset every symbol to the initial indicator state"""
+        n = len(self.symbols)
+        self._tr_sum = np.zeros(n)
+        self._tr_count = np.zeros(n, dtype=np.int64)
+        self.atr = np.full(n, np.nan)
+        self.final_upper_band = np.full(n, np.nan)
+        self.final_lower_band = np.full(n, np.nan)
+        self.supertrend = np.full(n, np.nan)
+        self.signal = np.zeros(n, dtype=np.int8)
+        self.prev_signal = np.zeros(n, dtype=np.int8)
+        self.bar_count = np.zeros(n, dtype=np.int64)
+        self.is_ready = np.zeros(n, dtype=bool)
+        self.prev_close = np.full(n, np.nan)
+        self.updated = np.zeros(n, dtype=bool)
+        self._prev_atr = np.full(n, np.nan)  # NaN until the warmup seed
+        self._all_started = False
+        self._all_seeded = False
+
+    def update(self, high, low, close):
+        """
+        Advance every symbol that has a bar
+
+        Args:
+            high (array-like): Bar highs in symbol order (NaN = no bar)
+            low (array-like): Bar lows in symbol order
+            close (array-like): Bar closes in symbol order (NaN = no bar)
+
+        Returns:
+            tuple: (supertrend, signal) arrays for all symbols
+        """
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        has_bar = ~np.isnan(close)
+        all_bars = has_bar.all()
+        self.updated = has_bar
+
+        # True Range against the previous close (high - low on a symbol's first bar)
+        prev_close = self.prev_close
+        hl_range = high - low
+        tr = np.maximum(np.maximum(hl_range, np.abs(high - prev_close)), np.abs(low - prev_close))
+        if not self._all_started:
+            tr = np.where(np.isnan(prev_close), hl_range, tr)
+
+        # ATR: simple average during warmup, Wilder's smoothing afterwards
+        period = self.period
+        if self._all_seeded:
+            atr = (self._prev_atr * self._period_less_one + tr) / period
+            prev_atr = atr
+            tr_sum = tr_count = None
+        else:
+            warming = np.isnan(self._prev_atr)
+            tr_sum = np.where(warming, self._tr_sum + tr, self._tr_sum)
+            tr_count = self._tr_count + warming
+            seed = np.where(warming, tr_sum / np.maximum(tr_count, 1), self._prev_atr)
+            smoothed = (seed * self._period_less_one + tr) / period
+            in_warmup = warming & (tr_count < period)
+            atr = np.where(in_warmup, seed, smoothed)
+            prev_atr = np.where(in_warmup, np.nan, smoothed)
+
+        # Basic bands and continuity logic (NaN bands before a symbol's first bar)
+        hl_midpoint = (high + low) / 2.0
+        band_width = self.multiplier * atr
+        basic_upper = hl_midpoint + band_width
+        basic_lower = hl_midpoint - band_width
+
+        final_upper = self.final_upper_band
+        final_lower = self.final_lower_band
+        keep_upper = (basic_upper >= final_upper) & (close <= final_upper)
+        keep_lower = (basic_lower <= final_lower) & (close >= final_lower)
+        final_upper = np.where(keep_upper, final_upper, basic_upper)
+        final_lower = np.where(keep_lower, final_lower, basic_lower)
+
+        is_down = close <= final_upper
+        signal = np.where(is_down, -1, 1).astype(np.int8)
+        supertrend = np.where(is_down, final_upper, final_lower)
+        bar_count = self.bar_count + 1
+        is_ready = self.is_ready | (bar_count >= self._ready_bars)
+
+        # Commit the new state (only for symbols with a bar)
+        if all_bars:
+            self._prev_atr = prev_atr
+            self.atr = atr
+            self.final_upper_band = final_upper
+            self.final_lower_band = final_lower
+            self.prev_signal = self.signal
+            self.signal = signal
+            self.supertrend = supertrend
+            self.bar_count = bar_count
+            self.is_ready = is_ready
+            self.prev_close = close
+            if tr_sum is not None:
+                self._tr_sum = tr_sum
+                self._tr_count = tr_count
+        else:
+            np.copyto(self._prev_atr, prev_atr, where=has_bar)
+            np.copyto(self.atr, atr, where=has_bar)
+            np.copyto(self.final_upper_band, final_upper, where=has_bar)
+            np.copyto(self.final_lower_band, final_lower, where=has_bar)
+            self.prev_signal = np.where(has_bar, self.signal, self.prev_signal)
+            np.copyto(self.signal, signal, where=has_bar)
+            np.copyto(self.supertrend, supertrend, where=has_bar)
+            np.copyto(self.bar_count, bar_count, where=has_bar)
+            np.copyto(self.is_ready, is_ready, where=has_bar)
+            np.copyto(self.prev_close, close, where=has_bar)
+            if tr_sum is not None:
+                np.copyto(self._tr_sum, tr_sum, where=has_bar)
+                np.copyto(self._tr_count, tr_count, where=has_bar)
+
+        # Once every symbol is past its first bar / ATR seed, skip those branches
+        if not self._all_started:
+            self._all_started = not np.isnan(self.prev_close).any()
+        if not self._all_seeded:
+            self._all_seeded = not np.isnan(self._prev_atr).any()
+
+        return self.supertrend, self.signal
+
+    def update_bars(self, bars):
+        """
+        Advance the bank from a mapping of symbol -> bar (e.g. slice.bars)
+
+        Args:
+            bars: Mapping supporting `in` and indexing, with bars exposing
+                high, low and close; symbols without a bar are left unchanged
+
+        Returns:
+            tuple: (supertrend, signal) arrays for all symbols
+        """
+        high, low, close = self._high, self._low, self._close
+        close.fill(np.nan)
+        for i, symbol in enumerate(self.symbols):
+            if symbol in bars:
+                bar = bars[symbol]
+                high[i] = bar.high
+                low[i] = bar.low
+                close[i] = bar.close
+        return self.update(high, low, close)
+
+    def buy_signals(self):
+        """Bool array: symbols whose signal turned from sell to buy on their last bar"""
+        return (self.signal == 1) & (self.prev_signal == -1) & self.is_ready
+
+    def sell_signals(self):
+        """Bool array: symbols whose signal turned from buy to sell on their last bar"""
+        return (self.signal == -1) & (self.prev_signal == 1) & self.is_ready
+
+    def transitions(self):
+        """
+        Symbols with a fresh buy or sell transition on this update
+
+        Returns:
+            tuple: (buy_symbols, sell_symbols) lists
+        """
+        buys = np.flatnonzero(self.buy_signals() & self.updated)
+        sells = np.flatnonzero(self.sell_signals() & self.updated)
+        return [self.symbols[i] for i in buys], [self.symbols[i] for i in sells]
+
+    def get_current_supertrend(self):
+        """Supertrend level per symbol, NaN where the symbol is not ready"""
+        return np.where(self.is_ready, self.supertrend, np.nan)
+
+    def get_state(self, symbol):
+        """
+        Current values for one symbol
+
+        Args:
+            symbol: A tracked symbol
+
+        Returns:
+            dict: supertrend, signal, atr, bands and readiness
+        """
+        i = self.index[symbol]
+        return {
+            'supertrend': float(self.supertrend[i]),
+            'signal': int(self.signal[i]),
+            'atr': float(self.atr[i]),
+            'final_upper_band': float(self.final_upper_band[i]),
+            'final_lower_band': float(self.final_lower_band[i]),
+            'is_ready': bool(self.is_ready[i]),
+            'bar_count': int(self.bar_count[i])
+        }
+
+
+class ArrayRingBuffer:
+    """
+    Fixed-capacity ring buffer of parallel NumPy arrays (struct of arrays)
+
+    Appends overwrite the oldest row once the buffer is full. Rows are staged
+    as tuples and copied into the arrays one block at a time, since per-element
+    NumPy writes cost more than the tuple itself. Columns are read back in
+    chronological order as array slices.
+    """
+
+    def __init__(self, capacity, dtypes, block_size=256):
+        """
+        Args:
+            capacity (int): Maximum number of rows kept
+            dtypes (dict): Column name -> NumPy dtype, in append order
+            block_size (int): Rows staged before they are copied into the arrays
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self.block_size = max(1, min(block_size, capacity))
+        self.names = tuple(dtypes)
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+        self._arrays = tuple(self.columns[name] for name in self.names)
+        self._pending = []
+        self._next = 0
+        self._size = 0
+
+    def append(self, *values):
+        """Add one row (values in column order), overwriting the oldest when full"""
+        pending = self._pending
+        pending.append(values)
+        if len(pending) >= self.block_size:
+            self._flush()
+
+    def _flush(self):
+        """Copy the staged rows into the ring arrays"""
+        pending = self._pending
+        if not pending:
+            return
+        n = len(pending)
+        capacity = self.capacity
+
+        # Positions of the staged rows, wrapping around the end of the arrays
+        positions = (self._next + np.arange(n)) % capacity
+        for array, values in zip(self._arrays, zip(*pending)):
+            array[positions] = values
+
+        self._next = (self._next + n) % capacity
+        self._size = min(self._size + n, capacity)
+        pending.clear()
+
+    def column(self, name, count=None):
+        """
+        Column values in chronological order
+
+        Args:
+            name (str): Column name
+            count (int, optional): Only the most recent count rows
+
+        Returns:
+            np.ndarray: A view when the rows are contiguous, otherwise a copy
+        """
+        self._flush()
+        size = self._size if count is None else max(0, min(count, self._size))
+        array = self.columns[name]
+        start = (self._next - size) % self.capacity
+        if start + size <= self.capacity:
+            return array[start:start + size]
+        return np.concatenate((array[start:], array[:self._next]))
+
+    def clear(self):
+        """Drop all rows (the arrays are reused)"""
+        self._pending.clear()
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return min(self._size + len(self._pending), self.capacity)
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NAT = np.iinfo(np.int64).min
+
+
+def _epoch_microseconds(timestamp):
+    """Datetime as int64 microseconds since 1970 (NaT sentinel for None)"""
+    if timestamp is None:
+        return _NAT
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+def _online_performance_stats():
+    """
+    New return statistics accumulator from the shared strategy tools
+
+    Imported on first use so the indicators themselves do not depend on the
+    Lean library project Library/strategy_tools being importable.
+    """
+    try:
+        from strategy_tools import OnlinePerformanceStats
+    except ImportError:
+        sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'Library'))
+        from strategy_tools import OnlinePerformanceStats
+    return OnlinePerformanceStats()
+
+
 class SuperTrendHistory:
     """
     Extended Supertrend indicator with history tracking for analysis
+
+    Bars and signals are kept in ring buffers of parallel arrays holding the
+    most recent max_history entries. Timestamps are stored as int64
+    microseconds and returned as datetime64[us].
     """
 
+    # Ring buffer layouts; supertrend is NaN and timestamp NaT when absent
+    HISTORY_DTYPES = {
+        'timestamp': np.int64,
+        'high': np.float64,
+        'low': np.float64,
+        'close': np.float64,
+        'supertrend': np.float64,
+        'signal': np.int8
+    }
+    SIGNAL_DTYPES = {
+        'timestamp': np.int64,
+        'type': np.int8,  # 1 = BUY, -1 = SELL
+        'price': np.float64,
+        'supertrend': np.float64
+    }
+
     def __init__(self, period=10, multiplier=3, max_history=1000):
         self.supertrend_indicator = SuperTrendIndicator(period, multiplier)
         self.max_history = max_history
 
         # Historical data tracking
-        self.history = deque(maxlen=max_history)
-        self.signals_history = deque(maxlen=max_history)
+        self.history = ArrayRingBuffer(max_history, self.HISTORY_DTYPES)
+        self.signals_history = ArrayRingBuffer(max_history, self.SIGNAL_DTYPES)
+
+        # Close-to-close return statistics since the last reset, in constant memory
+        self.return_stats = _online_performance_stats()
 
     def update(self, high, low, close, timestamp=None):
         """
@@ -307,36 +967,37 @@ class SuperTrendHistory:
         Returns:
             tuple: (current_supertrend_level, current_signal)
         """
-        supertrend_level, signal = self.supertrend_indicator.update(high, low, close)
+        indicator = self.supertrend_indicator
+        supertrend_level, signal = indicator.update(high, low, close)
+        self.return_stats.update(close)
 
         # Store in history
-        self.history.append({
-            'timestamp': timestamp,
-            'high': high,
-            'low': low,
-            'close': close,
-            'supertrend': supertrend_level,
-            'signal': signal
-        })
+        level = np.nan if supertrend_level is None else supertrend_level
+        timestamp = _epoch_microseconds(timestamp)
+        self.history.append(timestamp, high, low, close, level, signal)
 
         # Track signals
-        if self.supertrend_indicator.is_buy_signal():
-            self.signals_history.append({
-                'timestamp': timestamp,
-                'type': 'BUY',
-                'price': close,
-                'supertrend': supertrend_level
-            })
-        elif self.supertrend_indicator.is_sell_signal():
-            self.signals_history.append({
-                'timestamp': timestamp,
-                'type': 'SELL',
-                'price': close,
-                'supertrend': supertrend_level
-            })
+        if indicator.is_buy_signal():
+            self.signals_history.append(timestamp, 1, close, level)
+        elif indicator.is_sell_signal():
+            self.signals_history.append(timestamp, -1, close, level)
 
         return supertrend_level, signal
 
+    def get_history(self, count=None):
+        """
+        Recent bars as chronological arrays
+
+        Args:
+            count (int, optional): Number of most recent bars (default: all kept)
+
+        Returns:
+            dict: Column name -> np.ndarray
+        """
+        history = {name: self.history.column(name, count) for name in self.history.names}
+        history['timestamp'] = history['timestamp'].view('datetime64[us]')
+        return history
+
     def get_recent_signals(self, count=10):
         """
         Get recent trading signals
@@ -347,7 +1008,21 @@ class SuperTrendHistory:
         Returns:
             list: Recent trading signals
         """
-        return list(self.signals_history)[-count:]
+        signals = self.signals_history
+        timestamps = signals.column('timestamp', count).view('datetime64[us]').astype(object).tolist()
+        types = signals.column('type', count).tolist()
+        prices = signals.column('price', count).tolist()
+        levels = signals.column('supertrend', count).tolist()
+
+        return [
+            {
+                'timestamp': timestamp,
+                'type': 'BUY' if signal_type == 1 else 'SELL',
+                'price': price,
+                'supertrend': level
+            }
+            for timestamp, signal_type, price, level in zip(timestamps, types, prices, levels)
+        ]
 
     def get_performance_stats(self):
         """
@@ -360,36 +1035,39 @@ class SuperTrendHistory:
             return {}
 
         # Basic statistics
-        closes = [point['close'] for point in self.history]
-        supertrends = [point['supertrend'] for point in self.history if point['supertrend']]
+        closes = self.history.column('close')
+        supertrends = self.history.column('supertrend')
+        supertrends = supertrends[~np.isnan(supertrends) & (supertrends != 0)]
+        signal_types = self.signals_history.column('type')
+        buy_signals = int(np.count_nonzero(signal_types == 1))
 
-        # Calculate returns
-        returns = []
-        for i in range(1, len(closes)):
-            daily_return = (closes[i] - closes[i-1]) / closes[i-1]
-            returns.append(daily_return)
+        # Return statistics are kept online; they cover every bar since reset
+        returns = self.return_stats
 
         # Basic stats
         stats = {
             'total_bars': len(self.history),
-            'total_signals': len(self.signals_history),
-            'buy_signals': len([s for s in self.signals_history if s['type'] == 'BUY']),
-            'sell_signals': len([s for s in self.signals_history if s['type'] == 'SELL']),
+            'total_signals': len(signal_types),
+            'buy_signals': buy_signals,
+            'sell_signals': len(signal_types) - buy_signals,
             'price_range': {
-                'min': min(closes),
-                'max': max(closes),
-                'mean': np.mean(closes)
+                'min': float(closes.min()),
+                'max': float(closes.max()),
+                'mean': float(closes.mean())
             },
             'supertrend_range': {
-                'min': min(supertrends) if supertrends else 0,
-                'max': max(supertrends) if supertrends else 0,
-                'mean': np.mean(supertrends) if supertrends else 0
+                'min': float(supertrends.min()) if len(supertrends) else 0,
+                'max': float(supertrends.max()) if len(supertrends) else 0,
+                'mean': float(supertrends.mean()) if len(supertrends) else 0
             },
             'returns_stats': {
-                'mean': np.mean(returns) if returns else 0,
-                'std': np.std(returns) if returns else 0,
-                'min': min(returns) if returns else 0,
-                'max': max(returns) if returns else 0
+                'mean': returns.mean,
+                'std': returns.std(),
+                'min': returns.min_return if returns.return_count else 0,
+                'max': returns.max_return if returns.return_count else 0,
+                'sharpe_ratio': returns.sharpe_ratio(),
+                'sortino_ratio': returns.sortino_ratio(),
+                'max_drawdown': returns.max_drawdown
             }
         }
 
@@ -415,6 +1093,7 @@ class SuperTrendHistory:
         self.supertrend_indicator.reset()
         self.history.clear()
         self.signals_history.clear()
+        self.return_stats = _online_performance_stats()
 
     def __getattr__(self, name):
         """Delegate all other attributes to the underlying indicator"""
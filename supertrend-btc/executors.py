@@ -0,0 +1,213 @@
+"""
+Bitcoin Supertrend Strategy - Evaluation Executors
+
+Pluggable execution backends for scoring many parameter sets with
+LocalBacktestEvaluator:
+
+- serial:  evaluate in the calling thread
+- thread:  concurrent.futures thread pool sharing the evaluator
+- process: process pool; the price arrays are placed in shared memory once and
+           every worker builds its evaluator on top of them, so no price data
+           is pickled per task
+
+All executors return results in task order, so optimization runs are
+reproducible regardless of the backend and worker count.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# Add the project directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from Library.technical_indicators.supertrend import SuperTrendSweep
+from local_backtest import LocalBacktestEvaluator
+
+# Evaluator and shared memory handles of a process pool worker
+_worker_evaluator = None
+_worker_segments = []
+
+# Price arrays of LocalBacktestEvaluator shared with process pool workers
+SHARED_ARRAYS = ('timestamps', 'open', 'high', 'low', 'close')
+
+
+def evaluate_task(evaluator, task):
+    """
+    Evaluate one task: a list of parameter sets over one date window
+
+    When 'shared_indicator' is set, Supertrend is computed once for every
+    (atr_period, multiplier) pair of the task with SuperTrendSweep and reused
+    across the remaining parameters.
+
+    Args:
+        evaluator (LocalBacktestEvaluator): Evaluator holding the price data
+        task (dict): 'parameters' (list of dicts), optional 'start_date',
+            'end_date' and 'shared_indicator'
+
+    Returns:
+        list: Metrics dicts in the order of task['parameters']
+    """
+    start_date = task.get('start_date')
+    end_date = task.get('end_date')
+    parameters = task['parameters']
+
+    columns = {}
+    if task.get('shared_indicator') and parameters:
+        bars = evaluator.window_bars(start_date, end_date)
+        sweep = SuperTrendSweep([p['atr_period'] for p in parameters],
+                                [float(p['multiplier']) for p in parameters])
+        grid = sweep.compute(bars['high'], bars['low'], bars['close'])
+        columns = {
+            (int(p['atr_period']), float(p['multiplier'])):
+                sweep.column(grid, int(p['atr_period']), float(p['multiplier']))
+            for p in parameters
+        }
+
+    results = []
+    for params in parameters:
+        indicator = columns.get((int(params['atr_period']), float(params['multiplier'])))
+        results.append(evaluator.run(
+            atr_period=int(params['atr_period']),
+            multiplier=float(params['multiplier']),
+            risk_percent=float(params['risk_percent']),
+            max_position_size=float(params['max_position_size']),
+            start_date=start_date,
+            end_date=end_date,
+            indicator=indicator
+        ))
+    return results
+
+
+def _attach_shared_evaluator(array_specs, settings):
+    """Process pool initializer: build the worker evaluator on shared memory"""
+    global _worker_evaluator
+
+    arrays = {}
+    for name, (segment_name, shape, dtype) in array_specs.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _worker_segments.append(segment)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+
+    _worker_evaluator = LocalBacktestEvaluator(
+        arrays['timestamps'], arrays['open'], arrays['high'], arrays['low'],
+        arrays['close'], **settings
+    )
+
+
+def _evaluate_in_worker(task):
+    """Evaluate a task with the evaluator of the current pool worker"""
+    return evaluate_task(_worker_evaluator, task)
+
+
+class SerialExecutor:
+    """Evaluate tasks one after another in the calling thread"""
+
+    name = 'serial'
+
+    def __init__(self, evaluator, workers=None):
+        self.evaluator = evaluator
+        self.workers = 1
+
+    def map(self, tasks):
+        """
+        Evaluate tasks and return their results in task order
+
+        Args:
+            tasks (list): Task dicts as accepted by evaluate_task
+
+        Returns:
+            list: One list of metrics per task
+        """
+        return [evaluate_task(self.evaluator, task) for task in tasks]
+
+    def close(self):
+        """Release executor resources"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ThreadExecutor(SerialExecutor):
+    """Evaluate tasks on a thread pool sharing one evaluator"""
+
+    name = 'thread'
+
+    def __init__(self, evaluator, workers=None):
+        super().__init__(evaluator)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+
+    def map(self, tasks):
+        return list(self._pool.map(lambda task: evaluate_task(self.evaluator, task), tasks))
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+class ProcessExecutor(SerialExecutor):
+    """Evaluate tasks on a process pool with price arrays in shared memory"""
+
+    name = 'process'
+
+    def __init__(self, evaluator, workers=None):
+        super().__init__(evaluator)
+        self.workers = workers or os.cpu_count() or 1
+        self._segments = []
+
+        array_specs = {}
+        for name in SHARED_ARRAYS:
+            array = getattr(evaluator, name)
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+            self._segments.append(segment)
+            array_specs[name] = (segment.name, array.shape, array.dtype.str)
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_attach_shared_evaluator,
+            initargs=(array_specs, evaluator.settings())
+        )
+
+    def map(self, tasks):
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        return list(self._pool.map(_evaluate_in_worker, tasks, chunksize=chunksize))
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+
+EXECUTORS = {
+    'serial': SerialExecutor,
+    'thread': ThreadExecutor,
+    'process': ProcessExecutor
+}
+
+
+def create_executor(kind, evaluator, workers=None):
+    """
+    Create an evaluation executor by name
+
+    Args:
+        kind (str): 'serial', 'thread' or 'process'
+        evaluator (LocalBacktestEvaluator): Evaluator holding the price data
+        workers (int, optional): Worker count (default: CPU count)
+
+    Returns:
+        SerialExecutor: Executor instance; close it when done
+    """
+    if kind not in EXECUTORS:
+        raise ValueError(f"Unknown executor '{kind}', choose from {sorted(EXECUTORS)}")
+    return EXECUTORS[kind](evaluator, workers)
@@ -0,0 +1,528 @@
+"""
+Bitcoin Supertrend Strategy - Local Backtest Evaluator
+
+Replays minute OHLC bars from a local file through the same rules that
+BitcoinSupertrendStrategy applies inside Lean (signal transitions, risk-based
+position sizing, trade interval and daily trade limits) and reports the
+metrics of calculate_performance_metrics. It is meant for parameter
+optimization, where launching a full Lean backtest per parameter set is far
+too slow.
+
+The indicator runs through the batch SuperTrendIndicator.compute API and only
+the signal bars are walked in Python; equity, drawdown and return statistics
+are computed as array operations.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add the project directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Shared strategy tools (Lean library project Library/strategy_tools)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Library'))
+
+from Library.technical_indicators.supertrend import SuperTrendIndicator
+from strategy_tools.performance_stats import MINUTES_PER_YEAR
+
+
+class LocalBacktestEvaluator:
+    """
+    Event-driven local replay of BitcoinSupertrendStrategy
+
+    Mirrors the strategy's trading logic:
+    - Bars failing validate_market_data's OHLC consistency check are skipped
+    - Trades only on Supertrend buy/sell transitions once the indicator is ready
+    - calculate_position_size for entries, full liquidation on sell signals
+    - min_trade_interval and max_daily_trades limits, reset each trading day
+    - Equity recorded on every ready bar, as in _update_performance_metrics
+
+    The strategy only trails its stop level without exiting on it; set
+    enforce_stop_loss to exit when price closes below the trailing stop.
+    """
+
+    def __init__(self, timestamps, open_prices, high, low, close, initial_cash=100000,
+                 max_daily_trades=10, min_trade_interval=30, fee_rate=0.0,
+                 enforce_stop_loss=False, time_zone=None):
+        """
+        Initialize the evaluator with minute bars
+
+        Args:
+            timestamps (array-like): Bar end times as Unix seconds
+            open_prices (array-like): Bar open prices
+            high (array-like): Bar high prices
+            low (array-like): Bar low prices
+            close (array-like): Bar close prices
+            initial_cash (float): Starting capital (default: 100000)
+            max_daily_trades (int): Daily trade limit (default: 10)
+            min_trade_interval (int): Minimum minutes between trades (default: 30)
+            fee_rate (float): Fee charged per fill as a fraction of notional (default: 0)
+            enforce_stop_loss (bool): Exit when close falls below the trailing stop
+            time_zone (str, optional): Algorithm time zone for daily resets when
+                timestamps are true UTC. The strategy's CSV export stores the
+                algorithm's wall-clock time, so the default uses timestamps as-is
+        """
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.open = np.asarray(open_prices, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+
+        self.initial_cash = initial_cash
+        self.max_daily_trades = max_daily_trades
+        self.min_trade_interval = min_trade_interval
+        self.fee_rate = fee_rate
+        self.enforce_stop_loss = enforce_stop_loss
+        self.time_zone = time_zone
+
+        # Same consistency check as validate_market_data
+        self.valid = ((self.low <= self.close) & (self.close <= self.high) &
+                      (self.low <= self.open) & (self.open <= self.high))
+
+        # Trading day of every bar in the algorithm time zone
+        if time_zone is None:
+            self.day_ids = self.timestamps // 86400
+        else:
+            local_times = (pd.to_datetime(self.timestamps, unit='s', utc=True)
+                           .tz_convert(time_zone).tz_localize(None))
+            self.day_ids = local_times.values.astype('datetime64[D]').astype(np.int64)
+
+        self._fingerprint = None
+
+    def settings(self):
+        """Constructor keyword arguments other than the price arrays"""
+        return {
+            'initial_cash': self.initial_cash,
+            'max_daily_trades': self.max_daily_trades,
+            'min_trade_interval': self.min_trade_interval,
+            'fee_rate': self.fee_rate,
+            'enforce_stop_loss': self.enforce_stop_loss,
+            'time_zone': self.time_zone
+        }
+
+    def fingerprint(self):
+        """
+        Hash of the price arrays and settings, identifying this evaluator's results
+
+        Returns:
+            str: Hex digest, computed once per evaluator
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for array in (self.timestamps, self.open, self.high, self.low, self.close):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            digest.update(json.dumps(self.settings(), sort_keys=True).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def from_csv(cls, file_path, **kwargs):
+        """
+        Load minute bars exported by the strategy's _export_minute_data
+
+        Args:
+            file_path (str): CSV with timestamp, open, high, low and close columns
+            **kwargs: Passed through to the constructor
+
+        Returns:
+            LocalBacktestEvaluator: Evaluator over the file's bars
+        """
+        frame = pd.read_csv(file_path, usecols=['timestamp', 'open', 'high', 'low', 'close'])
+        frame = frame.sort_values('timestamp', kind='stable')
+
+        return cls(frame['timestamp'].values, frame['open'].values, frame['high'].values,
+                   frame['low'].values, frame['close'].values, **kwargs)
+
+    @classmethod
+    def from_store(cls, store, symbol='btcusd', start_date=None, end_date=None, **kwargs):
+        """
+        Use minute bars from the columnar market data store without copying them
+
+        Args:
+            store (MarketDataStore): Store holding the symbol's bars
+            symbol (str): Stored symbol (default: 'btcusd')
+            start_date (datetime or str, optional): First bar time (inclusive)
+            end_date (datetime or str, optional): Last bar time (exclusive)
+            **kwargs: Passed through to the constructor
+
+        Returns:
+            LocalBacktestEvaluator: Evaluator over memory-mapped bars
+        """
+        bars = store.read(symbol, start_date, end_date)
+        return cls(bars['timestamp'], bars['open'], bars['high'], bars['low'],
+                   bars['close'], **kwargs)
+
+    def window_bars(self, start_date=None, end_date=None):
+        """
+        Select the valid bars inside a date window
+
+        Args:
+            start_date (datetime or str, optional): Window start (inclusive)
+            end_date (datetime or str, optional): Window end (exclusive)
+
+        Returns:
+            dict: 'index' into the loaded bars plus 'timestamps', 'high', 'low',
+                'close' and 'day_ids' arrays for the window
+        """
+        start = 0
+        end = len(self.timestamps)
+        if start_date is not None:
+            start = np.searchsorted(self.timestamps, self._to_unix(start_date), side='left')
+        if end_date is not None:
+            end = np.searchsorted(self.timestamps, self._to_unix(end_date), side='left')
+
+        index = start + np.flatnonzero(self.valid[start:end])
+        return {
+            'index': index,
+            'timestamps': self.timestamps[index],
+            'high': self.high[index],
+            'low': self.low[index],
+            'close': self.close[index],
+            'day_ids': self.day_ids[index]
+        }
+
+    def run(self, atr_period=10, multiplier=3, risk_percent=0.02, max_position_size=0.10,
+            start_date=None, end_date=None, indicator=None):
+        """
+        Replay the strategy with one parameter set
+
+        Args:
+            atr_period (int): ATR period parameter
+            multiplier (float): Supertrend multiplier
+            risk_percent (float): Risk per trade
+            max_position_size (float): Maximum position size
+            start_date (datetime or str, optional): Backtest start
+            end_date (datetime or str, optional): Backtest end
+            indicator (dict, optional): Precomputed compute() output for the
+                window's bars, e.g. a column of SuperTrendSweep
+
+        Returns:
+            dict: Same keys as calculate_performance_metrics, empty when fewer
+                than two ready bars were recorded
+        """
+        bars = self.window_bars(start_date, end_date)
+        close = bars['close']
+
+        if indicator is None:
+            indicator = SuperTrendIndicator(int(atr_period), multiplier).compute(
+                bars['high'], bars['low'], close
+            )
+
+        trades = self._simulate(bars, indicator, risk_percent, max_position_size)
+        equity = self._equity_curve(close, trades['fills'])
+        ready = indicator['is_ready']
+
+        return self._performance_metrics(equity[ready], trades)
+
+    def calculate_position_size(self, entry_price, stop_price, account_equity,
+                                risk_percent, max_position_size):
+        """Position size rule of BitcoinSupertrendStrategy.calculate_position_size"""
+        if entry_price <= 0 or stop_price <= 0:
+            return 0
+
+        risk_amount = account_equity * risk_percent
+        price_risk_per_unit = abs(entry_price - stop_price)
+
+        # 1% minimum stop distance
+        if price_risk_per_unit < entry_price * 0.01:
+            price_risk_per_unit = entry_price * 0.01
+
+        calculated_size = risk_amount / price_risk_per_unit
+        max_size_by_allocation = account_equity * max_position_size / entry_price
+        final_position_size = min(calculated_size, max_size_by_allocation)
+
+        # $100 minimum position
+        min_quantity = 100 / entry_price
+        if final_position_size < min_quantity:
+            final_position_size = min_quantity
+
+        return final_position_size
+
+    def _simulate(self, bars, indicator, risk_percent, max_position_size):
+        """Walk the signal bars and apply the strategy's trading rules"""
+        close = bars['close']
+        timestamps = bars['timestamps']
+        day_ids = bars['day_ids']
+        supertrend = indicator['supertrend']
+        signal = indicator['signal']
+
+        events = np.flatnonzero(indicator['buy_signal'] | indicator['sell_signal'])
+        is_buy = indicator['buy_signal']
+        min_interval = self.min_trade_interval * 60
+
+        cash = float(self.initial_cash)
+        quantity = 0.0
+        entry_price = None
+        stop_exit = None
+        current_day = None
+        daily_trade_count = 0
+        last_trade_time = None
+
+        fills = []  # (bar index, quantity change, cash change)
+        stats = {'total_trades': 0, 'winning_trades': 0, 'losing_trades': 0, 'total_pnl': 0.0}
+
+        def close_position(i, price):
+            nonlocal cash, quantity, entry_price
+            pnl = (price - entry_price) * quantity
+            proceeds = quantity * price
+            fee = proceeds * self.fee_rate
+            fills.append((i, -quantity, proceeds - fee))
+            cash += proceeds - fee
+            quantity = 0.0
+            entry_price = None
+            stats['total_trades'] += 1
+            stats['total_pnl'] += pnl
+            if pnl > 0:
+                stats['winning_trades'] += 1
+            else:
+                stats['losing_trades'] += 1
+
+        for i in events.tolist():
+            if stop_exit is not None and stop_exit <= i:
+                close_position(stop_exit, close[stop_exit])
+                stop_exit = None
+
+            # Daily counters reset on a new trading day
+            if day_ids[i] != current_day:
+                current_day = day_ids[i]
+                daily_trade_count = 0
+
+            if daily_trade_count >= self.max_daily_trades:
+                continue
+            if last_trade_time is not None and timestamps[i] - last_trade_time < min_interval:
+                continue
+
+            price = close[i]
+            if is_buy[i]:
+                stop_price = supertrend[i]
+                if quantity > 0 or not stop_price:
+                    continue
+
+                size = self.calculate_position_size(price, stop_price, cash,
+                                                    risk_percent, max_position_size)
+                cost = size * price
+                fee = cost * self.fee_rate
+                if size <= 0 or cost + fee > cash:
+                    continue
+
+                fills.append((i, size, -(cost + fee)))
+                cash -= cost + fee
+                quantity = size
+                entry_price = price
+                daily_trade_count += 1
+                last_trade_time = timestamps[i]
+                stats['total_trades'] += 1
+
+                if self.enforce_stop_loss:
+                    stop_exit = self._find_stop_exit(i, stop_price, close, supertrend, signal)
+            else:
+                if quantity <= 0:
+                    continue
+                close_position(i, price)
+                stop_exit = None
+                daily_trade_count += 1
+                last_trade_time = timestamps[i]
+
+        if stop_exit is not None:
+            close_position(stop_exit, close[stop_exit])
+
+        stats['fills'] = fills
+        return stats
+
+    def _find_stop_exit(self, entry_index, stop_price, close, supertrend, signal):
+        """First bar after entry closing below the trailing supertrend stop"""
+        start = entry_index + 1
+        level = stop_price
+        chunk = 1024
+
+        while start < len(close):
+            end = min(start + chunk, len(close))
+            trail = np.where(signal[start:end] == 1, supertrend[start:end], -np.inf)
+            # Stop in force on a bar is the level trailed up to the previous bar
+            stops = np.maximum.accumulate(np.concatenate(([level], trail)))[:-1]
+            hits = np.flatnonzero(close[start:end] < stops)
+            if len(hits):
+                return start + hits[0]
+            level = max(level, trail.max())
+            start = end
+            chunk *= 2
+
+        return None
+
+    def _equity_curve(self, close, fills):
+        """Portfolio value on every bar from the list of fills"""
+        quantity_change = np.zeros(len(close))
+        cash_change = np.zeros(len(close))
+        for i, quantity_delta, cash_delta in fills:
+            quantity_change[i] += quantity_delta
+            cash_change[i] += cash_delta
+
+        cash = self.initial_cash + np.cumsum(cash_change)
+        holdings = np.cumsum(quantity_change)
+        return cash + holdings * close
+
+    def _performance_metrics(self, equity_values, trades):
+        """Vectorized equivalent of calculate_performance_metrics"""
+        if len(equity_values) < 2:
+            return {}
+
+        initial_cash = self.initial_cash
+        total_return = (equity_values[-1] - initial_cash) / initial_cash
+
+        returns = np.diff(equity_values) / equity_values[:-1]
+        returns_std = np.std(returns)
+
+        volatility = returns_std * np.sqrt(MINUTES_PER_YEAR) if len(returns) > 1 else 0
+
+        risk_free_rate = 0.02
+        if returns_std > 0:
+            excess_returns = np.mean(returns) - (risk_free_rate / MINUTES_PER_YEAR)
+            sharpe_ratio = excess_returns / returns_std * np.sqrt(MINUTES_PER_YEAR)
+        else:
+            sharpe_ratio = 0
+
+        # Peak starts at the initial portfolio value, as in initialize()
+        peaks = np.maximum.accumulate(np.maximum(equity_values, initial_cash))
+        max_drawdown = max(0.0, float(np.max((peaks - equity_values) / peaks)))
+
+        total_trades = trades['total_trades']
+        win_rate = trades['winning_trades'] / total_trades if total_trades > 0 else 0
+        avg_trade_pnl = trades['total_pnl'] / total_trades if total_trades > 0 else 0
+
+        return {
+            'total_return': total_return,
+            'annualized_return': total_return * MINUTES_PER_YEAR / len(returns),
+            'volatility': volatility,
+            'sharpe_ratio': sharpe_ratio,
+            'max_drawdown': max_drawdown,
+            'win_rate': win_rate,
+            'total_trades': total_trades,
+            'avg_trade_pnl': avg_trade_pnl,
+            'total_pnl': trades['total_pnl'],
+            'final_equity': equity_values[-1]
+        }
+
+    @staticmethod
+    def _to_unix(value):
+        """Convert a date-like value to Unix seconds (naive values are UTC)"""
+        timestamp = pd.Timestamp(value)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize('UTC')
+        return int(timestamp.timestamp())
+
+
+class IncrementalIndicatorFeed:
+    """
+    Supertrend streams for consecutive, overlapping date windows
+
+    Keeps one SuperTrendIndicator per (atr_period, multiplier) pair running
+    over the evaluator's bars. Each window request only feeds the bars added
+    since the previous window boundary, so the indicator cost of a rolling
+    walk-forward step scales with the step, not with the window length.
+
+    Unlike LocalBacktestEvaluator.run, the indicator is not restarted at each
+    window start; it carries its ATR and band state across window boundaries
+    the way a continuously running algorithm would.
+    """
+
+    def __init__(self, evaluator, parameter_pairs):
+        """
+        Initialize the feed
+
+        Args:
+            evaluator (LocalBacktestEvaluator): Evaluator holding the price data
+            parameter_pairs (iterable): (atr_period, multiplier) pairs to track
+        """
+        self.evaluator = evaluator
+        self.indicators = {
+            (int(period), float(multiplier)): SuperTrendIndicator(int(period), float(multiplier))
+            for period, multiplier in parameter_pairs
+        }
+
+        # Position in the evaluator's bars up to which the indicators have run
+        self.position = 0
+
+        # Retained output: (bar index array, {pair: compute() output}) per advance
+        self._chunks = []
+        self._released = 0
+
+    def advance(self, end_date):
+        """
+        Feed the bars before end_date that the indicators have not seen yet
+
+        Args:
+            end_date (datetime or str): New window boundary (exclusive)
+        """
+        evaluator = self.evaluator
+        end = int(np.searchsorted(evaluator.timestamps, evaluator._to_unix(end_date), side='left'))
+        if end <= self.position:
+            return
+
+        index = self.position + np.flatnonzero(evaluator.valid[self.position:end])
+        high = evaluator.high[index]
+        low = evaluator.low[index]
+        close = evaluator.close[index]
+
+        outputs = {pair: indicator.compute(high, low, close)
+                   for pair, indicator in self.indicators.items()}
+        self._chunks.append((index, outputs))
+        self.position = end
+
+    def window(self, start_date, end_date):
+        """
+        Indicator output aligned with evaluator.window_bars(start_date, end_date)
+
+        Args:
+            start_date (datetime or str): Window start (inclusive)
+            end_date (datetime or str): Window end (exclusive)
+
+        Returns:
+            dict: compute()-style output per (atr_period, multiplier) pair
+        """
+        self.advance(end_date)
+
+        evaluator = self.evaluator
+        start = int(np.searchsorted(evaluator.timestamps, evaluator._to_unix(start_date), side='left'))
+        end = int(np.searchsorted(evaluator.timestamps, evaluator._to_unix(end_date), side='left'))
+        if start < self._released:
+            raise ValueError("Window starts before the output retained by the feed")
+
+        chunks = [(index, outputs) for index, outputs in self._chunks
+                  if len(index) and index[-1] >= start and index[0] < end]
+        if not chunks:
+            return {pair: self._empty_output(indicator) for pair, indicator in self.indicators.items()}
+
+        index = np.concatenate([chunk_index for chunk_index, _ in chunks])
+        selected = slice(np.searchsorted(index, start), np.searchsorted(index, end))
+
+        return {
+            pair: {
+                key: np.concatenate([outputs[pair][key] for _, outputs in chunks])[selected]
+                for key in chunks[0][1][pair]
+            }
+            for pair in self.indicators
+        }
+
+    def release(self, before_date):
+        """
+        Drop retained output that lies entirely before before_date
+
+        Args:
+            before_date (datetime or str): Earliest start of any future window
+        """
+        evaluator = self.evaluator
+        start = int(np.searchsorted(evaluator.timestamps, evaluator._to_unix(before_date), side='left'))
+        self._chunks = [(index, outputs) for index, outputs in self._chunks
+                        if len(index) and index[-1] >= start]
+        self._released = max(self._released, start)
+
+    @staticmethod
+    def _empty_output(indicator):
+        """compute() output for a window without bars"""
+        return indicator.__class__(indicator.period, indicator.multiplier).compute([], [], [])
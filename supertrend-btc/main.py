@@ -9,12 +9,20 @@ Created: 2024
 
 from datetime import datetime, timedelta
 import numpy as np
-from collections import deque
 import pandas as pd
 
 # QuantConnect Lean imports - must be after other imports
 from AlgorithmImports import *
 
+import os
+import sys
+
+# Shared strategy tools (Lean library project Library/strategy_tools)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Library'))
+from strategy_tools import (MinuteDataExporter, EquityTracker, MINUTES_PER_YEAR,
+                            create_phase_profiler, profiling_enabled, PROFILE_PARAMETER,
+                            StrategyLogger)
+
 
 class BitcoinSupertrendStrategy(QCAlgorithm):
     """
@@ -92,42 +100,46 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
 
         # 1-minute data export tracking
         self.minute_data_file = "btc_minute_equity_data.csv"
-        self.minute_data_written = False
-        self._write_minute_data_header()
-
-        # Statistics tracking
-        self.equity_curve = []
-        self.drawdowns = []
-        self.max_drawdown = 0
-        self.peak_equity = self.portfolio.total_portfolio_value
+        self._create_minute_data_exporter()
+
+        # Statistics tracking (typed arrays with running peak/drawdown/return moments)
         self.initial_cash = self.portfolio.total_portfolio_value
+        self.equity_tracker = EquityTracker(self.initial_cash)
 
         # Initialize indicator library
         self._initialize_technical_indicators()
 
+        # Leveled, rate-limited logging for the per-bar code paths
+        self.logger = StrategyLogger(
+            self,
+            level=self.GetParameter("log_level", "debug"),
+            max_per_interval=int(self.GetParameter("log_max_per_hour", "60"))
+        )
+        # Portfolio monitoring runs every bar; keep one line per hour
+        self.logger.configure('portfolio_monitoring', sample_every=60)
+
+        # Opt-in on_data phase timing (Lean parameter profile_phases=true)
+        self.profiler = create_phase_profiler(
+            profiling_enabled(self.GetParameter(PROFILE_PARAMETER, "false")))
+
         self.log("Bitcoin Supertrend Strategy initialized successfully")
         self.debug(f"ATR Period: {self.atr_period}, Multiplier: {self.multiplier}, Risk per trade: {self.risk_per_trade:.2%}")
         self.debug(f"📊 Exporting 1-minute data to: {self.minute_data_file}")
 
-    def _write_minute_data_header(self):
-        """Write CSV header for 1-minute data export."""
-        with open(self.minute_data_file, 'w') as f:
-            f.write("timestamp,datetime_utc,open,high,low,close,volume,portfolio_value,equity\n")
+    def _create_minute_data_exporter(self):
+        """Create the buffered 1-minute data exporter (writes the CSV header)."""
+        formats = [fmt.strip() for fmt in self.GetParameter("minute_export_formats", "csv").split(",")]
+        flush_every = int(self.GetParameter("minute_export_flush_bars", "10000"))
+        self.minute_exporter = MinuteDataExporter(self.minute_data_file, flush_every, formats)
 
     def _export_minute_data(self, data: Slice):
-        """Export 1-minute data to CSV file."""
+        """Buffer 1-minute data for export."""
         if self.btc_symbol not in data:
             return
 
         bar = data[self.btc_symbol]
-        timestamp = int(bar.end_time.timestamp())
-        portfolio_value = self.portfolio.total_portfolio_value
-
-        # Write to CSV
-        with open(self.minute_data_file, 'a') as f:
-            f.write(f"{timestamp},{bar.end_time.isoformat()},{bar.open:.2f},"
-                   f"{bar.high:.2f},{bar.low:.2f},{bar.close:.2f},"
-                   f"{bar.volume},{portfolio_value:.2f},{portfolio_value:.2f}\n")
+        # Buffered; rows are written in chunks and at on_end_of_algorithm
+        self.minute_exporter.record_bar(bar, self.portfolio.total_portfolio_value)
 
     def _initialize_technical_indicators(self):
         """Initialize technical indicators and libraries"""
@@ -136,9 +148,12 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
 
     def on_data(self, slice: Slice):
         """Process minute-level data for strategy execution"""
+        profiler = self.profiler
+        profiler.begin()
 
         # Export 1-minute data (true minute intervals, not 12-minute)
         self._export_minute_data(slice)
+        profiler.lap('export')
 
         # Skip if warmup period not complete
         if self.is_warming_up:
@@ -156,33 +171,38 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
         # Validate market data quality
         if not self.validate_market_data(bar):
             return
+        profiler.lap('validation')
 
         # Update technical indicators
         if not self.update_indicators(bar):
             return
+        profiler.lap('indicators')
 
         # Execute trading strategy
         self._execute_trading_strategy(bar)
+        profiler.lap('strategy')
 
         # Update performance tracking
         self._update_performance_metrics()
+        profiler.lap('metrics')
 
         # Apply portfolio risk limits
         self.apply_portfolio_risk_limits()
+        profiler.lap('risk_limits')
 
     def validate_market_data(self, bar):
         """Validate incoming market data for quality"""
 
         # Ensure OHLC data is logically consistent
         if not (bar.low <= bar.close <= bar.high and bar.low <= bar.open <= bar.high):
-            self.error("Invalid OHLC data - skipping bar")
+            self.logger.error('invalid_ohlc', "Invalid OHLC data - skipping bar")
             return False
 
         # Check for unusual price movements (potential data errors)
         if hasattr(self, '_prev_close') and self._prev_close:
             price_change = abs(bar.close - self._prev_close) / self._prev_close
             if price_change > 0.05:  # 5% single-minute move
-                self.warning(f"Large price change detected: {price_change:.2%}")
+                self.logger.warning('large_price_change', "Large price change detected: {:.2%}", price_change)
 
         self._prev_close = bar.close
         return True
@@ -204,14 +224,16 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
 
             # Log signals for debugging
             if self.supertrend.is_buy_signal():
-                self.debug(f"BUY SIGNAL: BTC ${bar.close:.2f}, Supertrend: ${current_supertrend:.2f}")
+                self.logger.debug('buy_signal', "BUY SIGNAL: BTC ${:.2f}, Supertrend: ${:.2f}",
+                                  bar.close, current_supertrend)
             elif self.supertrend.is_sell_signal():
-                self.debug(f"SELL SIGNAL: BTC ${bar.close:.2f}, Supertrend: ${current_supertrend:.2f}")
+                self.logger.debug('sell_signal', "SELL SIGNAL: BTC ${:.2f}, Supertrend: ${:.2f}",
+                                  bar.close, current_supertrend)
 
             return True
 
         except Exception as e:
-            self.error(f"Error updating indicators: {str(e)}")
+            self.logger.error('indicator_error', "Error updating indicators: {}", e)
             return False
 
     def _execute_trading_strategy(self, bar):
@@ -236,13 +258,14 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
         self._prev_price = current_price
 
         if buy_signal or sell_signal:
-            self.debug(f"Trading check at ${current_price:.2f}: Buy={buy_signal}, Sell={sell_signal}")
+            self.logger.debug('trading_check', "Trading check at ${:.2f}: Buy={}, Sell={}",
+                              current_price, buy_signal, sell_signal)
 
         if buy_signal:
-            self.debug(f"Executing BUY signal at ${current_price:.2f}")
+            self.logger.debug('execute_buy', "Executing BUY signal at ${:.2f}", current_price)
             self._handle_buy_signal(current_price, current_time)
         elif sell_signal:
-            self.debug(f"Executing SELL signal at ${current_price:.2f}")
+            self.logger.debug('execute_sell', "Executing SELL signal at ${:.2f}", current_price)
             self._handle_sell_signal(current_price, current_time)
 
         # Update stop-loss for existing positions
@@ -273,7 +296,8 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
                 self.start_of_day_equity = self.portfolio.total_portfolio_value
                 self._current_reset_date = current_date_str  # Mark that we've reset for this date
 
-                self.log(f"Daily Reset - Start of day equity: ${self.start_of_day_equity:.2f}")
+                self.logger.info('daily_reset', "Daily Reset - Start of day equity: ${:.2f}",
+                                 self.start_of_day_equity)
 
     def _can_trade(self, current_time):
         """Check if we can execute a trade based on constraints"""
@@ -316,8 +340,9 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
             final_position_size = min_quantity
 
         # Log the calculation for debugging
-        self.debug(f"Position sizing: Price=${entry_price:.2f}, Stop=${stop_price:.2f}, "
-                  f"Risk={self.risk_per_trade:.1%}, Size={final_position_size:.6f} BTC")
+        self.logger.debug('position_sizing',
+                          "Position sizing: Price=${:.2f}, Stop=${:.2f}, Risk={:.1%}, Size={:.6f} BTC",
+                          entry_price, stop_price, self.risk_per_trade, final_position_size)
 
         return final_position_size
 
@@ -327,13 +352,14 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
         # PROPER: Check for existing positions to prevent accumulation
         current_holdings = self.portfolio[self.btc_symbol].quantity
         if current_holdings > 0:
-            self.debug(f"Already holding {current_holdings:.6f} BTC, skipping buy signal")
+            self.logger.debug('buy_skipped_holding', "Already holding {:.6f} BTC, skipping buy signal",
+                              current_holdings)
             return
 
         # Calculate stop-loss at current supertrend level
         current_supertrend = self.supertrend.get_current_supertrend()
         if not current_supertrend:
-            self.debug("No supertrend level available for buy signal")
+            self.logger.debug('buy_skipped_no_stop', "No supertrend level available for buy signal")
             return
 
         stop_price = current_supertrend
@@ -343,8 +369,8 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
             current_price, stop_price, self.portfolio.total_portfolio_value
         )
 
-        self.debug(f"Buy signal: Price=${current_price:.2f}, Stop=${stop_price:.2f}, "
-                  f"Position Size={position_size:.6f} BTC")
+        self.logger.debug('buy_signal_sizing', "Buy signal: Price=${:.2f}, Stop=${:.2f}, Position Size={:.6f} BTC",
+                          current_price, stop_price, position_size)
 
         if position_size > 0:
             # Open new position
@@ -362,12 +388,15 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
                 self.stop_loss_level = stop_price
                 self.position_entry_time = current_time
 
-                self.log(f"BUY EXECUTED: {position_size:.6f} BTC at ${current_price:.2f}, "
-                        f"Total Holdings: {self.position_size:.6f} BTC, Stop: ${stop_price:.2f}")
+                self.logger.info('buy_executed',
+                                 "BUY EXECUTED: {:.6f} BTC at ${:.2f}, Total Holdings: {:.6f} BTC, Stop: ${:.2f}",
+                                 position_size, current_price, self.position_size, stop_price)
             else:
-                self.error(f"Failed to place buy order for {position_size:.6f} BTC at ${current_price:.2f}")
+                self.logger.error('buy_order_failed', "Failed to place buy order for {:.6f} BTC at ${:.2f}",
+                                  position_size, current_price)
         else:
-            self.debug(f"Position size calculated as {position_size}, no trade executed")
+            self.logger.debug('buy_skipped_zero_size', "Position size calculated as {}, no trade executed",
+                              position_size)
 
     def _handle_sell_signal(self, current_price, current_time):
         """Execute sell signal and close existing position"""
@@ -375,7 +404,8 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
         # Check current holdings
         current_holdings = self.portfolio[self.btc_symbol].quantity
         if current_holdings <= 0:
-            self.debug(f"No BTC holdings to sell ({current_holdings}), skipping sell signal")
+            self.logger.debug('sell_skipped', "No BTC holdings to sell ({}), skipping sell signal",
+                              current_holdings)
             return
 
         # Calculate P&L
@@ -409,11 +439,13 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
             self.position_entry_time = None
 
             win_rate = self._get_win_rate()
-            self.log(f"SELL EXECUTED: BTC at ${current_price:.2f}, "
-                    f"Quantity: {current_holdings:.6f}, P&L: ${pnl:.2f}, "
-                    f"Win Rate: {win_rate:.2%}, Total P&L: ${self.total_pnl:.2f}")
+            self.logger.info('sell_executed',
+                             "SELL EXECUTED: BTC at ${:.2f}, Quantity: {:.6f}, P&L: ${:.2f}, "
+                             "Win Rate: {:.2%}, Total P&L: ${:.2f}",
+                             current_price, current_holdings, pnl, win_rate, self.total_pnl)
         else:
-            self.debug(f"Sell order failed - holdings unchanged: {current_holdings} -> {new_holdings}")
+            self.logger.debug('sell_order_failed', "Sell order failed - holdings unchanged: {} -> {}",
+                              current_holdings, new_holdings)
 
     def _update_stop_loss(self, current_price):
         """Update stop-loss for existing positions"""
@@ -428,7 +460,7 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
                 self.stop_loss_level = current_supertrend
                 # Log stop-loss updates for important moves
                 if current_supertrend > self.stop_loss_level * 1.001:  # 0.1% move
-                    self.debug(f"Updated stop-loss to: ${current_supertrend:.2f}")
+                    self.logger.debug('stop_loss_update', "Updated stop-loss to: ${:.2f}", current_supertrend)
 
     def _get_win_rate(self):
         """Calculate current win rate"""
@@ -462,29 +494,17 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
         #     self.liquidate()
 
         # Simple monitoring only
-        self.debug(f"Portfolio monitoring: Equity=${current_equity:.2f}, BTC Exposure=${btc_exposure:.2f}")
+        self.logger.debug('portfolio_monitoring', "Portfolio monitoring: Equity=${:.2f}, BTC Exposure=${:.2f}",
+                          current_equity, btc_exposure)
 
     def _update_performance_metrics(self):
         """Update performance tracking metrics"""
 
         current_equity = self.portfolio.total_portfolio_value
+        btc_price = self.securities[self.btc_symbol].price if self.btc_symbol in self.securities else 0
 
-        # Update equity curve
-        self.equity_curve.append({
-            'timestamp': self.time,
-            'equity': current_equity,
-            'btc_price': self.securities[self.btc_symbol].price if self.btc_symbol in self.securities else 0
-        })
-
-        # Update drawdown calculation
-        if current_equity > self.peak_equity:
-            self.peak_equity = current_equity
-
-        current_drawdown = (self.peak_equity - current_equity) / self.peak_equity
-        self.drawdowns.append(current_drawdown)
-
-        if current_drawdown > self.max_drawdown:
-            self.max_drawdown = current_drawdown
+        # Update equity curve, peak and drawdown
+        self.equity_tracker.update(self.time, current_equity, btc_price)
 
         # Update daily P&L
         self.daily_pnl = current_equity - self.start_of_day_equity
@@ -492,27 +512,22 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
     def calculate_performance_metrics(self):
         """Calculate comprehensive performance metrics"""
 
-        if len(self.equity_curve) < 2:
+        tracker = self.equity_tracker
+        if tracker.count < 2:
             return {}
 
-        equity_values = [point['equity'] for point in self.equity_curve]
-        total_return = (equity_values[-1] - self.initial_cash) / self.initial_cash
+        final_equity = tracker.last_equity
+        total_return = (final_equity - self.initial_cash) / self.initial_cash
 
-        # Calculate daily returns
-        returns = []
-        for i in range(1, len(equity_values)):
-            daily_return = (equity_values[i] - equity_values[i-1]) / equity_values[i-1]
-            returns.append(daily_return)
-
-        volatility = np.std(returns) * np.sqrt(252 * 24 * 60) if len(returns) > 1 else 0  # Annualized for minute data
+        # Minute returns, from the tracker's online statistics
+        stats = tracker.stats
+        num_returns = stats.return_count
+        volatility = stats.std() * np.sqrt(MINUTES_PER_YEAR)  # Annualized for minute data
 
         # Risk-adjusted metrics
         risk_free_rate = 0.02  # 2% risk-free rate
-        if len(returns) > 0 and np.std(returns) > 0:
-            excess_returns = np.mean(returns) - (risk_free_rate / (252 * 24 * 60))  # Minute-based risk-free rate
-            sharpe_ratio = excess_returns / np.std(returns) * np.sqrt(252 * 24 * 60)
-        else:
-            sharpe_ratio = 0
+        sharpe_ratio = stats.sharpe_ratio(risk_free_rate, MINUTES_PER_YEAR)
+        sortino_ratio = stats.sortino_ratio(risk_free_rate, MINUTES_PER_YEAR)
 
         # Additional metrics
         win_rate = self._get_win_rate()
@@ -520,20 +535,24 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
 
         return {
             'total_return': total_return,
-            'annualized_return': total_return * (252 * 24 * 60) / len(returns) if len(returns) > 0 else 0,
+            'annualized_return': total_return * MINUTES_PER_YEAR / num_returns if num_returns > 0 else 0,
             'volatility': volatility,
             'sharpe_ratio': sharpe_ratio,
-            'max_drawdown': self.max_drawdown,
+            'sortino_ratio': sortino_ratio,
+            'max_drawdown': tracker.max_drawdown,
             'win_rate': win_rate,
             'total_trades': self.total_trades,
             'avg_trade_pnl': avg_trade_pnl,
             'total_pnl': self.total_pnl,
-            'final_equity': equity_values[-1]
+            'final_equity': final_equity
         }
 
     def on_end_of_algorithm(self):
         """Final performance summary and analysis"""
 
+        # Write out the remaining buffered minute data
+        self.minute_exporter.close()
+
         metrics = self.calculate_performance_metrics()
 
         self.log("=" * 80)
@@ -546,6 +565,7 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
         self.log(f"Annualized Return: {metrics.get('annualized_return', 0):.2%}")
         self.log(f"Volatility: {metrics.get('volatility', 0):.2%}")
         self.log(f"Sharpe Ratio: {metrics.get('sharpe_ratio', 0):.2f}")
+        self.log(f"Sortino Ratio: {metrics.get('sortino_ratio', 0):.2f}")
         self.log(f"Maximum Drawdown: {metrics.get('max_drawdown', 0):.2%}")
         self.log(f"Total Trades: {metrics.get('total_trades', 0)}")
         self.log(f"Win Rate: {metrics.get('win_rate', 0):.2%}")
@@ -553,6 +573,13 @@ class BitcoinSupertrendStrategy(QCAlgorithm):
         self.log(f"Average Trade P&L: ${metrics.get('avg_trade_pnl', 0):,.2f}")
         self.log("=" * 80)
 
+        if self.profiler.enabled:
+            for line in self.profiler.report_lines():
+                self.log(line)
+            self.profiler.save("btc_phase_profile.json")
+
+        self.logger.log_summary()
+
     def on_error(self, error_code, error_message):
         """Handle trading errors gracefully"""
 
@@ -576,10 +603,16 @@ class SuperTrendIndicator:
     - Configurable multiplier for band distance
     """
 
+    __slots__ = (
+        'period', 'multiplier', '_tr_sum', '_tr_count', 'final_upper_band', 'final_lower_band',
+        'supertrend', 'signal', 'prev_signal', 'is_ready', 'bar_count', 'prev_close', '_prev_atr'
+    )
+
     def __init__(self, period=10, multiplier=3):
         self.period = period
         self.multiplier = multiplier
-        self.atr_values = deque(maxlen=period)
+        self._tr_sum = 0.0  # Running TR sum for the warmup average
+        self._tr_count = 0
         self.final_upper_band = None
         self.final_lower_band = None
         self.supertrend = None
@@ -603,17 +636,17 @@ class SuperTrendIndicator:
 
     def calculate_atr(self, tr):
         """Calculate Average True Range using Wilder's smoothing"""
-        self.atr_values.append(tr)
-
-        if len(self.atr_values) < self.period:
-            return np.mean(list(self.atr_values))
-        else:
-            if self._prev_atr is None:
-                self._prev_atr = np.mean(list(self.atr_values))
-
-            current_atr = (self._prev_atr * (self.period - 1) + tr) / self.period
-            self._prev_atr = current_atr
-            return current_atr
+        prev_atr = self._prev_atr
+        if prev_atr is None:
+            self._tr_sum += tr
+            self._tr_count += 1
+            if self._tr_count < self.period:
+                return self._tr_sum / self._tr_count
+            prev_atr = self._tr_sum / self._tr_count
+
+        current_atr = (prev_atr * (self.period - 1) + tr) / self.period
+        self._prev_atr = current_atr
+        return current_atr
 
     def update(self, high, low, close):
         """Update indicator with latest OHLC data"""
@@ -1,12 +1,13 @@
 """
 Bitcoin Supertrend Strategy - Parameter Optimization Script
 
-This script implements comprehensive parameter optimization for the Supertrend strategy
-using QuantConnect's optimization framework. It provides both grid search and
-advanced optimization techniques.
+This script implements comprehensive parameter optimization for the Supertrend strategy.
+Parameter sets are scored by replaying local minute data through the strategy rules
+with LocalBacktestEvaluator, so no Lean launch is needed per parameter set. It
+provides both grid search and advanced optimization techniques.
 
 Usage:
-    python optimize.py
+    python optimize.py --data btc_minute_equity_data.csv
 
 Author: Claude Code
 Created: 2024
@@ -15,11 +16,26 @@ Created: 2024
 import os
 import sys
 import json
+import argparse
 import pandas as pd
 import numpy as np
+import math
 from datetime import datetime, timedelta
 from itertools import product
 
+# Add the project directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Shared market data tools live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Library.technical_indicators.supertrend import SuperTrendSweep
+from local_backtest import LocalBacktestEvaluator, IncrementalIndicatorFeed
+from executors import create_executor
+from result_cache import ResultCache
+from search import ParameterSpace, SuccessiveHalving, Hyperband, TPESampler
+from marketdata import MarketDataStore, DEFAULT_STORE_DIR
+
 
 class SupertrendOptimizer:
     """
@@ -30,9 +46,36 @@ class SupertrendOptimizer:
     2. Walk-Forward Analysis: Out-of-sample testing
     3. Monte Carlo Simulation: Statistical robustness testing
     4. Sensitivity Analysis: Parameter impact assessment
+    5. Adaptive Search: Successive halving / Hyperband and TPE sampling
     """
 
-    def __init__(self):
+    def __init__(self, data_file=None, evaluator=None, executor='serial', workers=None,
+                 cache=None, store=None, symbol='btcusd'):
+        """
+        Initialize the optimizer
+
+        Args:
+            data_file (str, optional): Minute OHLC CSV exported by the strategy
+            evaluator (LocalBacktestEvaluator, optional): Ready-made evaluator,
+                takes precedence over data_file and store
+            executor (str): Evaluation backend: 'serial', 'thread' or 'process'
+            workers (int, optional): Worker count for thread/process backends
+            cache (ResultCache, optional): Persistent cache of evaluated parameter sets
+            store (MarketDataStore, optional): Columnar store to read bars from
+                when no data_file is given
+            symbol (str): Stored symbol to optimize on (default: 'btcusd')
+        """
+        if evaluator is None and data_file is not None:
+            evaluator = LocalBacktestEvaluator.from_csv(data_file)
+        elif evaluator is None and store is not None:
+            evaluator = LocalBacktestEvaluator.from_store(store, symbol)
+        self.evaluator = evaluator
+
+        self.executor_kind = executor
+        self.workers = workers
+        self._executor = None
+        self.cache = cache
+
         self.parameter_ranges = {
             'atr_period': [7, 10, 14, 21],
             'multiplier': [2, 3, 5, 7],
@@ -64,39 +107,29 @@ class SupertrendOptimizer:
 
         print(f"Testing {len(parameter_combinations)} parameter combinations...")
 
-        results = []
-
-        for i, (atr_period, multiplier, risk_percent, max_position) in enumerate(parameter_combinations):
-            print(f"Progress: {i+1}/{len(parameter_combinations)}", end='\r')
-
-            # Run backtest with current parameters
-            score = self.run_parameter_backtest(
-                atr_period=atr_period,
-                multiplier=multiplier,
-                risk_percent=risk_percent,
-                max_position_size=max_position
-            )
-
-            result = {
+        parameter_sets = [
+            {
                 'atr_period': atr_period,
                 'multiplier': multiplier,
                 'risk_percent': risk_percent,
-                'max_position_size': max_position,
-                'score': score,
-                'timestamp': datetime.now().isoformat()
+                'max_position_size': max_position
             }
+            for atr_period, multiplier, risk_percent, max_position in parameter_combinations
+        ]
+
+        # Supertrend is shared across combinations with the same (atr_period, multiplier)
+        all_metrics = self._evaluate_many(parameter_sets, shared_indicator=True)
 
+        results = []
+
+        for params, metrics in zip(parameter_sets, all_metrics):
+            result = self._format_result(params, metrics)
             results.append(result)
 
             # Update best parameters
-            if score > self.best_score:
-                self.best_score = score
-                self.best_parameters = {
-                    'atr_period': atr_period,
-                    'multiplier': multiplier,
-                    'risk_percent': risk_percent,
-                    'max_position_size': max_position
-                }
+            if result['score'] > self.best_score:
+                self.best_score = result['score']
+                self.best_parameters = dict(params)
 
         print(f"\n✅ Grid search complete! Best score: {self.best_score:.4f}")
 
@@ -106,8 +139,157 @@ class SupertrendOptimizer:
         self.optimization_results = results
         return results
 
+    def successive_halving_optimization(self, num_candidates=81, eta=3, min_days=7,
+                                        start_date=None, end_date=None, hyperband=False,
+                                        seed=None):
+        """
+        Search with successive halving (or Hyperband) over growing data slices
+
+        Many random candidates are scored on a short recent slice and only the
+        best 1/eta are promoted to eta times longer slices, so most of the
+        budget goes to promising parameters.
+
+        Args:
+            num_candidates (int): Candidates of the first rung (ignored by Hyperband)
+            eta (int): Reduction factor between rungs
+            min_days (float): Slice length of the first rung in days
+            start_date (str, optional): Start of the span (default: first bar)
+            end_date (str, optional): End of the span (default: after the last bar)
+            hyperband (bool): Run Hyperband brackets instead of a single halving
+            seed (int, optional): Seed for reproducible candidate draws
+
+        Returns:
+            list: Final-rung results with scores, best first
+        """
+        print("🪜 Running Hyperband Search..." if hyperband else "🪜 Running Successive Halving Search...")
+        print("=" * 50)
+
+        start_date, end_date = self._search_span(start_date, end_date)
+        space = ParameterSpace.from_parameter_ranges(self.parameter_ranges)
+
+        if hyperband:
+            search = Hyperband(space, self._evaluate_search, start_date, end_date,
+                               eta=eta, min_days=min_days, seed=seed)
+            outcome = search.run()
+            rungs = [rung for bracket in outcome['brackets'] for rung in bracket]
+        else:
+            search = SuccessiveHalving(space, self._evaluate_search, start_date, end_date,
+                                       eta=eta, min_days=min_days, seed=seed)
+            outcome = search.run(num_candidates)
+            rungs = outcome['rungs']
+
+        for rung in rungs:
+            print(f"Rung: {rung['candidates']} candidates on {rung['days']:.0f} days, "
+                  f"best score {rung['best_score']:.4f}")
+
+        return self._record_search_results(outcome)
+
+    def bayesian_optimization(self, num_trials=50, batch_size=1, start_date=None,
+                              end_date=None, seed=None):
+        """
+        Search with a Tree-structured Parzen Estimator over continuous parameters
+
+        multiplier, risk_percent and max_position_size are sampled between the
+        bounds of parameter_ranges; atr_period stays a discrete choice.
+
+        Suggestions of one batch are evaluated together (in parallel with a
+        thread or process executor) but drawn without each other's scores,
+        so the sampled parameter sets depend on batch_size. It is therefore
+        not derived from the worker count: a seeded search gives the same
+        results for any executor and number of workers. Set batch_size to
+        the worker count to trade that sample efficiency for parallelism.
+
+        Args:
+            num_trials (int): Number of parameter sets to evaluate
+            batch_size (int): Suggestions per batch (default: 1, fully sequential)
+            start_date (str, optional): Evaluation window start
+            end_date (str, optional): Evaluation window end
+            seed (int, optional): Seed for reproducible sampling
+
+        Returns:
+            list: Results with scores, best first
+        """
+        print("🧠 Running Bayesian (TPE) Search...")
+        print("=" * 50)
+
+        space = ParameterSpace.from_parameter_ranges(self.parameter_ranges)
+        sampler = TPESampler(space, seed=seed)
+        outcome = sampler.run(self._evaluate_search, num_trials, start_date, end_date,
+                              batch_size=batch_size)
+
+        print(f"Evaluated {len(outcome['results'])} parameter sets")
+
+        return self._record_search_results(outcome)
+
+    def _evaluate_search(self, parameter_sets, start_date, end_date):
+        """Evaluation callback handed to the search strategies"""
+        return self._evaluate_many(parameter_sets, start_date, end_date, shared_indicator=True)
+
+    def _search_span(self, start_date, end_date):
+        """Default a search span to the loaded bars"""
+        timestamps = self._require_evaluator().timestamps
+        if start_date is None:
+            start_date = pd.to_datetime(int(timestamps[0]), unit='s')
+        if end_date is None:
+            end_date = pd.to_datetime(int(timestamps[-1]) + 60, unit='s')
+        return pd.Timestamp(start_date), pd.Timestamp(end_date)
+
+    def _record_search_results(self, outcome):
+        """Store a search outcome as optimization results and update the best parameters"""
+        results = [self._format_result(params, metrics) for params, metrics in outcome['results']]
+
+        if outcome['best_score'] > self.best_score:
+            self.best_score = outcome['best_score']
+            self.best_parameters = dict(outcome['best_parameters'])
+
+        print(f"\n✅ Search complete! Best score: {outcome['best_score']:.4f}")
+
+        self.optimization_results = results
+        return results
+
+    @staticmethod
+    def _format_result(params, metrics):
+        """Optimization result entry of one evaluated parameter set"""
+        result = dict(params)
+        result.update({
+            'score': float(metrics.get('sharpe_ratio', 0)),
+            'max_drawdown': metrics.get('max_drawdown', 0),
+            'total_trades': metrics.get('total_trades', 0),
+            'timestamp': datetime.now().isoformat()
+        })
+        return result
+
+    def compute_supertrend_grid(self, high, low, close, atr_periods=None, multipliers=None):
+        """
+        Compute Supertrend for every (atr_period, multiplier) pair in one shared pass
+
+        True Range is computed once, ATR once per distinct period, and the band
+        recurrence for all multipliers of a period runs together.
+
+        Args:
+            high (np.ndarray): Bar high prices
+            low (np.ndarray): Bar low prices
+            close (np.ndarray): Bar close prices
+            atr_periods (list, optional): Periods to sweep (default: parameter_ranges)
+            multipliers (list, optional): Multipliers to sweep (default: parameter_ranges)
+
+        Returns:
+            dict: Indicator arrays keyed by (atr_period, multiplier)
+        """
+        atr_periods = atr_periods or self.parameter_ranges['atr_period']
+        multipliers = multipliers or self.parameter_ranges['multiplier']
+
+        sweep = SuperTrendSweep(atr_periods, multipliers)
+        results = sweep.compute(high, low, close)
+
+        return {
+            (period, multiplier): sweep.column(results, period, multiplier)
+            for period in atr_periods
+            for multiplier in multipliers
+        }
+
     def walk_forward_optimization(self, start_date='2023-01-01', end_date='2024-12-31',
-                                train_days=30, test_days=7):
+                                train_days=30, test_days=7, step_days=None, incremental=False):
         """
         Perform walk-forward optimization to test parameter robustness
 
@@ -116,6 +298,10 @@ class SupertrendOptimizer:
             end_date (str): End date for optimization
             train_days (int): Training period in days
             test_days (int): Testing period in days
+            step_days (int, optional): Days between window starts
+                (default: train_days + test_days, non-overlapping windows)
+            incremental (bool): Run Supertrend continuously across windows and
+                only feed each step's new bars instead of restarting it per window
 
         Returns:
             list: Walk-forward optimization results
@@ -125,33 +311,50 @@ class SupertrendOptimizer:
 
         start = pd.to_datetime(start_date)
         end = pd.to_datetime(end_date)
+        step = timedelta(days=step_days if step_days else train_days + test_days)
 
+        # Lay out all windows first so they can be evaluated together
+        windows = []
         current_date = start
-        walk_forward_results = []
-
         while current_date + timedelta(days=train_days + test_days) <= end:
             train_end = current_date + timedelta(days=train_days)
             test_start = train_end
             test_end = test_start + timedelta(days=test_days)
+            windows.append((current_date, train_end, test_start, test_end))
 
-            print(f"Training: {current_date.date()} to {train_end.date()}")
-            print(f"Testing:  {test_start.date()} to {test_end.date()}")
+            # Move to next period
+            current_date = current_date + step
 
-            # Find optimal parameters on training data
-            optimal_params = self.optimize_on_training_data(
-                start_date=current_date,
-                end_date=train_end
+        candidates = self._training_parameter_sets()
+
+        if incremental:
+            optimal_parameters, test_metrics = self._walk_forward_incremental(windows, candidates)
+        else:
+            # Find optimal parameters on every training window
+            training_metrics = self._evaluate_windows(
+                [(train_start, train_end, candidates) for train_start, train_end, _, _ in windows],
+                shared_indicator=True
             )
+            optimal_parameters = [self._select_best(candidates, metrics)
+                                  for metrics in training_metrics]
 
             # Test on out-of-sample data
-            test_score = self.run_parameter_backtest(
-                start_date=test_start,
-                end_date=test_end,
-                **optimal_params
-            )
+            test_metrics = self._evaluate_windows([
+                (test_start, test_end, [params])
+                for (_, _, test_start, test_end), params in zip(windows, optimal_parameters)
+            ])
+
+        walk_forward_results = []
+
+        for (train_start, train_end, test_start, test_end), optimal_params, metrics in zip(
+                windows, optimal_parameters, test_metrics):
+            print(f"Training: {train_start.date()} to {train_end.date()}")
+            print(f"Testing:  {test_start.date()} to {test_end.date()}")
+
+            test_score = float(metrics[0].get('sharpe_ratio', 0))
 
             result = {
-                'train_start': current_date.isoformat(),
+                'train_start': train_start.isoformat(),
                 'train_end': train_end.isoformat(),
                 'test_start': test_start.isoformat(),
                 'test_end': test_end.isoformat(),
@@ -162,9 +365,6 @@ class SupertrendOptimizer:
 
             walk_forward_results.append(result)
 
-            # Move to next period
-            current_date = test_end
-
         print(f"\n✅ Walk-forward optimization complete!")
 
         # Calculate statistics
@@ -176,6 +376,93 @@ class SupertrendOptimizer:
 
         return walk_forward_results
 
+    def _walk_forward_incremental(self, windows, candidates):
+        """
+        Walk the windows in order on one continuously running indicator feed
+
+        Args:
+            windows (list): (train_start, train_end, test_start, test_end) tuples
+            candidates (list): Parameter sets scored on each training window
+
+        Returns:
+            tuple: (optimal parameters per window, test metrics list per window)
+        """
+        feed = IncrementalIndicatorFeed(
+            self._require_evaluator(),
+            {(int(p['atr_period']), float(p['multiplier'])) for p in candidates}
+        )
+
+        optimal_parameters = []
+        test_metrics = []
+
+        for k, (train_start, train_end, test_start, test_end) in enumerate(windows):
+            training = self._evaluate_on_feed(feed, candidates, train_start, train_end)
+            best = self._select_best(candidates, training)
+
+            optimal_parameters.append(best)
+            test_metrics.append(self._evaluate_on_feed(feed, [best], test_start, test_end))
+
+            # Output before the next training window is no longer needed
+            if k + 1 < len(windows):
+                feed.release(windows[k + 1][0])
+
+        return optimal_parameters, test_metrics
+
+    def _evaluate_on_feed(self, feed, parameter_sets, start_date, end_date):
+        """
+        Evaluate parameter sets over one window with Supertrend from an incremental feed
+
+        Args:
+            feed (IncrementalIndicatorFeed): Feed tracking every parameter set's pair
+            parameter_sets (list): Parameter dicts
+            start_date (datetime): Window start
+            end_date (datetime): Window end
+
+        Returns:
+            list: Metrics dicts in the order of parameter_sets
+        """
+        evaluator = self._require_evaluator()
+
+        # Advance the feed even on cache hits so its state stays continuous
+        columns = feed.window(start_date, end_date)
+
+        keys = []
+        cached = {}
+        if self.cache is not None:
+            keys = [self.cache.make_key(params, start_date, end_date, evaluator.fingerprint(),
+                                        variant='incremental')
+                    for params in parameter_sets]
+            cached = self.cache.get_many(keys)
+
+        results = []
+        computed = {}
+        for i, params in enumerate(parameter_sets):
+            key = keys[i] if keys else None
+            if key in cached:
+                results.append(cached[key])
+                continue
+            if key in computed:
+                results.append(computed[key])
+                continue
+
+            metrics = evaluator.run(
+                atr_period=int(params['atr_period']),
+                multiplier=float(params['multiplier']),
+                risk_percent=float(params['risk_percent']),
+                max_position_size=float(params['max_position_size']),
+                start_date=start_date,
+                end_date=end_date,
+                indicator=columns[(int(params['atr_period']), float(params['multiplier']))]
+            )
+            results.append(metrics)
+            if key is not None:
+                computed[key] = metrics
+
+        if self.cache is not None:
+            self.cache.put_many(computed)
+
+        return results
+
     def optimize_on_training_data(self, start_date, end_date):
         """
         Find optimal parameters on training data
@@ -187,41 +474,47 @@ class SupertrendOptimizer:
         Returns:
             dict: Optimal parameters
         """
-        best_params = None
-        best_score = float('-inf')
+        candidates = self._training_parameter_sets()
+        metrics = self._evaluate_many(candidates, start_date, end_date, shared_indicator=True)
 
-        # Test key parameter combinations
+        return self._select_best(candidates, metrics)
+
+    def _training_parameter_sets(self):
+        """Key parameter combinations tested on each training window"""
         atr_periods = [10, 14]  # Reduced for speed
         multipliers = [3, 5]    # Reduced for speed
 
-        for atr_period in atr_periods:
-            for multiplier in multipliers:
-                score = self.run_parameter_backtest(
-                    start_date=start_date,
-                    end_date=end_date,
-                    atr_period=atr_period,
-                    multiplier=multiplier,
-                    risk_percent=0.02,
-                    max_position_size=0.10
-                )
-
-                if score > best_score:
-                    best_score = score
-                    best_params = {
-                        'atr_period': atr_period,
-                        'multiplier': multiplier,
-                        'risk_percent': 0.02,
-                        'max_position_size': 0.10
-                    }
+        return [
+            {
+                'atr_period': atr_period,
+                'multiplier': multiplier,
+                'risk_percent': 0.02,
+                'max_position_size': 0.10
+            }
+            for atr_period in atr_periods
+            for multiplier in multipliers
+        ]
+
+    def _select_best(self, parameter_sets, metrics):
+        """Return the first parameter set with the highest score"""
+        best_params = None
+        best_score = float('-inf')
+
+        for params, result in zip(parameter_sets, metrics):
+            score = result.get('sharpe_ratio', 0)
+            if score > best_score:
+                best_score = score
+                best_params = params
 
         return best_params
 
-    def monte_carlo_optimization(self, num_simulations=100):
+    def monte_carlo_optimization(self, num_simulations=100, seed=None):
         """
         Perform Monte Carlo simulation to test parameter robustness
 
         Args:
             num_simulations (int): Number of Monte Carlo simulations
+            seed (int, optional): Seed for reproducible parameter draws
 
         Returns:
             dict: Monte Carlo results
@@ -229,34 +522,29 @@ class SupertrendOptimizer:
         print("🎲 Running Monte Carlo Simulation...")
         print("=" * 50)
 
-        simulation_results = []
+        random_state = np.random.RandomState(seed) if seed is not None else np.random
 
-        for i in range(num_simulations):
-            if i % 10 == 0:
-                print(f"Simulation {i+1}/{num_simulations}")
-
-            # Randomly select parameters
-            atr_period = np.random.choice(self.parameter_ranges['atr_period'])
-            multiplier = np.random.choice(self.parameter_ranges['multiplier'])
-            risk_percent = np.random.choice(self.parameter_ranges['risk_percent'])
-            max_position_size = np.random.choice(self.parameter_ranges['max_position_size'])
-
-            # Run backtest
-            score = self.run_parameter_backtest(
-                atr_period=atr_period,
-                multiplier=multiplier,
-                risk_percent=risk_percent,
-                max_position_size=max_position_size
-            )
+        # Randomly select parameters for every simulation up front
+        parameter_sets = [
+            {
+                name: random_state.choice(self.parameter_ranges[name]).item()
+                for name in ('atr_period', 'multiplier', 'risk_percent', 'max_position_size')
+            }
+            for _ in range(num_simulations)
+        ]
 
-            simulation_results.append({
-                'simulation': i + 1,
-                'atr_period': atr_period,
-                'multiplier': multiplier,
-                'risk_percent': risk_percent,
-                'max_position_size': max_position_size,
-                'score': score
-            })
+        print(f"Evaluating {num_simulations} simulations...")
+
+        # Run backtests
+        all_metrics = self._evaluate_many(parameter_sets, shared_indicator=True)
+
+        simulation_results = []
+
+        for i, (params, metrics) in enumerate(zip(parameter_sets, all_metrics)):
+            result = {'simulation': i + 1}
+            result.update(params)
+            result['score'] = float(metrics.get('sharpe_ratio', 0))
+            simulation_results.append(result)
 
         # Analyze results
         scores = [r['score'] for r in simulation_results]
@@ -280,13 +568,41 @@ class SupertrendOptimizer:
             }
         }
 
+    def evaluate_parameters(self, atr_period=10, multiplier=3, risk_percent=0.02,
+                            max_position_size=0.10, start_date=None, end_date=None,
+                            indicator=None):
+        """
+        Run a local backtest with specific parameters and return its metrics
+
+        Args:
+            atr_period (int): ATR period parameter
+            multiplier (float): Supertrend multiplier
+            risk_percent (float): Risk per trade
+            max_position_size (float): Maximum position size
+            start_date (datetime): Start date for backtest
+            end_date (datetime): End date for backtest
+            indicator (dict, optional): Precomputed Supertrend arrays for the window
+
+        Returns:
+            dict: Metrics as reported by calculate_performance_metrics
+        """
+        return self._require_evaluator().run(
+            atr_period=int(atr_period),
+            multiplier=float(multiplier),
+            risk_percent=float(risk_percent),
+            max_position_size=float(max_position_size),
+            start_date=start_date,
+            end_date=end_date,
+            indicator=indicator
+        )
+
     def run_parameter_backtest(self, atr_period=10, multiplier=3, risk_percent=0.02,
                              max_position_size=0.10, start_date=None, end_date=None):
         """
         Run a backtest with specific parameters
 
-        In a real implementation, this would execute an actual QuantConnect backtest.
-        For demonstration, we'll simulate the backtest result.
+        Replays the local minute data through the strategy rules with
+        LocalBacktestEvaluator instead of launching Lean.
 
         Args:
             atr_period (int): ATR period parameter
@@ -297,30 +613,166 @@ class SupertrendOptimizer:
             end_date (datetime): End date for backtest
 
         Returns:
-            float: Score (e.g., Sharpe ratio)
+            float: Score (Sharpe ratio, 0 when too few bars were traded)
+        """
+        metrics = self.evaluate_parameters(
+            atr_period=atr_period,
+            multiplier=multiplier,
+            risk_percent=risk_percent,
+            max_position_size=max_position_size,
+            start_date=start_date,
+            end_date=end_date
+        )
+        return float(metrics.get('sharpe_ratio', 0))
+
+    def _require_evaluator(self):
+        """Return the local evaluator, failing clearly when no data was loaded"""
+        if self.evaluator is None:
+            raise RuntimeError("No price data loaded - pass data_file to SupertrendOptimizer")
+        return self.evaluator
+
+    @property
+    def executor(self):
+        """Evaluation executor, created on first use"""
+        if self._executor is None:
+            self._executor = create_executor(self.executor_kind, self._require_evaluator(),
+                                             self.workers)
+        return self._executor
+
+    def close(self):
+        """Shut down the evaluation executor and release shared memory"""
+        if self._executor is not None:
+            self._executor.close()
+            self._executor = None
+
+    def cache_stats(self):
+        """Result cache statistics, or None when caching is disabled"""
+        return self.cache.stats() if self.cache is not None else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _evaluate_many(self, parameter_sets, start_date=None, end_date=None,
+                       shared_indicator=False):
         """
-        # Simulate backtest result based on parameter impact
-        # This is a simplified simulation - in practice, run actual backtest
+        Evaluate parameter sets over one date window with the configured executor
+
+        Args:
+            parameter_sets (list): Parameter dicts
+            start_date (datetime, optional): Window start
+            end_date (datetime, optional): Window end
+            shared_indicator (bool): Share Supertrend across equal (atr_period, multiplier)
 
-        # Base performance
-        base_score = 1.0
+        Returns:
+            list: Metrics dicts in the order of parameter_sets
+        """
+        return self._evaluate_windows([(start_date, end_date, parameter_sets)],
+                                      shared_indicator)[0]
 
-        # Parameter impacts (simplified model)
-        atr_impact = -0.1 * (atr_period - 10) / 10  # Penalize extreme values
-        mult_impact = -0.05 * abs(multiplier - 3)    # Prefer multiplier around 3
-        risk_impact = 0.5 * (risk_percent - 0.02)    # Slightly prefer higher risk
-        pos_impact = -0.2 * abs(max_position_size - 0.10)  # Prefer 10% position
+    def _evaluate_windows(self, windows, shared_indicator=False):
+        """
+        Evaluate parameter sets over several date windows in one executor batch
 
-        # Combine impacts
-        score = base_score + atr_impact + mult_impact + risk_impact + pos_impact
+        Args:
+            windows (list): (start_date, end_date, parameter_sets) tuples
+            shared_indicator (bool): Share Supertrend across equal (atr_period, multiplier)
 
-        # Add some randomness to simulate market variability
-        score += np.random.normal(0, 0.1)
+        Returns:
+            list: One list of metrics per window, in parameter_sets order
+        """
+        results = [[None] * len(parameter_sets) for _, _, parameter_sets in windows]
+
+        # Serve previously scored evaluations from the result cache
+        window_keys = None
+        if self.cache is not None:
+            fingerprint = self._require_evaluator().fingerprint()
+            window_keys = [
+                [self.cache.make_key(params, start_date, end_date, fingerprint)
+                 for params in parameter_sets]
+                for start_date, end_date, parameter_sets in windows
+            ]
+            cached = self.cache.get_many([key for keys in window_keys for key in keys])
+            for window_index, keys in enumerate(window_keys):
+                for i, key in enumerate(keys):
+                    if key in cached:
+                        results[window_index][i] = cached[key]
+
+        tasks = []
+        owners = []
+        for window_index, (start_date, end_date, parameter_sets) in enumerate(windows):
+            pending = self._pending_indices(results[window_index], window_keys, window_index)
+            if not pending:
+                continue
+            pending_sets = [parameter_sets[i] for i in pending]
+            for indices in self._split_parameter_sets(pending_sets, shared_indicator):
+                tasks.append({
+                    'parameters': [pending_sets[i] for i in indices],
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'shared_indicator': shared_indicator
+                })
+                owners.append((window_index, [pending[i] for i in indices]))
+
+        computed = {}
+        for (window_index, indices), metrics in zip(owners, self.executor.map(tasks)):
+            for i, result in zip(indices, metrics):
+                results[window_index][i] = result
+                if window_keys is not None:
+                    computed[window_keys[window_index][i]] = result
+
+        if window_keys is not None:
+            self.cache.put_many(computed)
+
+            # Fill duplicates of parameter sets evaluated in this batch
+            for window_index, keys in enumerate(window_keys):
+                for i, key in enumerate(keys):
+                    if results[window_index][i] is None:
+                        results[window_index][i] = computed[key]
 
-        # Ensure score is reasonable
-        score = max(0.5, min(score, 3.0))
+        return results
 
-        return score
+    @staticmethod
+    def _pending_indices(window_results, window_keys, window_index):
+        """Indices still to evaluate in a window, one per distinct cache key"""
+        if window_keys is None:
+            return [i for i, result in enumerate(window_results) if result is None]
+
+        pending = {}
+        for i, key in enumerate(window_keys[window_index]):
+            if window_results[i] is None and key not in pending:
+                pending[key] = i
+        return list(pending.values())
+
+    def _split_parameter_sets(self, parameter_sets, shared_indicator):
+        """Split parameter set indices into tasks, enough to keep every worker busy"""
+        workers = self.executor.workers
+        if not parameter_sets:
+            return []
+
+        if not shared_indicator:
+            size = math.ceil(len(parameter_sets) / (workers * 4))
+            return [list(range(i, min(i + size, len(parameter_sets))))
+                    for i in range(0, len(parameter_sets), size)]
+
+        # Keep each (atr_period, multiplier) pair within one task so its
+        # Supertrend is computed once; split periods by multiplier as needed
+        by_period = {}
+        for i, params in enumerate(parameter_sets):
+            by_period.setdefault(int(params['atr_period']), []).append(i)
+
+        chunks_per_period = math.ceil(workers * 2 / len(by_period))
+        tasks = []
+        for indices in by_period.values():
+            multipliers = sorted({float(parameter_sets[i]['multiplier']) for i in indices})
+            size = math.ceil(len(multipliers) / chunks_per_period)
+            for j in range(0, len(multipliers), size):
+                chunk = set(multipliers[j:j + size])
+                tasks.append([i for i in indices
+                              if float(parameter_sets[i]['multiplier']) in chunk])
+        return tasks
 
     def parameter_sensitivity_analysis(self):
         """
@@ -332,23 +784,26 @@ class SupertrendOptimizer:
         print("📊 Running Parameter Sensitivity Analysis...")
         print("=" * 50)
 
-        sensitivity_results = {}
+        parameter_sets = []
 
         for param_name, param_values in self.parameter_ranges.items():
-            print(f"Analyzing {param_name}...")
-
-            param_scores = []
             for value in param_values:
                 # Use median values for other parameters
                 test_params = {param_name: value}
                 for other_param, other_values in self.parameter_ranges.items():
                     if other_param != param_name:
                         test_params[other_param] = np.median(other_values)
+                parameter_sets.append((param_name, value, test_params))
 
-                score = self.run_parameter_backtest(**test_params)
-                param_scores.append((value, score))
+        all_metrics = self._evaluate_many([params for _, _, params in parameter_sets])
 
-            sensitivity_results[param_name] = param_scores
+        sensitivity_results = {param_name: [] for param_name in self.parameter_ranges}
+
+        for (param_name, value, _), metrics in zip(parameter_sets, all_metrics):
+            sensitivity_results[param_name].append((value, float(metrics.get('sharpe_ratio', 0))))
+
+        for param_name in self.parameter_ranges:
+            print(f"Analyzed {param_name}")
 
         return sensitivity_results
 
@@ -386,6 +841,13 @@ class SupertrendOptimizer:
             print(f"   {param_name.replace('_', ' ').title()}:")
             print(f"      Min: {min(values)}, Max: {max(values)}, Mean: {np.mean(values):.2f}")
 
+        stats = self.cache_stats()
+        if stats is not None:
+            print(f"\n💾 RESULT CACHE")
+            print("-" * 40)
+            print(f"   Hits: {stats['hits']}, Misses: {stats['misses']}, Hit Rate: {stats['hit_rate']:.1%}")
+            print(f"   Entries: {stats['entries']}/{stats['max_entries']}, Evictions: {stats['evictions']}")
+
         print("\n" + "=" * 80)
 
     def save_results(self, filename='optimization_results.json'):
@@ -421,13 +883,61 @@ class SupertrendOptimizer:
             print(f"❌ Error loading results: {e}")
 
 
+def parse_arguments():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Bitcoin Supertrend parameter optimization")
+    parser.add_argument('--data', default=None,
+                        help="Minute OHLC CSV exported by the strategy "
+                             "(default: market data store, else btc_minute_equity_data.csv)")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR,
+                        help="Columnar market data store directory")
+    parser.add_argument('--symbol', default='btcusd',
+                        help="Symbol to read from the market data store (default: btcusd)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of parallel workers (default: 1, serial)")
+    parser.add_argument('--executor', choices=['serial', 'thread', 'process'], default=None,
+                        help="Evaluation backend (default: process when --workers > 1)")
+    parser.add_argument('--step-days', type=int, default=None,
+                        help="Days between walk-forward windows (default: train + test days)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Carry Supertrend state across walk-forward windows")
+    parser.add_argument('--cache', default='optimization_cache.sqlite',
+                        help="SQLite result cache file (default: optimization_cache.sqlite)")
+    parser.add_argument('--cache-size', type=int, default=100000,
+                        help="Maximum number of cached evaluations (default: 100000)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Evaluate every parameter set without the result cache")
+    return parser.parse_args()
+
+
 def main():
     """Main optimization routine"""
     print("🚀 Bitcoin Supertrend Strategy - Parameter Optimization")
     print("=" * 70)
 
+    args = parse_arguments()
+
+    store = MarketDataStore(args.store)
+    data_file = args.data
+    if data_file is None and not store.has_symbol(args.symbol):
+        data_file = 'btc_minute_equity_data.csv'
+
+    if data_file is not None and not os.path.exists(data_file):
+        print(f"❌ Price data not found: {data_file}")
+        print("Run a backtest first to export minute data, import bars into the "
+              "market data store, or pass --data")
+        return
+
+    if data_file is None:
+        print(f"📦 Reading {args.symbol.upper()} bars from market data store {args.store}")
+
+    executor = args.executor or ('process' if args.workers > 1 else 'serial')
+
+    cache = None if args.no_cache else ResultCache(args.cache, max_entries=args.cache_size)
+
     # Initialize optimizer
-    optimizer = SupertrendOptimizer()
+    optimizer = SupertrendOptimizer(data_file=data_file, executor=executor, workers=args.workers,
+                                    cache=cache, store=store, symbol=args.symbol)
 
     # Choose optimization method
     print("\nChoose optimization method:")
@@ -436,9 +946,11 @@ def main():
     print("3. Monte Carlo Simulation (statistical analysis)")
     print("4. Parameter Sensitivity Analysis")
     print("5. Full Optimization Suite")
+    print("6. Successive Halving / Hyperband Search (fast adaptive search)")
+    print("7. Bayesian (TPE) Search (continuous parameters)")
 
     try:
-        choice = input("\nEnter your choice (1-5): ").strip()
+        choice = input("\nEnter your choice (1-7): ").strip()
 
         if choice == '1':
             results = optimizer.grid_search_optimization()
@@ -446,7 +958,8 @@ def main():
             optimizer.save_results()
 
         elif choice == '2':
-            results = optimizer.walk_forward_optimization()
+            results = optimizer.walk_forward_optimization(step_days=args.step_days,
+                                                          incremental=args.incremental)
             print(f"Completed {len(results)} walk-forward periods")
 
         elif choice == '3':
@@ -465,7 +978,8 @@ def main():
             optimizer.grid_search_optimization()
 
             # Walk-forward
-            optimizer.walk_forward_optimization()
+            optimizer.walk_forward_optimization(step_days=args.step_days,
+                                                incremental=args.incremental)
 
             # Monte Carlo
             optimizer.monte_carlo_optimization(50)  # Reduced for speed
@@ -477,6 +991,18 @@ def main():
             optimizer.generate_optimization_report()
             optimizer.save_results()
 
+        elif choice == '6':
+            use_hyperband = input("Use Hyperband brackets? (y/N): ").strip().lower() == 'y'
+            optimizer.successive_halving_optimization(hyperband=use_hyperband)
+            optimizer.generate_optimization_report()
+            optimizer.save_results()
+
+        elif choice == '7':
+            num_trials = int(input("Number of trials (default 50): ") or "50")
+            optimizer.bayesian_optimization(num_trials)
+            optimizer.generate_optimization_report()
+            optimizer.save_results()
+
         else:
             print("❌ Invalid choice. Running grid search by default...")
             optimizer.grid_search_optimization()
@@ -486,6 +1012,13 @@ def main():
         print("\n👋 Optimization interrupted by user")
     except Exception as e:
         print(f"❌ Error during optimization: {e}")
+    finally:
+        optimizer.close()
+        if cache is not None:
+            stats = cache.stats()
+            print(f"💾 Result cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.1%} hit rate)")
+            cache.close()
 
     print("\n🎉 Optimization process complete!")
 
@@ -9,6 +9,8 @@ Author: Claude Code
 Created: 2024
 """
 
+import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -17,6 +19,13 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# Shared market data and strategy tools live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Library'))
+
+from marketdata import MarketDataStore, DEFAULT_STORE_DIR
+from strategy_tools.performance_stats import MINUTES_PER_YEAR
+
 
 class SupertrendAnalyzer:
     """
@@ -32,6 +41,7 @@ class SupertrendAnalyzer:
     def __init__(self):
         self.backtest_results = None
         self.optimization_results = None
+        self.price_data = None
         self.parameter_ranges = {
             'atr_period': [7, 10, 14, 21],
             'multiplier': [2, 3, 5, 7],
@@ -55,6 +65,42 @@ class SupertrendAnalyzer:
         except Exception as e:
             print(f"❌ Error loading results: {e}")
 
+    def load_price_data(self, symbol='btcusd', start_date=None, end_date=None,
+                        store_dir=DEFAULT_STORE_DIR):
+        """
+        Load minute bars from the columnar market data store
+
+        Args:
+            symbol (str): Stored symbol (default: 'btcusd')
+            start_date (str, optional): Range start (inclusive)
+            end_date (str, optional): Range end (exclusive)
+            store_dir (str): Market data store directory
+        """
+        try:
+            store = MarketDataStore(store_dir)
+            self.price_data = store.read_frame(symbol, start_date, end_date)
+            print(f"✅ Loaded {len(self.price_data)} {symbol.upper()} bars from {store_dir}")
+        except KeyError as e:
+            print(f"❌ {e}")
+
+    def calculate_price_benchmark(self):
+        """
+        Annualized buy-and-hold return and volatility of the loaded price data
+
+        Returns:
+            tuple: (annual return, annual volatility), or None without price data
+        """
+        if self.price_data is None or len(self.price_data) < 2:
+            return None
+
+        close = self.price_data['close'].values
+        minute_returns = np.diff(close) / close[:-1]
+        years = len(minute_returns) / MINUTES_PER_YEAR
+
+        annual_return = (close[-1] / close[0]) ** (1 / years) - 1
+        annual_volatility = np.std(minute_returns) * np.sqrt(MINUTES_PER_YEAR)
+        return annual_return, annual_volatility
+
     def generate_sample_data(self, days=30):
         """
         Generate sample backtest data for demonstration
@@ -350,18 +396,26 @@ class SupertrendAnalyzer:
 
         return var, cvar
 
-    def compare_with_benchmark(self, benchmark_return=0.10, benchmark_volatility=0.20):
+    def compare_with_benchmark(self, benchmark_return=None, benchmark_volatility=None):
         """
         Compare strategy performance with a benchmark (e.g., Buy & Hold BTC)
 
         Args:
-            benchmark_return (float): Annual benchmark return
-            benchmark_volatility (float): Annual benchmark volatility
+            benchmark_return (float, optional): Annual benchmark return
+                (default: from loaded price data, else 10%)
+            benchmark_volatility (float, optional): Annual benchmark volatility
+                (default: from loaded price data, else 20%)
         """
         if not self.backtest_results:
             print("❌ No backtest results loaded")
             return
 
+        price_benchmark = self.calculate_price_benchmark() or (0.10, 0.20)
+        if benchmark_return is None:
+            benchmark_return = price_benchmark[0]
+        if benchmark_volatility is None:
+            benchmark_volatility = price_benchmark[1]
+
         metrics = self.backtest_results['metrics']
 
         print("📈 STRATEGY vs BENCHMARK COMPARISON:")
@@ -462,9 +516,10 @@ def main():
     print("1. Load real backtest data")
     print("2. Generate sample data for demonstration")
     print("3. Run full sample analysis")
+    print("4. Load backtest data with BTCUSD bars from the market data store")
 
     try:
-        choice = input("\nEnter your choice (1-3): ").strip()
+        choice = input("\nEnter your choice (1-4): ").strip()
 
         if choice == "1":
             file_path = input("Enter path to backtest results JSON: ").strip()
@@ -478,6 +533,12 @@ def main():
         elif choice == "3":
             analyzer.run_full_analysis()
 
+        elif choice == "4":
+            file_path = input("Enter path to backtest results JSON: ").strip()
+            analyzer.load_backtest_results(file_path)
+            analyzer.load_price_data()
+            analyzer.run_full_analysis()
+
         else:
             print("❌ Invalid choice. Running sample analysis...")
             analyzer.run_full_analysis()
@@ -0,0 +1,225 @@
+"""
+Bitcoin Supertrend Strategy - Optimization Result Cache
+
+Persistent SQLite cache for parameter evaluations. An entry is keyed on:
+
+- the parameter set (atr_period, multiplier, risk_percent, max_position_size)
+- the date window it was scored on
+- a fingerprint of the price data and evaluator settings
+- a hash of the strategy code that produces the metrics
+
+so re-running grid search, walk-forward windows or Monte Carlo draws only
+evaluates combinations that have not been scored before, and any change to
+the data or the trading logic invalidates old entries automatically.
+
+The cache keeps at most max_entries rows and evicts the least recently used
+ones beyond that.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Source files whose behavior determines the evaluation metrics
+CODE_FILES = (
+    'main.py',
+    'local_backtest.py',
+    os.path.join('Library', 'technical_indicators', 'supertrend.py'),
+    os.path.join('Library', 'technical_indicators', 'kernels.py'),
+)
+
+
+def code_fingerprint(files=CODE_FILES, base_dir=PROJECT_DIR):
+    """
+    Hash the strategy source files
+
+    Args:
+        files (tuple): Paths relative to base_dir
+        base_dir (str): Project directory
+
+    Returns:
+        str: Hex digest of the file contents (missing files are skipped)
+    """
+    digest = hashlib.sha256()
+    for name in files:
+        path = os.path.join(base_dir, name)
+        if not os.path.exists(path):
+            continue
+        digest.update(name.encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed store of evaluation metrics with LRU eviction
+
+    Only used from the optimizer's process; executors never touch it.
+    """
+
+    def __init__(self, path='optimization_cache.sqlite', max_entries=100000, code_hash=None):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path (str): SQLite file, or ':memory:' for a throwaway cache
+            max_entries (int): Maximum number of cached evaluations
+            code_hash (str, optional): Strategy code hash (default: code_fingerprint())
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.code_hash = code_hash or code_fingerprint()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                   key TEXT PRIMARY KEY,
+                   metrics TEXT NOT NULL,
+                   created REAL NOT NULL,
+                   last_used REAL NOT NULL
+               )"""
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)"
+        )
+        self._connection.commit()
+
+    def make_key(self, params, start_date, end_date, data_fingerprint, variant=None):
+        """
+        Build the cache key of one evaluation
+
+        Args:
+            params (dict): Parameter set
+            start_date (datetime or str, optional): Window start
+            end_date (datetime or str, optional): Window end
+            data_fingerprint (str): Fingerprint of price data and evaluator settings
+            variant (str, optional): Evaluation mode whose results differ from a
+                plain window replay, e.g. 'incremental'
+
+        Returns:
+            str: Hex digest identifying the evaluation
+        """
+        payload = {
+            'parameters': [
+                int(params['atr_period']),
+                float(params['multiplier']),
+                float(params['risk_percent']),
+                float(params['max_position_size'])
+            ],
+            'window': [self._window_bound(start_date), self._window_bound(end_date)],
+            'data': data_fingerprint,
+            'code': self.code_hash
+        }
+        if variant is not None:
+            payload['variant'] = variant
+        encoded = json.dumps(payload, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Look up cached metrics
+
+        Args:
+            keys (list): Cache keys
+
+        Returns:
+            dict: Metrics by key for the keys that were found
+        """
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+
+        # Stay well below SQLite's host parameter limit
+        for i in range(0, len(unique_keys), 500):
+            chunk = unique_keys[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._connection.execute(
+                f"SELECT key, metrics FROM results WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            found.update((key, json.loads(metrics)) for key, metrics in rows)
+
+        if found:
+            now = time.time()
+            self._connection.executemany(
+                "UPDATE results SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+            self._connection.commit()
+
+        self.hits += sum(1 for key in keys if key in found)
+        self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items):
+        """
+        Store metrics and evict the least recently used entries over the limit
+
+        Args:
+            items (dict): Metrics by cache key
+        """
+        if not items:
+            return
+
+        now = time.time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO results (key, metrics, created, last_used) VALUES (?, ?, ?, ?)",
+            [(key, json.dumps(metrics), now, now) for key, metrics in items.items()]
+        )
+
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._connection.execute(
+                "DELETE FROM results WHERE key IN "
+                "(SELECT key FROM results ORDER BY last_used, created LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+        self._connection.commit()
+
+    def stats(self):
+        """
+        Cache statistics of this session
+
+        Returns:
+            dict: hits, misses, hit_rate, evictions, entries and max_entries
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups > 0 else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self),
+            'max_entries': self.max_entries
+        }
+
+    def clear(self):
+        """Remove all cached evaluations"""
+        self._connection.execute("DELETE FROM results")
+        self._connection.commit()
+
+    def close(self):
+        """Close the database connection"""
+        self._connection.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @staticmethod
+    def _window_bound(value):
+        """Normalize a window bound to an ISO string (None for open-ended)"""
+        if value is None:
+            return None
+        return pd.Timestamp(value).isoformat()
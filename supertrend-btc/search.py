@@ -0,0 +1,406 @@
+"""
+Bitcoin Supertrend Strategy - Adaptive Parameter Search
+
+Search strategies that spend the evaluation budget on promising regions of
+the parameter space instead of a full grid:
+
+- SuccessiveHalving: score many candidates on a short, recent slice of the
+  data, keep the best 1/eta and re-score them on an eta times longer slice,
+  until the survivors are scored on the full span
+- Hyperband: several successive halving brackets trading off the number of
+  candidates against the length of their first slice
+- TPESampler: Tree-structured Parzen Estimator that models good and bad
+  parameter values separately and samples where their ratio is highest,
+  suited to continuous parameters such as multiplier and risk_percent
+
+Every strategy takes an evaluate(parameter_sets, start_date, end_date)
+callback returning one metrics dict per parameter set, such as
+SupertrendOptimizer._evaluate_many, so caching and parallel executors apply.
+
+Author: Claude Code
+Created: 2024
+"""
+
+import math
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+# Parameters searched continuously by default, with their rounding
+CONTINUOUS_DECIMALS = {
+    'multiplier': 2,
+    'risk_percent': 4,
+    'max_position_size': 4
+}
+
+
+def score_of(metrics):
+    """Optimization score of a metrics dict (Sharpe ratio, 0 when empty)"""
+    return float(metrics.get('sharpe_ratio', 0))
+
+
+def _random_state(seed):
+    """Accept a seed or an existing RandomState"""
+    if isinstance(seed, np.random.RandomState):
+        return seed
+    return np.random.RandomState(seed)
+
+
+class ParameterSpace:
+    """
+    Search space with discrete choices and continuous ranges
+
+    Continuous values are rounded so that nearby draws share result cache
+    entries.
+    """
+
+    def __init__(self, choices=None, ranges=None, decimals=None):
+        """
+        Initialize the search space
+
+        Args:
+            choices (dict, optional): Parameter name -> list of allowed values
+            ranges (dict, optional): Parameter name -> (low, high) bounds
+            decimals (dict, optional): Rounding of continuous parameters
+        """
+        self.choices = {name: list(values) for name, values in (choices or {}).items()}
+        self.ranges = {name: (float(low), float(high)) for name, (low, high) in (ranges or {}).items()}
+        self.decimals = dict(CONTINUOUS_DECIMALS if decimals is None else decimals)
+
+        if not self.choices and not self.ranges:
+            raise ValueError("Parameter space is empty")
+
+    @classmethod
+    def from_parameter_ranges(cls, parameter_ranges, continuous=tuple(CONTINUOUS_DECIMALS)):
+        """
+        Build a space from SupertrendOptimizer.parameter_ranges
+
+        Args:
+            parameter_ranges (dict): Parameter name -> list of grid values
+            continuous (tuple): Parameters searched between their min and max grid value
+
+        Returns:
+            ParameterSpace: Search space
+        """
+        choices = {}
+        ranges = {}
+        for name, values in parameter_ranges.items():
+            if name in continuous:
+                ranges[name] = (min(values), max(values))
+            else:
+                choices[name] = list(values)
+        return cls(choices, ranges)
+
+    def sample(self, random_state):
+        """
+        Draw one parameter set uniformly
+
+        Args:
+            random_state (np.random.RandomState): Random source
+
+        Returns:
+            dict: Parameter set
+        """
+        params = {name: values[random_state.randint(len(values))]
+                  for name, values in self.choices.items()}
+        for name, (low, high) in self.ranges.items():
+            params[name] = random_state.uniform(low, high)
+        return self.round(params)
+
+    def round(self, params):
+        """Round continuous parameters to their configured decimals"""
+        rounded = dict(params)
+        for name in self.ranges:
+            value = float(rounded[name])
+            if name in self.decimals:
+                value = round(value, self.decimals[name])
+            rounded[name] = value
+        return rounded
+
+
+class SuccessiveHalving:
+    """
+    Successive halving over growing, most-recent data slices
+
+    The first rung scores every candidate on the last min_days of the span;
+    each following rung keeps the top 1/eta and multiplies the slice length
+    by eta. The last rung always uses the full span.
+    """
+
+    def __init__(self, space, evaluate, start_date, end_date, eta=3, min_days=7, seed=None):
+        """
+        Initialize the search
+
+        Args:
+            space (ParameterSpace): Space to draw candidates from
+            evaluate (callable): evaluate(parameter_sets, start_date, end_date) -> metrics list
+            start_date (datetime or str): Start of the full span
+            end_date (datetime or str): End of the full span (exclusive)
+            eta (int): Reduction factor between rungs (default: 3)
+            min_days (float): Slice length of the first rung in days (default: 7)
+            seed (int or RandomState, optional): Random source for candidate draws
+        """
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+
+        self.space = space
+        self.evaluate = evaluate
+        self.start_date = pd.Timestamp(start_date)
+        self.end_date = pd.Timestamp(end_date)
+        self.eta = eta
+        self.min_days = min_days
+        self.random_state = _random_state(seed)
+
+    def run(self, num_candidates=27, candidates=None):
+        """
+        Run the rungs
+
+        Args:
+            num_candidates (int): Number of random candidates (default: 27)
+            candidates (list, optional): Explicit candidates instead of random draws
+
+        Returns:
+            dict: 'best_parameters', 'best_score', 'results' (parameter set and
+                metrics pairs of the final rung) and 'rungs' (per-rung summary)
+        """
+        if candidates is None:
+            candidates = [self.space.sample(self.random_state) for _ in range(num_candidates)]
+        if not candidates:
+            raise ValueError("No candidates to search")
+
+        total_days = (self.end_date - self.start_date).total_seconds() / 86400
+        days = self.min_days
+        rungs = []
+
+        while True:
+            final = days >= total_days or len(candidates) <= self.eta
+            slice_start = self.start_date if final else self.end_date - timedelta(days=days)
+
+            metrics = self.evaluate(candidates, slice_start, self.end_date)
+            scores = np.array([score_of(m) for m in metrics])
+
+            rungs.append({
+                'days': total_days if final else days,
+                'candidates': len(candidates),
+                'best_score': float(scores.max())
+            })
+
+            # Stable ordering keeps the earlier candidate on equal scores
+            order = np.argsort(-scores, kind='stable')
+            if final:
+                results = [(candidates[i], metrics[i]) for i in order]
+                break
+
+            keep = max(1, len(candidates) // self.eta)
+            candidates = [candidates[i] for i in order[:keep]]
+            days *= self.eta
+
+        return {
+            'best_parameters': results[0][0],
+            'best_score': score_of(results[0][1]),
+            'results': results,
+            'rungs': rungs
+        }
+
+
+class Hyperband:
+    """
+    Hyperband: successive halving brackets with different starting slices
+
+    Bracket s starts with about (s_max + 1) / (s + 1) * eta**s candidates on
+    slices of total_days / eta**s days, from aggressive early stopping
+    (s = s_max) down to plain random search on the full span (s = 0).
+    """
+
+    def __init__(self, space, evaluate, start_date, end_date, eta=3, min_days=7, seed=None):
+        """
+        Initialize the search
+
+        Args:
+            space (ParameterSpace): Space to draw candidates from
+            evaluate (callable): evaluate(parameter_sets, start_date, end_date) -> metrics list
+            start_date (datetime or str): Start of the full span
+            end_date (datetime or str): End of the full span (exclusive)
+            eta (int): Reduction factor between rungs (default: 3)
+            min_days (float): Shortest slice length in days (default: 7)
+            seed (int or RandomState, optional): Random source for candidate draws
+        """
+        self.space = space
+        self.evaluate = evaluate
+        self.start_date = pd.Timestamp(start_date)
+        self.end_date = pd.Timestamp(end_date)
+        self.eta = eta
+        self.min_days = min_days
+        self.random_state = _random_state(seed)
+
+    def run(self):
+        """
+        Run all brackets
+
+        Returns:
+            dict: 'best_parameters', 'best_score', 'results' (final rungs of all
+                brackets, best first) and 'brackets' (rung summaries per bracket)
+        """
+        total_days = (self.end_date - self.start_date).total_seconds() / 86400
+        s_max = max(0, int(math.floor(math.log(max(total_days / self.min_days, 1), self.eta))))
+
+        results = []
+        brackets = []
+        for s in range(s_max, -1, -1):
+            num_candidates = int(math.ceil((s_max + 1) / (s + 1) * self.eta ** s))
+            bracket = SuccessiveHalving(
+                self.space, self.evaluate, self.start_date, self.end_date,
+                eta=self.eta, min_days=total_days / self.eta ** s, seed=self.random_state
+            ).run(num_candidates)
+
+            results.extend(bracket['results'])
+            brackets.append(bracket['rungs'])
+
+        results.sort(key=lambda item: score_of(item[1]), reverse=True)
+        return {
+            'best_parameters': results[0][0],
+            'best_score': score_of(results[0][1]),
+            'results': results,
+            'brackets': brackets
+        }
+
+
+class TPESampler:
+    """
+    Tree-structured Parzen Estimator over a ParameterSpace
+
+    Observations are split into the top gamma fraction ("good") and the rest.
+    Each parameter gets a Parzen density per group (Gaussian kernels for
+    continuous ranges, smoothed counts for choices); candidates are drawn from
+    the good density and the one maximizing good / bad density is suggested.
+    Parameters are modeled independently.
+    """
+
+    def __init__(self, space, gamma=0.25, n_startup=10, n_candidates=24, seed=None):
+        """
+        Initialize the sampler
+
+        Args:
+            space (ParameterSpace): Space to sample
+            gamma (float): Fraction of observations treated as good (default: 0.25)
+            n_startup (int): Uniform draws before the model is used (default: 10)
+            n_candidates (int): Candidates drawn per parameter and suggestion (default: 24)
+            seed (int or RandomState, optional): Random source
+        """
+        self.space = space
+        self.gamma = gamma
+        self.n_startup = n_startup
+        self.n_candidates = n_candidates
+        self.random_state = _random_state(seed)
+        self.observations = []
+
+    def observe(self, params, score):
+        """Record the score of an evaluated parameter set"""
+        self.observations.append((params, float(score)))
+
+    def suggest(self):
+        """
+        Suggest the next parameter set to evaluate
+
+        Returns:
+            dict: Parameter set
+        """
+        if len(self.observations) < self.n_startup:
+            return self.space.sample(self.random_state)
+
+        ranked = sorted(self.observations, key=lambda item: item[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(ranked))))
+        good = [params for params, _ in ranked[:n_good]]
+        bad = [params for params, _ in ranked[n_good:]]
+
+        params = {}
+        for name, values in self.space.choices.items():
+            params[name] = self._suggest_choice(
+                values, [p[name] for p in good], [p[name] for p in bad]
+            )
+        for name, (low, high) in self.space.ranges.items():
+            params[name] = self._suggest_continuous(
+                low, high, [p[name] for p in good], [p[name] for p in bad]
+            )
+        return self.space.round(params)
+
+    def run(self, evaluate, num_trials=50, start_date=None, end_date=None, batch_size=1):
+        """
+        Suggest, evaluate and observe until num_trials parameter sets were scored
+
+        Args:
+            evaluate (callable): evaluate(parameter_sets, start_date, end_date) -> metrics list
+            num_trials (int): Evaluation budget (default: 50)
+            start_date (datetime or str, optional): Evaluation window start
+            end_date (datetime or str, optional): Evaluation window end
+            batch_size (int): Suggestions evaluated together, e.g. one per worker
+
+        Returns:
+            dict: 'best_parameters', 'best_score' and 'results' (parameter set
+                and metrics pairs, best first)
+        """
+        results = []
+        while len(results) < num_trials:
+            batch = [self.suggest() for _ in range(min(batch_size, num_trials - len(results)))]
+            for params, metrics in zip(batch, evaluate(batch, start_date, end_date)):
+                self.observe(params, score_of(metrics))
+                results.append((params, metrics))
+
+        results.sort(key=lambda item: score_of(item[1]), reverse=True)
+        return {
+            'best_parameters': results[0][0],
+            'best_score': score_of(results[0][1]),
+            'results': results
+        }
+
+    def _suggest_choice(self, values, good, bad):
+        """Pick the choice maximizing the ratio of smoothed good and bad frequencies"""
+        good_weights = np.array([good.count(v) + 1.0 for v in values])
+        bad_weights = np.array([bad.count(v) + 1.0 for v in values])
+        good_weights /= good_weights.sum()
+        bad_weights /= bad_weights.sum()
+
+        draws = self.random_state.choice(len(values), size=self.n_candidates, p=good_weights)
+        ratio = good_weights[draws] / bad_weights[draws]
+        return values[draws[int(np.argmax(ratio))]]
+
+    def _suggest_continuous(self, low, high, good, bad):
+        """Draw from the good Parzen density and keep the best good / bad ratio"""
+        width = high - low
+        if width <= 0:
+            return low
+
+        good = np.asarray(good, dtype=np.float64)
+        bad = np.asarray(bad, dtype=np.float64)
+        good_bandwidth = self._bandwidth(good, width)
+
+        # Mixture of kernels around good points plus a uniform prior component
+        component = self.random_state.randint(len(good) + 1, size=self.n_candidates)
+        draws = self.random_state.uniform(low, high, size=self.n_candidates)
+        from_kernel = component < len(good)
+        draws[from_kernel] = np.clip(
+            self.random_state.normal(good[component[from_kernel]], good_bandwidth),
+            low, high
+        )
+
+        ratio = (self._parzen_density(draws, good, good_bandwidth, width) /
+                 self._parzen_density(draws, bad, self._bandwidth(bad, width), width))
+        return float(draws[int(np.argmax(ratio))])
+
+    @staticmethod
+    def _bandwidth(points, width):
+        """Scott's rule bandwidth, bounded to a sensible fraction of the range"""
+        if len(points) < 2:
+            return width
+        bandwidth = 1.06 * np.std(points) * len(points) ** (-0.2)
+        return float(np.clip(bandwidth, width / 100, width))
+
+    @staticmethod
+    def _parzen_density(x, points, bandwidth, width):
+        """Density of a Gaussian kernel mixture with a uniform prior component"""
+        density = np.full(len(x), 1.0 / width)
+        if len(points):
+            z = (x[:, None] - points[None, :]) / bandwidth
+            kernels = np.exp(-0.5 * z * z) / (bandwidth * math.sqrt(2 * math.pi))
+            density += kernels.sum(axis=1)
+        return density / (len(points) + 1)
@@ -20,11 +20,19 @@ import pandas as pd
 # Add the project directory to the path
 sys.path.insert(0, os.path.dirname(__file__))
 
+# Shared strategy tools (Lean library project) and the repo-level packages
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(REPO_DIR, 'Library'))
+sys.path.append(REPO_DIR)
+
 try:
-    from Library.technical_indicators.supertrend import SuperTrendIndicator, SuperTrendHistory
+    from Library.technical_indicators.supertrend import (
+        SuperTrendIndicator, SuperTrendHistory, SuperTrendSweep, SuperTrendBank
+    )
 except ImportError as e:
     print(f"Warning: Could not import SuperTrendIndicator: {e}")
     print("Tests will use mock implementations")
+    SuperTrendBank = SuperTrendHistory = None
 
     # Mock implementation for testing
     class SuperTrendIndicator:
@@ -209,6 +217,443 @@ class TestSuperTrendIndicator(unittest.TestCase):
         self.assertTrue(high_vol_indicator.is_ready or not high_vol_indicator.is_ready)
 
 
+def generate_ohlc(num_bars, seed=7, start_price=45000, volatility=0.002):
+    """Generate a reproducible random-walk OHLC series as NumPy arrays"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, num_bars)))
+    high = close * (1 + rng.uniform(0, volatility, num_bars))
+    low = close * (1 - rng.uniform(0, volatility, num_bars))
+    return high, low, close
+
+
+@unittest.skipUnless(hasattr(SuperTrendIndicator, 'compute'), "batch API not available")
+class TestSuperTrendBatchCompute(unittest.TestCase):
+    """Test suite for the batch SuperTrendIndicator.compute API"""
+
+    def stream(self, indicator, high, low, close):
+        """Feed bars through update() and collect the per-bar outputs"""
+        rows = []
+        for h, l, c in zip(high.tolist(), low.tolist(), close.tolist()):
+            supertrend, signal = indicator.update(h, l, c)
+            rows.append((supertrend, signal, indicator.final_upper_band,
+                         indicator.final_lower_band, indicator.is_buy_signal(),
+                         indicator.is_sell_signal()))
+        return [np.array(column) for column in zip(*rows)]
+
+    def test_matches_streaming_update(self):
+        """Batch output must equal the streaming path bit for bit"""
+        high, low, close = generate_ohlc(3000)
+
+        for period, multiplier in [(10, 3), (7, 2.5), (1, 3), (21, 0.5)]:
+            streamed = self.stream(SuperTrendIndicator(period, multiplier), high, low, close)
+            batch = SuperTrendIndicator(period, multiplier).compute(high, low, close)
+
+            np.testing.assert_array_equal(batch['supertrend'], streamed[0])
+            np.testing.assert_array_equal(batch['signal'], streamed[1])
+            np.testing.assert_array_equal(batch['final_upper_band'], streamed[2])
+            np.testing.assert_array_equal(batch['final_lower_band'], streamed[3])
+            np.testing.assert_array_equal(batch['buy_signal'], streamed[4])
+            np.testing.assert_array_equal(batch['sell_signal'], streamed[5])
+
+    def test_split_batches_continue_streaming_state(self):
+        """Chunked compute() calls followed by update() match pure streaming"""
+        high, low, close = generate_ohlc(500)
+        streamed = SuperTrendIndicator(10, 3)
+        self.stream(streamed, high, low, close)
+
+        batched = SuperTrendIndicator(10, 3)
+        batched.compute(high[:4], low[:4], close[:4])
+        batched.compute(high[4:300], low[4:300], close[4:300])
+        self.stream(batched, high[300:], low[300:], close[300:])
+
+        self.assertEqual(batched.supertrend, streamed.supertrend)
+        self.assertEqual(batched.get_volatility_measure(), streamed.get_volatility_measure())
+        self.assertEqual((batched._tr_sum, batched._tr_count), (streamed._tr_sum, streamed._tr_count))
+        self.assertEqual(batched.bar_count, streamed.bar_count)
+
+    def test_mismatched_lengths_rejected(self):
+        """Arrays of different lengths raise ValueError"""
+        with self.assertRaises(ValueError):
+            SuperTrendIndicator().compute([2, 3], [1, 2], [1.5])
+
+
+@unittest.skipUnless(hasattr(SuperTrendIndicator, 'compute'), "batch API not available")
+class TestSuperTrendSweep(unittest.TestCase):
+    """Test suite for the multi-parameter SuperTrendSweep kernel"""
+
+    def test_grid_matches_single_indicator(self):
+        """Every grid column equals a standalone compute() for that pair"""
+        high, low, close = generate_ohlc(2000)
+
+        # A narrow and a wide grid exercise both band recurrence paths
+        for multipliers in ([0.5, 2, 3], list(np.linspace(0.25, 6, 20))):
+            sweep = SuperTrendSweep([7, 10], multipliers)
+            results = sweep.compute(high, low, close)
+
+            for period in (7, 10):
+                for multiplier in multipliers:
+                    expected = SuperTrendIndicator(period, multiplier).compute(high, low, close)
+                    column = sweep.column(results, period, multiplier)
+                    for key, values in column.items():
+                        np.testing.assert_array_equal(values, expected[key], err_msg=key)
+
+    def test_unknown_pair_rejected(self):
+        """Asking for a pair outside the grid raises KeyError"""
+        high, low, close = generate_ohlc(100)
+        sweep = SuperTrendSweep([10], [3])
+        results = sweep.compute(high, low, close)
+
+        with self.assertRaises(KeyError):
+            sweep.column(results, 10, 5)
+
+
+@unittest.skipUnless(hasattr(SuperTrendIndicator, 'compute'), "batch API not available")
+class TestRecurrenceKernels(unittest.TestCase):
+    """Kernel backends must match the pure-Python reference bit for bit"""
+
+    def setUp(self):
+        from Library.technical_indicators import kernels
+        self.kernels = kernels
+        high, low, close = generate_ohlc(3000, volatility=0.004)
+        self.close = close
+        hl_midpoint = ((high + low) / 2.0)[:, None]
+        self.atr = (high - low) * 1.5
+        band_width = np.array([0.1, 0.5, 1, 2, 3])[None, :] * self.atr[:, None]
+        self.basic_upper = hl_midpoint + band_width
+        self.basic_lower = hl_midpoint - band_width
+
+    def implementations(self):
+        """The compilable loop kernels, and the active backend when compiled"""
+        kernels = self.kernels
+        implementations = [(kernels.loop_wilder_recurrence, kernels.loop_band_recurrence,
+                            kernels.loop_band_recurrence_2d)]
+        if kernels.KERNEL_BACKEND != 'python':
+            implementations.append((kernels.wilder_recurrence, kernels.band_recurrence,
+                                    kernels.band_recurrence_2d))
+        return implementations
+
+    def test_wilder_recurrence_matches_reference(self):
+        expected = self.kernels.python_wilder_recurrence(self.atr, 123.456, 14)
+        for wilder, _, _ in self.implementations():
+            np.testing.assert_array_equal(wilder(self.atr, 123.456, 14), expected)
+
+    def test_band_recurrences_match_reference(self):
+        kernels = self.kernels
+        column = (self.basic_upper[:, 2], self.basic_lower[:, 2], self.close)
+        expected = kernels.python_band_recurrence(*column, 45000.0, 44000.0)
+        # Narrow (scalar) and row-stepped reference paths for the grid
+        expected_2d = kernels.python_band_recurrence_2d(self.basic_upper, self.basic_lower, self.close)
+        row_stepped = kernels.python_band_recurrence_2d(self.basic_upper, self.basic_lower,
+                                                        self.close, row_step_min_width=1)
+        np.testing.assert_array_equal(row_stepped[0], expected_2d[0])
+
+        for _, bands, bands_2d in self.implementations():
+            for actual, reference in zip(bands(*column, 45000.0, 44000.0), expected):
+                np.testing.assert_array_equal(actual, reference)
+            for actual, reference in zip(bands_2d(self.basic_upper, self.basic_lower, self.close),
+                                         expected_2d):
+                np.testing.assert_array_equal(actual, reference)
+
+
+@unittest.skipIf(SuperTrendBank is None, "SuperTrendBank not available")
+class TestSuperTrendBank(unittest.TestCase):
+    """Test suite for the multi-symbol SuperTrendBank"""
+
+    def test_matches_one_indicator_per_symbol(self):
+        """Every symbol tracks its own SuperTrendIndicator exactly, with missing bars"""
+        symbols = ['BTCUSD', 'ETHUSD', 'SOLUSD', 'LTCUSD']
+        periods = [10, 7, 1, 14]
+        multipliers = [0.25, 0.5, 3, 0.1]
+        series = [generate_ohlc(600, seed=seed, volatility=0.004) for seed in range(len(symbols))]
+        missing = np.random.default_rng(5).random((600, len(symbols))) < 0.1
+
+        bank = SuperTrendBank(symbols, periods, multipliers)
+        indicators = [SuperTrendIndicator(p, m) for p, m in zip(periods, multipliers)]
+        transitions = 0
+
+        for t in range(600):
+            high = np.array([s[0][t] for s in series])
+            low = np.array([s[1][t] for s in series])
+            close = np.where(missing[t], np.nan, [s[2][t] for s in series])
+            bank.update(high, low, close)
+
+            expected_buys, expected_sells = [], []
+            for j, indicator in enumerate(indicators):
+                if missing[t, j]:
+                    continue
+                supertrend, signal = indicator.update(series[j][0][t], series[j][1][t], series[j][2][t])
+                self.assertEqual(bank.supertrend[j], supertrend)
+                self.assertEqual(bank.signal[j], signal)
+                self.assertEqual(bank.final_lower_band[j], indicator.final_lower_band)
+                self.assertEqual(bank.is_ready[j], indicator.is_ready)
+                if indicator.is_buy_signal():
+                    expected_buys.append(symbols[j])
+                if indicator.is_sell_signal():
+                    expected_sells.append(symbols[j])
+
+            self.assertEqual(bank.transitions(), (expected_buys, expected_sells))
+            transitions += len(expected_buys) + len(expected_sells)
+
+        self.assertGreater(transitions, 10)
+
+
+@unittest.skipIf(SuperTrendHistory is None, "SuperTrendHistory not available")
+class TestSuperTrendHistory(unittest.TestCase):
+    """Test suite for the ring-buffer backed SuperTrendHistory"""
+
+    def test_ring_buffers_keep_most_recent_bars(self):
+        """History and signals match a full streaming run, truncated to max_history"""
+        high, low, close = generate_ohlc(700, volatility=0.004)
+        start = datetime(2024, 1, 1)
+        history = SuperTrendHistory(10, 0.25, max_history=100)
+        indicator = SuperTrendIndicator(10, 0.25)
+
+        levels, signals = [], []
+        for i, (h, l, c) in enumerate(zip(high.tolist(), low.tolist(), close.tolist())):
+            timestamp = start + timedelta(minutes=i)
+            history.update(h, l, c, timestamp)
+            level, _ = indicator.update(h, l, c)
+            levels.append(np.nan if level is None else level)
+            if indicator.is_buy_signal() or indicator.is_sell_signal():
+                signals.append((timestamp, 'BUY' if indicator.is_buy_signal() else 'SELL', c))
+
+        recent = history.get_history()
+        np.testing.assert_array_equal(recent['close'], close[-100:])
+        np.testing.assert_array_equal(recent['supertrend'], levels[-100:])
+        self.assertEqual(recent['timestamp'][-1], np.datetime64(start + timedelta(minutes=699)))
+
+        self.assertGreater(len(signals), 3)
+        recent_signals = history.get_recent_signals(3)
+        self.assertEqual([(s['timestamp'], s['type'], s['price']) for s in recent_signals],
+                         signals[-3:])
+
+        stats = history.get_performance_stats()
+        self.assertEqual(stats['total_bars'], 100)
+        self.assertEqual(stats['total_signals'], len(signals))
+        self.assertEqual(stats['price_range']['max'], close[-100:].max())
+
+
+def replay_strategy_per_bar(timestamps, open_prices, high, low, close, atr_period, multiplier,
+                            risk_percent=0.02, max_position_size=0.10, initial_cash=100000,
+                            max_daily_trades=10, min_trade_interval=30):
+    """Straightforward bar-by-bar replay of BitcoinSupertrendStrategy's on_data rules"""
+    indicator = SuperTrendIndicator(atr_period, multiplier)
+    cash, quantity, entry_price = float(initial_cash), 0.0, None
+    day, daily_trades, last_trade_time = None, 0, None
+    total_trades, winning_trades, total_pnl = 0, 0, 0.0
+    equity_curve, peak, max_drawdown = [], initial_cash, 0
+
+    for t, o, h, l, c in zip(timestamps, open_prices, high, low, close):
+        if not (l <= c <= h and l <= o <= h):
+            continue
+        indicator.update(h, l, c)
+        if not indicator.is_ready:
+            continue
+
+        if t // 86400 != day:
+            day, daily_trades = t // 86400, 0
+        can_trade = (daily_trades < max_daily_trades and
+                     (last_trade_time is None or t - last_trade_time >= min_trade_interval * 60))
+
+        if can_trade and indicator.is_buy_signal() and quantity == 0:
+            stop = indicator.get_current_supertrend()
+            risk = max(abs(c - stop), c * 0.01)
+            size = max(min(cash * risk_percent / risk, cash * max_position_size / c), 100 / c)
+            cash, quantity, entry_price = cash - size * c, size, c
+            daily_trades, last_trade_time, total_trades = daily_trades + 1, t, total_trades + 1
+        elif can_trade and indicator.is_sell_signal() and quantity > 0:
+            pnl = (c - entry_price) * quantity
+            winning_trades += pnl > 0
+            total_pnl += pnl
+            cash, quantity = cash + quantity * c, 0.0
+            daily_trades, last_trade_time, total_trades = daily_trades + 1, t, total_trades + 1
+
+        equity = cash + quantity * c
+        equity_curve.append(equity)
+        peak = max(peak, equity)
+        max_drawdown = max(max_drawdown, (peak - equity) / peak)
+
+    returns = np.diff(equity_curve) / np.array(equity_curve[:-1])
+    minutes = 252 * 24 * 60
+    sharpe = (np.mean(returns) - 0.02 / minutes) / np.std(returns) * np.sqrt(minutes)
+    return {'sharpe_ratio': sharpe, 'max_drawdown': max_drawdown, 'total_trades': total_trades,
+            'winning_trades': winning_trades, 'total_pnl': total_pnl, 'final_equity': equity_curve[-1]}
+
+
+def generate_minute_bars(num_bars, seed=11):
+    """Generate consistent minute OHLC bars with Unix timestamps"""
+    rng = np.random.default_rng(seed)
+    close = 45000 * np.exp(np.cumsum(rng.normal(0, 0.001, num_bars)))
+    open_prices = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_prices, close) * (1 + rng.uniform(0, 0.0005, num_bars))
+    low = np.minimum(open_prices, close) * (1 - rng.uniform(0, 0.0005, num_bars))
+    timestamps = 1672531200 + 60 * np.arange(num_bars)
+    return timestamps, open_prices, high, low, close
+
+
+class TestLocalBacktestEvaluator(unittest.TestCase):
+    """Test suite for the local backtest evaluator used by the optimizer"""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            from local_backtest import LocalBacktestEvaluator
+        except ImportError as e:
+            raise unittest.SkipTest(f"local backtest evaluator not available: {e}")
+        cls.Evaluator = LocalBacktestEvaluator
+        cls.bars = generate_minute_bars(20000)
+
+    def test_matches_per_bar_strategy_replay(self):
+        """Vectorized evaluator reports the same metrics as a per-bar replay"""
+        evaluator = self.Evaluator(*self.bars)
+
+        for multiplier in (0.5, 1.0):
+            metrics = evaluator.run(atr_period=10, multiplier=multiplier)
+            expected = replay_strategy_per_bar(*self.bars, atr_period=10, multiplier=multiplier)
+
+            self.assertGreater(expected['total_trades'], 0)
+            self.assertEqual(metrics['total_trades'], expected['total_trades'])
+            self.assertAlmostEqual(metrics['sharpe_ratio'], expected['sharpe_ratio'], places=9)
+            self.assertAlmostEqual(metrics['max_drawdown'], expected['max_drawdown'], places=12)
+            self.assertAlmostEqual(metrics['total_pnl'], expected['total_pnl'], places=6)
+            self.assertAlmostEqual(metrics['final_equity'], expected['final_equity'], places=6)
+
+    def test_precomputed_indicator_gives_same_result(self):
+        """Passing a sweep column skips the indicator without changing results"""
+        evaluator = self.Evaluator(*self.bars)
+        bars = evaluator.window_bars('2023-01-02', '2023-01-10')
+        sweep = SuperTrendSweep([10], [0.5, 1.0])
+        column = sweep.column(sweep.compute(bars['high'], bars['low'], bars['close']), 10, 0.5)
+
+        direct = evaluator.run(10, 0.5, start_date='2023-01-02', end_date='2023-01-10')
+        precomputed = evaluator.run(10, 0.5, start_date='2023-01-02', end_date='2023-01-10',
+                                    indicator=column)
+        self.assertEqual(direct, precomputed)
+
+    def test_stop_loss_enforcement_exits_earlier(self):
+        """Enforcing the trailing stop adds stop-out exits on top of signal exits"""
+        trailing_only = self.Evaluator(*self.bars).run(10, 0.5)
+        enforced = self.Evaluator(*self.bars, enforce_stop_loss=True).run(10, 0.5)
+        self.assertGreaterEqual(enforced['total_trades'], trailing_only['total_trades'])
+
+    def test_process_executor_matches_serial(self):
+        """Process pool evaluation returns the serial results in task order"""
+        from executors import create_executor
+
+        evaluator = self.Evaluator(*self.bars)
+        tasks = [
+            {
+                'parameters': [
+                    {'atr_period': period, 'multiplier': multiplier,
+                     'risk_percent': 0.02, 'max_position_size': 0.10}
+                    for multiplier in (0.5, 1.0)
+                ],
+                'start_date': '2023-01-02',
+                'end_date': '2023-01-12',
+                'shared_indicator': shared
+            }
+            for period, shared in ((7, True), (10, False), (14, True))
+        ]
+
+        with create_executor('serial', evaluator) as serial:
+            expected = serial.map(tasks)
+        with create_executor('process', evaluator, workers=2) as pool:
+            self.assertEqual(pool.map(tasks), expected)
+
+    def test_result_cache_serves_repeated_evaluations(self):
+        """Re-running an optimization is served from the cache with identical scores"""
+        from optimize import SupertrendOptimizer
+        from result_cache import ResultCache
+
+        evaluator = self.Evaluator(*self.bars)
+        cache = ResultCache(':memory:', max_entries=5)
+        optimizer = SupertrendOptimizer(evaluator=evaluator, cache=cache)
+        parameter_sets = [
+            {'atr_period': 10, 'multiplier': multiplier,
+             'risk_percent': 0.02, 'max_position_size': 0.10}
+            for multiplier in (0.5, 1.0, 1.5, 0.5)
+        ]
+
+        first = optimizer._evaluate_many(parameter_sets, '2023-01-02', '2023-01-12')
+        second = optimizer._evaluate_many(parameter_sets, '2023-01-02', '2023-01-12')
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[0], first[3])
+        self.assertEqual(cache.stats()['hits'], 4)
+        self.assertEqual(cache.stats()['misses'], 4)
+
+        # A different window is a different entry; the cache stays within its bound
+        optimizer._evaluate_many(parameter_sets, '2023-01-03', '2023-01-12')
+        self.assertEqual(len(cache), 5)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_seeded_tpe_search_independent_of_workers(self):
+        """A seeded Bayesian search evaluates the same parameter sets for any executor"""
+        from optimize import SupertrendOptimizer
+
+        evaluator = self.Evaluator(*self.bars)
+        searched = []
+        for executor, workers in (('serial', None), ('thread', 2), ('thread', 4)):
+            optimizer = SupertrendOptimizer(evaluator=evaluator, executor=executor, workers=workers)
+            results = optimizer.bayesian_optimization(num_trials=12, seed=0,
+                                                      start_date='2023-01-02', end_date='2023-01-09')
+            searched.append([(r['atr_period'], r['multiplier'], r['risk_percent'],
+                              r['max_position_size'], r['score']) for r in results])
+        self.assertEqual(searched[1], searched[0])
+        self.assertEqual(searched[2], searched[0])
+
+    def test_incremental_feed_matches_continuous_indicator(self):
+        """Rolling windows from the feed equal slices of one uninterrupted run"""
+        from local_backtest import IncrementalIndicatorFeed
+
+        evaluator = self.Evaluator(*self.bars)
+        full = SuperTrendIndicator(10, 0.5).compute(*(
+            getattr(evaluator, name)[evaluator.valid] for name in ('high', 'low', 'close')
+        ))
+        valid_index = np.flatnonzero(evaluator.valid)
+
+        feed = IncrementalIndicatorFeed(evaluator, [(10, 0.5), (14, 1.0)])
+        for day in range(2, 12, 3):
+            start, end = f'2023-01-{day:02d}', f'2023-01-{day + 5:02d}'
+            window = feed.window(start, end)[(10, 0.5)]
+            bars = evaluator.window_bars(start, end)
+            positions = np.searchsorted(valid_index, bars['index'])
+
+            for key in ('atr', 'supertrend', 'signal', 'buy_signal', 'sell_signal'):
+                np.testing.assert_array_equal(window[key], full[key][positions])
+            feed.release(f'2023-01-{day + 3:02d}')
+
+        with self.assertRaises(ValueError):
+            feed.window('2023-01-02', '2023-01-20')
+
+    def test_evaluator_reads_columnar_store(self):
+        """Bars read from the memory-mapped store give the same results as in-memory arrays"""
+        import tempfile
+        import shutil
+        try:
+            from marketdata import MarketDataStore
+        except ImportError as e:
+            self.skipTest(f"market data store not available: {e}")
+
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir, True)
+        timestamps, open_prices, high, low, close = self.bars
+
+        store = MarketDataStore(store_dir)
+        store.write('BTCUSD', {'timestamp': timestamps, 'open': open_prices,
+                               'high': high, 'low': low, 'close': close})
+
+        window = store.read('btcusd', '2023-01-03', '2023-01-05 12:00')
+        expected = (timestamps >= 1672704000) & (timestamps < 1672920000)
+        np.testing.assert_array_equal(window['close'], close[expected])
+        self.assertIsInstance(window['close'], np.memmap)
+
+        from_store = self.Evaluator.from_store(store, 'btcusd', '2023-01-03', '2023-01-10')
+        in_memory = self.Evaluator(*self.bars)
+        self.assertEqual(from_store.run(10, 0.5),
+                         in_memory.run(10, 0.5, start_date='2023-01-03', end_date='2023-01-10'))
+
+
 class TestTradingLogic(unittest.TestCase):
     """Test suite for trading logic components"""
 
@@ -276,6 +721,157 @@ class TestTradingLogic(unittest.TestCase):
         self.assertEqual(profit_factor, expected_profit_factor)
 
 
+class TestStrategyTools(unittest.TestCase):
+    """Test suite for the shared strategy tools (Library/strategy_tools)"""
+
+    def test_minute_data_exporter_chunks(self):
+        """Rows recorded across several flush_every chunks land in the CSV and .npy outputs"""
+        import tempfile
+        import shutil
+        from datetime import timezone
+        from strategy_tools import MinuteDataExporter
+        from strategy_tools.minute_data_exporter import CSV_HEADER, ROW_DTYPE
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder, True)
+        exporter = MinuteDataExporter(os.path.join(folder, 'minute_equity_data.csv'),
+                                      flush_every=4, formats=('csv', 'npy'))
+        start = datetime(2024, 1, 1, 0, 1, tzinfo=timezone.utc)
+
+        def record(i):
+            close = 42000.0 + 12.345 * i
+            exporter.record(start + timedelta(minutes=i), close - 1, close + 2, close - 3,
+                            close, 0.5 * i, 100000.0 + i)
+
+        for i in range(9):
+            record(i)
+
+        # Two full chunks are on disk and the .npy file is already valid
+        self.assertEqual((exporter.flushes, exporter.rows_written), (2, 8))
+        self.assertEqual(len(np.load(exporter.paths['npy'])), 8)
+
+        record(9)
+        exporter.close()
+        self.assertEqual((exporter.flushes, exporter.rows_written), (3, 10))
+
+        with open(exporter.paths['csv']) as f:
+            lines = f.readlines()
+        self.assertEqual(lines[0], CSV_HEADER)
+        self.assertEqual(len(lines), 11)
+        self.assertEqual(lines[1], "1704067260,2024-01-01T00:01:00,41999.00,42002.00,41997.00,"
+                                   "42000.00,0.0,100000.00,100000.00\n")
+        self.assertEqual(lines[10], "1704067800,2024-01-01T00:10:00,42110.11,42113.11,42108.11,"
+                                    "42111.11,4.5,100009.00,100009.00\n")
+
+        rows = np.load(exporter.paths['npy'], mmap_mode='r')
+        self.assertEqual(rows.dtype, ROW_DTYPE)
+        np.testing.assert_array_equal(rows['timestamp'], 1704067260 + 60 * np.arange(10))
+        np.testing.assert_array_equal(rows['wall_time'], rows['timestamp'])
+        np.testing.assert_array_equal(rows['close'], 42000.0 + 12.345 * np.arange(10))
+        np.testing.assert_array_equal(rows['portfolio_value'], 100000.0 + np.arange(10))
+
+        with self.assertRaises(ValueError):
+            MinuteDataExporter(os.path.join(folder, 'other.csv'), formats=('xlsx',))
+
+    def test_equity_tracker_matches_list_metrics(self):
+        """Test the array-backed equity tracker against list-based metrics"""
+        from strategy_tools import EquityTracker
+
+        rng = np.random.RandomState(3)
+        equity = 100000 * np.cumprod(1 + rng.normal(0, 0.001, 500))
+        start = datetime(2024, 1, 1)
+
+        # Small chunks and a point limit exercise growth and trimming
+        tracker = EquityTracker(100000, chunk_size=64, max_points=200)
+        for i, value in enumerate(equity):
+            tracker.update(start + timedelta(minutes=i), value, 40000.0)
+
+        returns = np.diff(equity) / equity[:-1]
+        peak = np.maximum.accumulate(np.maximum(equity, 100000))
+        self.assertEqual(tracker.count, 500)
+        self.assertAlmostEqual(tracker.stats.mean, np.mean(returns), places=15)
+        self.assertAlmostEqual(tracker.stats.std(), np.std(returns), places=12)
+        downside = np.sqrt(np.mean(np.minimum(returns, 0) ** 2))
+        minutes = 252 * 24 * 60
+        self.assertAlmostEqual(tracker.stats.sortino_ratio(0.02, minutes),
+                               (np.mean(returns) - 0.02 / minutes) / downside * np.sqrt(minutes),
+                               places=8)
+        self.assertAlmostEqual(tracker.max_drawdown, np.max((peak - equity) / peak), places=12)
+        self.assertLessEqual(len(tracker), 200)
+        np.testing.assert_array_equal(tracker.equity, equity[-len(tracker):])
+        self.assertEqual(tracker.timestamps[-1], np.datetime64(start + timedelta(minutes=499)))
+
+    def test_phase_profiler_histograms(self):
+        """Test on_data phase profiling aggregates and the disabled stand-in"""
+        from strategy_tools import create_phase_profiler, profiling_enabled
+        from strategy_tools.phase_profiler import PhaseStats
+
+        stats = PhaseStats()
+        for elapsed in [100] * 90 + [5000] * 9 + [70000]:
+            stats.add(elapsed)
+        self.assertEqual(stats.count, 100)
+        self.assertEqual(stats.min_ns, 100)
+        self.assertEqual(stats.percentile(50), 128)     # bucket upper edge
+        self.assertEqual(stats.percentile(99), 8192)
+        self.assertEqual(stats.percentile(100), 70000)  # capped at the maximum
+
+        profiler = create_phase_profiler(profiling_enabled("true"))
+        for _ in range(3):
+            profiler.begin()
+            profiler.lap('export')
+            profiler.lap('indicators')
+        summary = profiler.summary()
+        self.assertEqual(summary['bars'], 3)
+        self.assertEqual(summary['phases']['export']['count'], 3)
+        self.assertAlmostEqual(sum(p['share'] for p in summary['phases'].values()), 1.0)
+        self.assertEqual(len(profiler.report_lines()), 4)
+
+        disabled = create_phase_profiler(profiling_enabled("false"))
+        disabled.begin()
+        disabled.lap('export')
+        self.assertFalse(disabled.enabled)
+        self.assertEqual(disabled.report_lines(), [])
+
+    def test_strategy_logger_limits(self):
+        """Test log levels, sampling, per-key rate limits and lazy formatting"""
+        from strategy_tools import StrategyLogger
+
+        class FakeAlgorithm:
+            def __init__(self):
+                self.time = datetime(2024, 1, 1)
+                self.lines = []
+                self.debug = self.log = self.warning = self.error = self.lines.append
+
+        class Unformattable:
+            def __format__(self, spec):
+                raise AssertionError("suppressed message was formatted")
+
+        algorithm = FakeAlgorithm()
+        logger = StrategyLogger(algorithm, level='debug', max_per_interval=2)
+        logger.configure('monitor', sample_every=10)
+
+        for minute in range(120):
+            algorithm.time = datetime(2024, 1, 1) + timedelta(minutes=minute)
+            logger.debug('signal', "Price ${:.2f}", 100.0 + minute)
+            logger.debug('monitor', "Monitor {}", minute)
+            logger.error('invalid', "Invalid bar")
+
+        counts = logger.summary()
+        self.assertEqual(counts['signal']['emitted'], 4)        # 2 per hour
+        self.assertEqual(counts['signal']['suppressed'], 116)
+        self.assertEqual(counts['monitor']['emitted'], 4)       # every 10th, then rate limited
+        self.assertEqual(counts['invalid']['emitted'], 120)     # errors unlimited by default
+        self.assertIn("Price $100.00", algorithm.lines)
+        self.assertIn("Monitor 0", algorithm.lines)
+
+        quiet = StrategyLogger(algorithm, level='warning')
+        quiet.debug('lazy', "Value {}", Unformattable())
+        self.assertEqual(quiet.summary()['lazy']['suppressed'], 1)
+        self.assertEqual(len(quiet.report_lines()), 2)
+        with self.assertRaises(ValueError):
+            StrategyLogger(algorithm, level='verbose')
+
+
 class TestDataValidation(unittest.TestCase):
     """Test suite for data validation and error handling"""
 
@@ -348,6 +944,57 @@ class TestParameterOptimization(unittest.TestCase):
         self.assertIsInstance(sharpe, (int, float))
         self.assertNotEqual(sharpe, np.inf)
 
+    def _search_objective(self):
+        """Synthetic evaluate callback peaking at multiplier 1.2, atr_period 14"""
+        calls = []
+
+        def evaluate(parameter_sets, start_date, end_date):
+            calls.append((len(parameter_sets), (end_date - start_date).days))
+            return [{'sharpe_ratio': -abs(p['multiplier'] - 1.2) - abs(p['atr_period'] - 14) / 10}
+                    for p in parameter_sets]
+
+        return evaluate, calls
+
+    def test_successive_halving_promotes_best_candidates(self):
+        """Successive halving shrinks the field while growing the data slice"""
+        try:
+            from search import ParameterSpace, SuccessiveHalving
+        except ImportError as e:
+            self.skipTest(f"search module not available: {e}")
+
+        evaluate, calls = self._search_objective()
+        space = ParameterSpace({'atr_period': [7, 10, 14, 21]}, {'multiplier': (0.5, 3.0)})
+        candidates = [{'atr_period': period, 'multiplier': multiplier}
+                      for period in (7, 10, 14, 21) for multiplier in (0.5, 1.0, 1.2, 2.0, 3.0)]
+        candidates = candidates + candidates[:7]
+
+        outcome = SuccessiveHalving(space, evaluate, '2023-01-01', '2023-12-31',
+                                    eta=3, min_days=7).run(candidates=candidates)
+
+        self.assertEqual(calls, [(27, 7), (9, 21), (3, 364)])
+        self.assertEqual(outcome['best_parameters'], {'atr_period': 14, 'multiplier': 1.2})
+
+    def test_tpe_sampler_concentrates_on_good_region(self):
+        """TPE suggestions after the startup phase beat uniform sampling"""
+        try:
+            from search import ParameterSpace, TPESampler
+        except ImportError as e:
+            self.skipTest(f"search module not available: {e}")
+
+        evaluate, _ = self._search_objective()
+        space = ParameterSpace({'atr_period': [7, 10, 14, 21]}, {'multiplier': (0.5, 3.0)})
+
+        outcome = TPESampler(space, seed=3).run(evaluate, num_trials=60,
+                                                start_date=pd.Timestamp('2023-01-01'),
+                                                end_date=pd.Timestamp('2023-02-01'))
+        scores = [result[1]['sharpe_ratio'] for result in outcome['results']]
+        random_state = np.random.RandomState(3)
+        uniform = evaluate([space.sample(random_state) for _ in range(60)],
+                           pd.Timestamp('2023-01-01'), pd.Timestamp('2023-02-01'))
+
+        self.assertEqual(outcome['best_parameters']['atr_period'], 14)
+        self.assertGreater(np.mean(scores), np.mean([m['sharpe_ratio'] for m in uniform]))
+
 
 class IntegrationTests(unittest.TestCase):
     """Integration tests for the complete strategy"""
@@ -426,15 +1073,15 @@ def run_performance_benchmark():
 
     indicator = SuperTrendIndicator()
 
-    # Test with large dataset
+    # Test with large dataset, generated up front so only updates are timed
     import time
-    start_time = time.time()
-
     np.random.seed(123)
     base_price = 45000
+    prices = (base_price + np.random.normal(0, 500, 10000)).tolist()
+
+    start_time = time.time()
 
-    for i in range(10000):
-        price = base_price + np.random.normal(0, 500)
+    for price in prices:
         high = price + 25
         low = price - 25
         close = price